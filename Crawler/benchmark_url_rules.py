@@ -0,0 +1,119 @@
+import csv
+import glob
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+from url_rules import url_classifier
+
+"""
+Micro-benchmark de url_rules.py sobre los inventarios Crawler/*.csv.
+Compara las reglas con la implementación original de get_category
+(split de strings, antes de url_rules.py) como línea base: reporta
+links/seg de cada una y cuántos links obtienen la misma categoría.
+También usa la primera columna de cada CSV (categoría que entregó
+get_category al crawlear) como referencia.
+
+Uso: python Crawler/benchmark_url_rules.py [repeticiones]
+"""
+
+CRAWLER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_category_original(link, slug):
+    '''
+    get_category de crawler_loadmore.py antes de url_rules.py (sin el
+    manejo de errores, que no aplica a estos links)
+    '''
+    categoria = slug
+
+    if "biobiochile.cl" in link:
+        if "/especial/" in link:
+            path = link.split("/especial/", 1)[1]
+        elif "/noticias/" in link:
+            path = link.split("/noticias/", 1)[1]
+        else:
+            path = None
+
+        if path:
+            parts = [p for p in path.split("/") if p]
+            categorias_parts = []
+            for part in parts:
+                if part.isdigit() and len(part) == 4:
+                    break
+                categorias_parts.append(part)
+                if len(categorias_parts) == 3:
+                    break
+
+            if categorias_parts and categorias_parts[0].lower() == "biobiochile":
+                categorias_parts = categorias_parts[1:]
+
+            if len(categorias_parts) >= 2 and categorias_parts[1].lower() == "noticias":
+                categorias_parts.pop(1)
+
+            if categorias_parts and categorias_parts[0].lower() == "noticias-patrocinadas":
+                categoria = "noticias-patrocinadas"
+            elif categorias_parts:
+                categoria = "/".join(categorias_parts)
+
+    elif "latercera.com" in link:
+        parts = [p for p in urlparse(link).path.split("/") if p]
+        categoria = parts[0] if parts else "sin-categoria"
+
+    return categoria
+
+
+def load_inventory(path):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return [(row[0], row[1]) for row in csv.reader(f) if len(row) >= 2]
+
+
+def links_per_second(links, repeticiones, classify):
+    start = time.perf_counter()
+    for _ in range(repeticiones):
+        for link in links:
+            classify(link)
+    return round(len(links) * repeticiones / (time.perf_counter() - start))
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    for path in sorted(glob.glob(os.path.join(CRAWLER_DIR, "*.csv"))):
+        rows = load_inventory(path)
+        if not rows:
+            continue
+        links = [link for _, link in rows]
+
+        base = links_per_second(links, repeticiones, lambda link: get_category_original(link, None))
+        reglas = links_per_second(links, repeticiones, url_classifier.classify)
+        infos = url_classifier.classify_many(links)
+
+        # Links sin categoría en la URL usan el slug de la página de
+        # categoría, que el CSV no guarda: se cuentan aparte
+        iguales_base = iguales = distintos = sin_categoria = con_fecha = 0
+        for categoria, link in rows:
+            info = infos[link]
+            if info.category == get_category_original(link, None):
+                iguales_base += 1
+            else:
+                print(f"  ≠ {link}: original={get_category_original(link, None)!r} reglas={info.category!r}")
+            if info.date is not None:
+                con_fecha += 1
+            if info.category is None:
+                sin_categoria += 1
+            elif info.category == categoria:
+                iguales += 1
+            else:
+                distintos += 1
+
+        print(f"{os.path.basename(path)}: {len(rows)} links | "
+              f"original: {base:,} links/seg, reglas: {reglas:,} links/seg ({reglas / base:.2f}x) | "
+              f"igual a la original: {iguales_base} | "
+              f"igual al csv: {iguales}, distinta: {distintos}, "
+              f"sin categoría en URL: {sin_categoria}, con fecha: {con_fecha}")
+
+
+if __name__ == "__main__":
+    main()
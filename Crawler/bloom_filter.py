@@ -0,0 +1,160 @@
+import hashlib
+import json
+import math
+import os
+
+
+class BloomFilter:
+    '''
+    Filtro de Bloom de tamaño fijo: `capacity` elementos con una tasa
+    de falsos positivos de `error_rate`. Usa doble hashing sobre un
+    único digest blake2b de 128 bits.
+    '''
+
+    def __init__(self, capacity, error_rate, num_bits=None, num_hashes=None, bits=None, count=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = num_bits or self.bits_for(capacity, error_rate)
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    @staticmethod
+    def bits_for(capacity, error_rate):
+        '''
+        Bits necesarios para `capacity` elementos con tasa `error_rate`
+        '''
+        return max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item):
+        for p in self._positions(item):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    @property
+    def nbytes(self):
+        return len(self.bits)
+
+
+class ScalableBloomFilter:
+    '''
+    Conjunto probabilístico de URLs vistas con memoria acotada.
+    Crece agregando filtros de Bloom cada vez más grandes (x`GROWTH`)
+    y estrictos (x`TIGHTENING` en la tasa de error), de modo que la
+    tasa total de falsos positivos se mantiene bajo `error_rate`.
+
+    Si agregar un filtro nuevo superaría `max_bytes`, se sigue usando
+    el último: la memoria queda fija y la tasa de falsos positivos
+    sube gradualmente en vez de crecer sin límite.
+
+    Un falso positivo significa que una URL nueva se considera ya vista
+    y no se envía; nunca produce envíos duplicados.
+    '''
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, initial_capacity=100_000, error_rate=0.001, max_bytes=None):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.max_bytes = max_bytes
+        self.filters = []
+        self._saturated = False
+        self._add_filter()
+
+    def _add_filter(self):
+        '''
+        Agrega el siguiente filtro si cabe en `max_bytes`. El tamaño se
+        calcula antes de reservar los bits: una vez alcanzado el
+        presupuesto no se vuelve a intentar
+        '''
+        if self._saturated:
+            return
+        i = len(self.filters)
+        capacity = self.initial_capacity * self.GROWTH ** i
+        error_rate = self.error_rate * (1 - self.TIGHTENING) * self.TIGHTENING ** i
+        new_bytes = (BloomFilter.bits_for(capacity, error_rate) + 7) // 8
+        if self.filters and self.max_bytes and self.nbytes + new_bytes > self.max_bytes:
+            print(f"[BloomFilter] Presupuesto de memoria alcanzado ({self.nbytes} bytes), "
+                  f"la tasa de falsos positivos aumentará")
+            self._saturated = True
+            return
+        self.filters.append(BloomFilter(capacity, error_rate))
+
+    def __contains__(self, item):
+        return any(item in f for f in self.filters)
+
+    def add(self, item):
+        '''
+        Agrega `item`. Retorna True si no estaba (o al menos no se
+        detectó) en el conjunto
+        '''
+        if item in self:
+            return False
+        if self.filters[-1].full and not self._saturated:
+            self._add_filter()
+        self.filters[-1].add(item)
+        return True
+
+    def __len__(self):
+        return sum(f.count for f in self.filters)
+
+    @property
+    def nbytes(self):
+        return sum(f.nbytes for f in self.filters)
+
+    def save(self, path):
+        '''
+        Guarda un snapshot en disco: una línea JSON con los parámetros
+        seguida de los bits de cada filtro. Escritura atómica.
+        '''
+        header = {
+            "initial_capacity": self.initial_capacity,
+            "error_rate": self.error_rate,
+            "max_bytes": self.max_bytes,
+            "filters": [
+                {
+                    "capacity": f.capacity,
+                    "error_rate": f.error_rate,
+                    "num_bits": f.num_bits,
+                    "num_hashes": f.num_hashes,
+                    "count": f.count,
+                }
+                for f in self.filters
+            ],
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for bloom in self.filters:
+                f.write(bloom.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Carga un snapshot creado con `save`
+        '''
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            sbf = cls(header["initial_capacity"], header["error_rate"], header["max_bytes"])
+            sbf.filters = []
+            for params in header["filters"]:
+                bits = bytearray(f.read((params["num_bits"] + 7) // 8))
+                sbf.filters.append(BloomFilter(bits=bits, **params))
+        return sbf
@@ -0,0 +1,132 @@
+import json
+import os
+import time
+
+STATE_DIR = "state"
+
+# Peso de la última ejecución en los promedios móviles (EWMA)
+SMOOTHING = 0.3
+
+
+class CategoryStats:
+    '''
+    Estadísticas históricas por categoría de un medio, persistidas en
+    `state/category_stats_{medio}.json` entre ejecuciones:
+        - rendimiento: promedio móvil de URLs encoladas por ejecución,
+        - segundos: promedio móvil del tiempo de crawl de la categoría,
+        - ejecuciones, ultima_ejecucion, ultimo_cambio (última vez que
+          entregó URLs nuevas) y vacias_seguidas.
+
+    `prioritize` ordena las categorías por rendimiento esperado por
+    segundo (las nunca vistas primero) y deja fuera las crónicamente
+    vacías (`skip_after` ejecuciones seguidas sin URLs nuevas) hasta que
+    pasen `revisit_hours` desde su último crawl, de modo que las
+    secciones activas se crawlean en cada ejecución y las vacías solo
+    de vez en cuando.
+    '''
+
+    def __init__(self, medio, skip_after=5, revisit_hours=24):
+        self._path = os.path.join(STATE_DIR, f"category_stats_{medio}.json")
+        self.skip_after = skip_after
+        self.revisit = revisit_hours * 3600
+        self.stats = self._load()
+        self.skipped = []
+
+    def _load(self):
+        if not os.path.exists(self._path):
+            return {}
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[CategoryStats] Estadísticas ilegibles, se parte de cero: {e}")
+            return {}
+
+    def expected_yield(self, cat_url):
+        '''
+        URLs esperadas por segundo de crawl; infinito si nunca se crawleó
+        '''
+        stats = self.stats.get(cat_url)
+        if stats is None:
+            return float("inf")
+        return stats["rendimiento"] / max(stats["segundos"], 1.0)
+
+    def _chronically_empty(self, cat_url, now):
+        stats = self.stats.get(cat_url)
+        return (
+            stats is not None
+            and self.skip_after
+            and stats["vacias_seguidas"] >= self.skip_after
+            and now - stats["ultima_ejecucion"] < self.revisit
+        )
+
+    def prioritize(self, categories):
+        '''
+        Entrega la lista de categorías a crawlear, ordenada de mayor a
+        menor rendimiento esperado, sin las crónicamente vacías (que
+        quedan en `self.skipped`)
+        '''
+        now = time.time()
+        self.skipped = sorted(c for c in categories if self._chronically_empty(c, now))
+        skipped = set(self.skipped)
+        return sorted(
+            (c for c in categories if c not in skipped),
+            key=lambda c: (-self.expected_yield(c), c),
+        )
+
+    def record(self, cat_url, new_urls, seconds):
+        '''
+        Registra el resultado de crawlear `cat_url` en esta ejecución
+        '''
+        now = time.time()
+        stats = self.stats.get(cat_url)
+        if stats is None:
+            stats = self.stats[cat_url] = {
+                "rendimiento": new_urls,
+                "segundos": seconds,
+                "ejecuciones": 0,
+                "ultimo_cambio": None,
+                "vacias_seguidas": 0,
+            }
+        else:
+            stats["rendimiento"] = SMOOTHING * new_urls + (1 - SMOOTHING) * stats["rendimiento"]
+            stats["segundos"] = SMOOTHING * seconds + (1 - SMOOTHING) * stats["segundos"]
+        stats["ejecuciones"] += 1
+        stats["ultima_ejecucion"] = now
+        stats["ultimas_nuevas"] = new_urls
+        if new_urls > 0:
+            stats["ultimo_cambio"] = now
+            stats["vacias_seguidas"] = 0
+        else:
+            stats["vacias_seguidas"] += 1
+
+    def priorities(self, ordered):
+        '''
+        Prioridades para métricas: posición en el orden de crawl y
+        rendimiento esperado de cada categoría, y las omitidas
+        '''
+        return {
+            "orden": [
+                {
+                    "categoria": cat_url,
+                    "rendimiento_esperado": (
+                        round(self.stats[cat_url]["rendimiento"], 2) if cat_url in self.stats else None
+                    ),
+                    "urls_por_segundo_esperadas": (
+                        round(self.expected_yield(cat_url), 3) if cat_url in self.stats else None
+                    ),
+                }
+                for cat_url in ordered
+            ],
+            "omitidas": self.skipped,
+        }
+
+    def save(self):
+        '''
+        Persiste las estadísticas (escritura atómica)
+        '''
+        os.makedirs(STATE_DIR, exist_ok=True)
+        tmp_path = self._path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.stats, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._path)
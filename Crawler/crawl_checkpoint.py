@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+STATE_DIR = "state"
+
+
+class CrawlCheckpoint:
+    '''
+    Checkpoint de un crawl identificado por medio y `run_id`, persistido
+    en `state/checkpoint_{medio}_{run_id}.json` después de cada categoría
+    (o fuente sitemap/feed):
+        - categorias: orden completo de crawl de la ejecución,
+        - pendientes: frontera de categorías aún no terminadas,
+        - procesadas: categorías terminadas,
+        - links_encontrados: filas ya escritas en el inventario parcial,
+        - paginacion: métricas de paginación (clicks) por categoría.
+
+    Si el crawler muere, al ejecutarlo de nuevo con el mismo medio y
+    `--run-id` se reanuda desde la frontera, sin volver a la home ni a
+    las categorías ya terminadas. Los links ya encontrados están en
+    `Crawler/{medio}.{formato}.part`, que se continúa en modo append.
+    '''
+
+    def __init__(self, medio, run_id):
+        self.medio = medio
+        self.run_id = run_id
+        self._path = os.path.join(STATE_DIR, f"checkpoint_{medio}_{run_id}.json")
+        self.state = self._load()
+
+    def _load(self):
+        if not os.path.exists(self._path):
+            return None
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[CrawlCheckpoint] Checkpoint ilegible, se parte de cero: {e}")
+            return None
+
+    @property
+    def resuming(self):
+        '''
+        Indica si hay un checkpoint de una ejecución interrumpida
+        '''
+        return self.state is not None and self.state["status"] != "completed"
+
+    @property
+    def completed(self):
+        return self.state is not None and self.state["status"] == "completed"
+
+    def start(self, categories):
+        '''
+        Inicia el checkpoint de una ejecución nueva con el orden de crawl
+        '''
+        self.state = {
+            "medio": self.medio,
+            "run_id": self.run_id,
+            "status": "running",
+            "iniciado": time.time(),
+            "actualizado": time.time(),
+            "categorias": list(categories),
+            "pendientes": list(categories),
+            "procesadas": [],
+            "links_encontrados": 0,
+            "paginacion": {},
+        }
+        self.save()
+
+    @property
+    def pending(self):
+        return list(self.state["pendientes"])
+
+    @property
+    def processed(self):
+        return list(self.state["procesadas"])
+
+    @property
+    def categories(self):
+        return list(self.state["categorias"])
+
+    def category_done(self, cat_url, links_found, pagination=None):
+        '''
+        Mueve `cat_url` de la frontera a las procesadas y persiste
+        '''
+        if cat_url in self.state["pendientes"]:
+            self.state["pendientes"].remove(cat_url)
+        self.state["procesadas"].append(cat_url)
+        self.state["links_encontrados"] = links_found
+        if pagination is not None:
+            self.state["paginacion"][cat_url] = pagination
+        self.save()
+
+    def complete(self):
+        self.state["status"] = "completed"
+        self.save()
+
+    def save(self):
+        '''
+        Persiste el checkpoint (escritura atómica)
+        '''
+        self.state["actualizado"] = time.time()
+        os.makedirs(STATE_DIR, exist_ok=True)
+        tmp_path = self._path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
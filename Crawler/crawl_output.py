@@ -0,0 +1,116 @@
+import csv
+import json
+import os
+import time
+
+# Segundos máximos entre fsync del archivo parcial
+FSYNC_INTERVAL = 5.0
+
+
+def partial_path(path):
+    '''
+    Ruta del archivo parcial donde se escribe mientras el crawl corre
+    '''
+    return path + ".part"
+
+
+def read_rows(path, fmt="csv"):
+    '''
+    Lee las filas (categoria, link) de un inventario CSV o JSONL
+    '''
+    if not os.path.exists(path):
+        return
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for row in csv.reader(f):
+                if len(row) >= 2:
+                    yield row[0], row[1]
+        else:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                yield item.get("tags", ""), item["url"]
+
+
+def _truncate_partial_line(path):
+    '''
+    Descarta la última línea de `path` si quedó a medio escribir (el
+    proceso murió antes del salto de línea)
+    '''
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        pos = size
+        while pos > 0:
+            start = max(0, pos - 4096)
+            f.seek(start)
+            block = f.read(pos - start)
+            nl = block.rfind(b"\n")
+            if nl != -1:
+                f.truncate(start + nl + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+
+class CrawlOutputSink:
+    '''
+    Salida en streaming del crawler. Cada categoría se agrega al
+    archivo `{path}.part` apenas termina (CSV o JSONL, una fila por
+    link), con flush inmediato y fsync periódico, de modo que otros
+    procesos pueden leer el inventario parcial durante el crawl y un
+    crash no pierde lo ya escrito. Al cerrar, el archivo parcial se
+    renombra atómicamente a `path`.
+
+    Con `append=True` (reanudar un crawl interrumpido) se continúa el
+    archivo parcial existente: se descarta una última fila incompleta y
+    `count` parte desde las filas ya escritas.
+    '''
+
+    def __init__(self, path, fmt="csv", fsync_interval=FSYNC_INTERVAL, append=False):
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._fsync_interval = fsync_interval
+        self._last_fsync = time.monotonic()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if append and os.path.exists(partial_path(path)):
+            _truncate_partial_line(partial_path(path))
+            self.count = sum(1 for _ in read_rows(partial_path(path), fmt))
+        self._file = open(partial_path(path), "a" if append else "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file) if fmt == "csv" else None
+
+    def write(self, rows):
+        '''
+        Agrega filas (categoria, link) al archivo parcial
+        '''
+        for categoria, link in rows:
+            if self._writer is not None:
+                self._writer.writerow([categoria, link])
+            else:
+                self._file.write(json.dumps({"tags": categoria, "url": link}, ensure_ascii=False) + "\n")
+            self.count += 1
+        self._file.flush()
+        if time.monotonic() - self._last_fsync >= self._fsync_interval:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def close(self):
+        '''
+        Sincroniza a disco y publica el archivo final con un rename atómico
+        '''
+        if self._file.closed:
+            return
+        self._file.flush()
+        self._sync()
+        self._file.close()
+        os.replace(partial_path(self.path), self.path)
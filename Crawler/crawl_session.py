@@ -0,0 +1,170 @@
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+
+import aiohttp
+from playwright.async_api import async_playwright
+
+from request_filter import RequestFilter
+
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+async def _filter_requests(context, request_filter, page_stats):
+    '''
+    Función para bloquear recursos y terceros al buscar links de
+    noticias según `request_filter` (RequestFilter). Se registra una
+    sola vez sobre el contexto del navegador y aplica a todas sus
+    páginas; cuenta las requests permitidas y bloqueadas (por motivo)
+    de cada página en `page_stats`.
+    '''
+    async def handler(route):
+        req = route.request
+        decision = request_filter.decide(req.url, req.resource_type)
+        try:
+            page_stats[req.frame.page][decision] += 1
+        except Exception:
+            pass  # requests sin página (service workers)
+        if decision == "permitida":
+            await route.continue_()
+        else:
+            await route.abort()
+    await context.route("**/*", handler)
+
+
+class CrawlSession:
+    '''
+    Sesión de navegador compartida por todo el crawl de un medio.
+    Lanza Chromium una sola vez por ejecución y reutiliza el mismo
+    contexto (cookies, caché) para todas las categorías, en vez de
+    abrir un navegador por cada llamada.
+
+    Mantiene un pool acotado de hasta `max_pages` páginas, que se piden
+    con `async with session.page() as page` y se devuelven al pool al
+    salir del bloque, permitiendo crawlear varias categorías en paralelo.
+
+    Además comparte un cliente HTTP asíncrono (`session.http()`) con un
+    pool de hasta `max_connections` conexiones, para los sitios que no
+    necesitan renderizar JavaScript. Chromium se lanza recién cuando se
+    pide la primera página, por lo que un crawl solo HTTP nunca lo abre.
+
+    Las requests de Chromium pasan por `request_filter` (RequestFilter);
+    sin filtro se bloquean solo imágenes, css, fuentes, media y los
+    dominios de publicidad/analítica de la lista, no otros terceros.
+    `request_stats(page)` entrega las permitidas y bloqueadas de la
+    página desde que se prestó.
+
+    Uso:
+        async with CrawlSession(max_pages=4) as session:
+            categorias = await crawl_categories(config, session)
+            noticias = await crawl_news(config, categorias, session, medio)
+    '''
+
+    def __init__(self, headless=True, max_pages=1, max_connections=8, request_filter=None):
+        self._headless = headless
+        self._request_filter = request_filter or RequestFilter("", block_third_party=False)
+        self._page_stats = {}
+        self._max_pages = max(1, max_pages)
+        self._max_connections = max(1, max_connections)
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._browser_lock = asyncio.Lock()
+        self._idle_pages = asyncio.Queue()
+        self._open_pages = 0
+        self._http = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        '''
+        Inicia Playwright, lanza Chromium y crea el contexto compartido.
+        Se llama automáticamente al pedir la primera página.
+        '''
+        async with self._browser_lock:
+            if self._context is not None:
+                return
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self._headless)
+            self._context = await self._browser.new_context()
+            await _filter_requests(self._context, self._request_filter, self._page_stats)
+
+    def http(self):
+        '''
+        Entrega el cliente HTTP compartido (aiohttp), creándolo
+        en el primer uso
+        '''
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(limit=self._max_connections)
+            self._http = aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS)
+        return self._http
+
+    @asynccontextmanager
+    async def page(self):
+        '''
+        Presta una página del pool durante el bloque `async with`.
+        Si todas las páginas están ocupadas espera a que se libere una.
+        '''
+        page = await self._acquire_page()
+        self._page_stats[page] = Counter()
+        try:
+            yield page
+        finally:
+            self._idle_pages.put_nowait(page)
+
+    def request_stats(self, page):
+        '''
+        Requests permitidas y bloqueadas (total y por motivo) de `page`
+        desde que se prestó con `session.page()`
+        '''
+        stats = self._page_stats.get(page, Counter())
+        bloqueadas = {motivo: n for motivo, n in stats.items() if motivo != "permitida"}
+        return {
+            "permitidas": stats["permitida"],
+            "bloqueadas": sum(bloqueadas.values()),
+            "bloqueadas_por_motivo": bloqueadas,
+        }
+
+    async def _acquire_page(self):
+        if self._context is None:
+            await self.start()
+
+        # Abrir una página nueva solo si no hay libres y queda cupo en el pool
+        if self._idle_pages.empty() and self._open_pages < self._max_pages:
+            self._open_pages += 1
+            try:
+                return await self._context.new_page()
+            except Exception:
+                self._open_pages -= 1
+                raise
+
+        page = await self._idle_pages.get()
+        # Reemplazar páginas cerradas (por ejemplo, tras un crash)
+        if page.is_closed():
+            page = await self._context.new_page()
+        return page
+
+    async def close(self):
+        '''
+        Cierra cliente HTTP, contexto, navegador y Playwright. Es seguro
+        llamarla más de una vez.
+        '''
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        if self._context is not None:
+            await self._context.close()
+            self._context = None
+            self._page_stats.clear()
+            self._idle_pages = asyncio.Queue()
+            self._open_pages = 0
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
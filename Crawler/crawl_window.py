@@ -0,0 +1,116 @@
+import re
+from datetime import date, timedelta
+from email.utils import parsedate_to_datetime
+
+from url_rules import url_classifier, url_has_dates
+
+MESES = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+}
+
+ISO_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+DMY_RE = re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b")
+SPANISH_RE = re.compile(r"\b(\d{1,2})\s+de\s+([a-záéíóú]+)(?:\s+de)?\s+(\d{4})\b", re.IGNORECASE)
+
+
+def parse_date(text):
+    '''
+    Fecha (date) de un texto de fecha: ISO 8601 (lastmod de sitemaps,
+    atributo datetime), RFC 822 (pubDate de RSS), dd/mm/aaaa o
+    "11 de diciembre de 2025". None si no se reconoce
+    '''
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        match = ISO_DATE_RE.search(text)
+        if match:
+            return date(*map(int, match.groups()))
+        match = SPANISH_RE.search(text)
+        if match and match.group(2).lower() in MESES:
+            return date(int(match.group(3)), MESES[match.group(2).lower()], int(match.group(1)))
+        match = DMY_RE.search(text)
+        if match:
+            return date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        return parsedate_to_datetime(text).date()
+    except (ValueError, TypeError):
+        return None
+
+
+def link_date(link, hint=None):
+    '''
+    Fecha de publicación de un link: la de la URL (url_rules.py) o, si
+    no tiene, la de `hint` (lastmod del sitemap o fecha de la tarjeta)
+    '''
+    url_date = url_classifier.classify(link).date
+    if url_date is not None:
+        return url_date.date()
+    return parse_date(hint)
+
+
+def can_date_links(site_config, medio):
+    '''
+    Indica si el crawl de `medio` conoce la fecha de sus links, necesaria
+    para aplicar una ventana: en la URL (url_rules.py), en la tarjeta del
+    listado (card_selector y card_date_selector) o en el lastmod de los
+    sitemaps/feeds
+    '''
+    if url_has_dates(medio):
+        return True
+    if site_config.get("discovery", "categories") == "sitemap":
+        return True
+    return bool(site_config.get("card_selector") and site_config.get("card_date_selector"))
+
+
+class CrawlWindow:
+    '''
+    Ventana de fechas [since, until] (días inclusive) del crawl. Los
+    links con fecha fuera de la ventana no se envían; los links sin
+    fecha conocida se envían siempre.
+    '''
+
+    def __init__(self, since=None, until=None):
+        self.since = since
+        self.until = until
+        self.dropped = 0  # links descartados por estar fuera de la ventana
+
+    @classmethod
+    def from_config(cls, site_config, since=None, until=None):
+        '''
+        Ventana desde los argumentos --since/--until (aaaa-mm-dd) o, si
+        no se entregan, desde `crawl_since_days` de la configuración del
+        sitio (últimos N días). Retorna None si no hay ventana.
+        '''
+        since = date.fromisoformat(since) if since else None
+        until = date.fromisoformat(until) if until else None
+        if since is None and site_config.get("crawl_since_days") is not None:
+            since = date.today() - timedelta(days=site_config["crawl_since_days"])
+        if since is None and until is None:
+            return None
+        return cls(since, until)
+
+    def contains(self, day):
+        if day is None:
+            return True
+        if self.since is not None and day < self.since:
+            return False
+        if self.until is not None and day > self.until:
+            return False
+        return True
+
+    def accepts(self, link, hint=None):
+        '''
+        Indica si `link` está dentro de la ventana y cuenta los descartados
+        '''
+        if self.contains(link_date(link, hint)):
+            return True
+        self.dropped += 1
+        return False
+
+    def stats(self):
+        return {
+            "desde": self.since.isoformat() if self.since else None,
+            "hasta": self.until.isoformat() if self.until else None,
+            "links_fuera_de_ventana": self.dropped,
+        }
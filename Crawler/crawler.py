@@ -1,7 +1,19 @@
 from crawler_loadmore import *
-import asyncio, json, csv
+from crawler_sitemap import crawl_sitemaps, get_sources
+import crawler_loadmore
+import argparse, asyncio, json
 import time, os, sys
 
+# Agregar el directorio raíz al path para importar utils/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.url_registry import UrlRegistry
+from bloom_filter import ScalableBloomFilter
+from crawl_output import CrawlOutputSink, partial_path, read_rows
+from crawl_checkpoint import CrawlCheckpoint
+from request_filter import RequestFilter
+from category_stats import CategoryStats
+from crawl_window import CrawlWindow, can_date_links
+
 # Diccionario configuración sitios
 SITES = {
     "biobiochile": {
@@ -10,7 +22,31 @@ SITES = {
         "news_pattern": ["/noticias/"],                 # Slug página para reconocer links de noticias
         "load_more_selector": ".fetch-btn",             # Classname boton cargar mas links de la página
         "pagination_type": "loadmore",                  # Forma en que se cargan mas links, loadmore asume boton jscript
-        "max_clicks": 0                                 # Cantidad máxima de clikcs de este boton en la página
+        "max_clicks": 0,                                # Cantidad máxima de clikcs de este boton en la página
+        "adaptive_clicks": True,                        # Dejar de clickear cuando un click no entrega links nuevos
+        "loadmore_patience": 1,                         # Clicks seguidos sin links útiles antes de detenerse
+        "loadmore_max_age_days": None,                  # Detenerse si un click solo entrega noticias más antiguas (None = sin límite)
+        "loadmore_wait": "anchors",                     # Señal tras cada click: anchors (links nuevos), response (XHR) o mutation (DOM)
+        "fetch_mode": "auto",                           # browser, http o auto (navegador solo si hay clicks)
+        "block_third_party": False,                     # Bloquear todo tercero, no solo publicidad (requiere los CDN/API del sitio en allowed_script_hosts)
+        "allowed_script_hosts": [],                     # Hosts de terceros que el sitio necesita (p.ej. CDN del "cargar más")
+        "max_parallel_pages": 4,                        # Cantidad de categorías crawleadas en paralelo (páginas del pool)
+        "max_parallel_requests": 8,                     # Conexiones HTTP simultáneas en modo http
+        "discovery": "categories",                      # Fuente de links: categories (navegar categorías) o sitemap (sitemaps/feeds)
+        "url_ttl_hours": 168,                           # Horas tras las que una URL ya scrapeada vuelve a encolarse (None = nunca)
+        "dedup_capacity": 100000,                       # Capacidad inicial del filtro de duplicados (crece si se supera)
+        "dedup_error_rate": 0.001,                      # Tasa máxima de falsos positivos del filtro
+        "dedup_max_mb": 64,                             # Memoria máxima del filtro de duplicados
+        "dedup_snapshot": False,                        # Guardar/cargar el filtro desde state/ entre ejecuciones (backfills)
+        "category_scheduling": True,                    # Ordenar categorías por rendimiento histórico y omitir las vacías
+        "category_skip_after": 5,                       # Ejecuciones seguidas sin URLs nuevas para omitir una categoría
+        "category_revisit_hours": 24,                   # Horas tras las que una categoría omitida se vuelve a crawlear
+        "crawl_since_days": None,                       # Solo enviar noticias de los últimos N días (None = sin límite; --since lo reemplaza)
+        "card_selector": None,                          # Selector CSS de la tarjeta de cada noticia en el listado (para leer su fecha)
+        "card_date_selector": None,                     # Selector CSS de la fecha dentro de la tarjeta (p.ej. "time")
+        "card_fields": {},                              # Campos de la tarjeta que se envían con el link ({campo: selector}, p.ej. {"titulo": "h2"})
+        "index_only": False,                            # Ejecución solo índice: los scrapers usan la tarjeta y no descargan el artículo
+        "output_format": "csv"                          # Formato de Crawler/{medio}.{formato}: csv o jsonl
     },
     "latercera": {
         "start_url":"https://www.latercera.com/",
@@ -18,22 +54,104 @@ SITES = {
         "news_pattern": ["/noticia/"],                 # Slug página para reconocer links de noticias
         "load_more_selector": ".result-list__see-more",             # Classname boton cargar mas links de la página
         "pagination_type": "loadmore",                  # Forma en que se cargan mas links, loadmore asume boton jscript
-        "max_clicks": 0
+        "max_clicks": 0,
+        "adaptive_clicks": True,
+        "loadmore_patience": 1,
+        "loadmore_max_age_days": None,
+        "loadmore_wait": "anchors",
+        "fetch_mode": "auto",
+        "block_third_party": False,
+        "allowed_script_hosts": [],
+        "max_parallel_pages": 4,
+        "max_parallel_requests": 8,
+        "discovery": "categories",
+        "url_ttl_hours": 168,
+        "dedup_capacity": 100000,
+        "dedup_error_rate": 0.001,
+        "dedup_max_mb": 64,
+        "dedup_snapshot": False,
+        "category_scheduling": True,
+        "category_skip_after": 5,
+        "category_revisit_hours": 24,
+        "crawl_since_days": None,
+        "card_selector": None,
+        "card_date_selector": None,
+        "card_fields": {},
+        "index_only": False,
+        "output_format": "csv"
     }
 }
 
 
+def site_config_errors(medio, config, index_only=False, crawl_window=None):
+    '''
+    Errores de configuración del sitio para la ejecución pedida: opciones
+    que, con la configuración actual, no tendrían efecto
+    '''
+    errors = []
+    # Descubrimiento: categorías, o sitemaps/feeds configurados (sin
+    # fuentes no se encontraría ningún link)
+    discovery = config.get("discovery", "categories")
+    if discovery not in ("categories", "sitemap"):
+        errors.append(f"discovery desconocido: {discovery} (se espera categories o sitemap)")
+    elif discovery == "sitemap" and not get_sources(config):
+        errors.append('discovery "sitemap" requiere sitemaps o feeds en la configuración del sitio')
+    # Solo índice: los scrapers usan la tarjeta del listado (sin ella
+    # descargarían cada artículo)
+    if index_only and not config.get("card_selector"):
+        errors.append("--index-only requiere card_selector en la configuración del sitio")
+    # Ventana de fechas: sin fecha de los links no se descarta ninguno ni
+    # se deja de paginar
+    if crawl_window is not None and not can_date_links(config, medio):
+        errors.append("--since/--until (o crawl_since_days) requieren fechas en las URLs del medio, "
+                      "card_selector y card_date_selector, o discovery sitemap")
+    return errors
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawler de links de noticias de un medio")
+    parser.add_argument("medio", help="Nombre del medio (clave de SITES)")
+    parser.add_argument("--since", help="Solo enviar noticias publicadas desde esta fecha (aaaa-mm-dd)")
+    parser.add_argument("--until", help="Solo enviar noticias publicadas hasta esta fecha (aaaa-mm-dd)")
+    parser.add_argument("--run-id", help="Identificador de la ejecución: guarda un checkpoint por categoría "
+                                         "y, si existe uno interrumpido con el mismo id, reanuda desde él")
+    parser.add_argument("--index-only", action="store_true",
+                        help="Solo índice: enviar los links con los campos de su tarjeta sin scrapear el artículo")
+    return parser.parse_args()
+
+
 async def main():
 
-    if len(sys.argv) != 2:
-        print("Se debe ejecutar con un solo argumento, y debe ser el nombre del medio.")
-    else:
-        medio = sys.argv[1]
-        try:
-            config = SITES[medio]
-        except Exception as e:
-            send_error(medio, e, "Medio no encontrado en configuraciónes de sitios")
-            return
+    args = parse_args()
+    medio = args.medio
+    try:
+        config = SITES[medio]
+    except Exception as e:
+        send_error(medio, e, "Medio no encontrado en configuraciónes de sitios")
+        sys.exit(1)
+    try:
+        crawl_window = CrawlWindow.from_config(config, args.since, args.until)
+    except ValueError as e:
+        send_error(medio, e, "Fecha inválida en --since/--until, se espera aaaa-mm-dd")
+        sys.exit(1)
+
+    # Opciones que la configuración del sitio no permite aplicar: error en
+    # vez de un crawl que no hace lo pedido
+    index_only = args.index_only or config.get("index_only", False)
+    errors = site_config_errors(medio, config, index_only, crawl_window)
+    for error in errors:
+        send_error(medio, ValueError(error), "Configuración del sitio inválida para esta ejecución")
+    if errors:
+        sys.exit(1)
+
+    # Ejecución solo índice: los scrapers usan la tarjeta del listado
+    crawler_loadmore.index_only = index_only
+
+    # Checkpoint por categoría de la ejecución `--run-id`
+    checkpoint = CrawlCheckpoint(medio, args.run_id) if args.run_id else None
+    if checkpoint is not None and checkpoint.completed:
+        print(f"La ejecución {args.run_id} de {medio} ya terminó, no hay nada que reanudar.")
+        return
 
     print(f"\n🌐 CRAWLEANDO SITIO: {medio}")
 
@@ -42,46 +160,153 @@ async def main():
     # Pasar el medio a crawler_biobio para que lo use en send_link
     sys.modules['crawler_loadmore'].medio = medio
 
-    # Crawl links de categorías en el sitio
-    categorias = await crawl_categories(config)
-    print(f">> Total categorias encontradas en {medio}: {len(categorias)}\n")
+    # Registro persistente de URLs: solo se encolan las nuevas o expiradas
+    url_registry = UrlRegistry(medio, config.get("url_ttl_hours"))
+    crawler_loadmore.url_registry = url_registry
+
+    # Filtro de duplicados con memoria acotada, desde snapshot si se configuró
+    snapshot_path = f"state/seen_links_{medio}.bloom"
+    if config.get("dedup_snapshot") and os.path.exists(snapshot_path):
+        seen_filter = ScalableBloomFilter.load(snapshot_path)
+        print(f">> Filtro de duplicados cargado desde {snapshot_path} ({len(seen_filter)} links)")
+    else:
+        seen_filter = ScalableBloomFilter(
+            config.get("dedup_capacity", 100000),
+            config.get("dedup_error_rate", 0.001),
+            int(config.get("dedup_max_mb", 64) * 1024 * 1024),
+        )
+    crawler_loadmore.seen_links = seen_filter
+
+    # Al reanudar, los links ya encontrados (inventario parcial) vuelven
+    # al filtro de duplicados para no reenviarlos
+    output_format = config.get("output_format", "csv")
+    output_path = f"Crawler/{medio}.{output_format}"
+    resuming = checkpoint is not None and checkpoint.resuming
+    if resuming:
+        for _, link in read_rows(partial_path(output_path), output_format):
+            seen_filter.add(link)
+        print(f">> Reanudando ejecución {args.run_id}: {len(checkpoint.processed)} categorias procesadas, "
+              f"{len(checkpoint.pending)} pendientes")
+
+
+    # Ventana de fechas: los links publicados fuera de ella no se envían
+    crawler_loadmore.crawl_window = crawl_window
+    if crawl_window is not None:
+        print(f">> Ventana de fechas: {crawl_window.stats()['desde']} a {crawl_window.stats()['hasta']}")
+
+    # Sesión compartida por todo el crawl (un solo Chromium, lanzado solo
+    # si el sitio lo necesita, y un pool de conexiones HTTP)
+    async with CrawlSession(
+        max_pages=config.get("max_parallel_pages", 1),
+        max_connections=config.get("max_parallel_requests", 8),
+        request_filter=RequestFilter.for_site(config),
+    ) as session:
+
+        # Crawl links de categorías en el sitio, o fuentes sitemap/feed
+        # configuradas si el sitio usa descubrimiento por sitemap
+        # (al reanudar, la frontera guardada en el checkpoint)
+        por_sitemap = config.get("discovery", "categories") == "sitemap"
+        if resuming:
+            categorias = checkpoint.categories
+        elif por_sitemap:
+            categorias = get_sources(config)
+        else:
+            categorias = await crawl_categories(config, session)
+        print(f">> Total categorias encontradas en {medio}: {len(categorias)}\n")
+
+        # Ordenar categorías por rendimiento histórico esperado y omitir
+        # las crónicamente vacías (estadísticas en state/). Al reanudar
+        # se mantiene el orden del checkpoint.
+        category_stats = None
+        if not por_sitemap and config.get("category_scheduling", True):
+            category_stats = CategoryStats(
+                medio,
+                config.get("category_skip_after", 5),
+                config.get("category_revisit_hours", 24),
+            )
+            if not resuming:
+                categorias = category_stats.prioritize(categorias)
+            crawler_loadmore.category_stats = category_stats
+            if category_stats.skipped:
+                print(f">> Categorias omitidas por estar vacías en ejecuciones anteriores: {len(category_stats.skipped)}\n")
+
+        total_categorias = len(categorias)
+        # Links vistos por primera vez se escriben por categoría en
+        # Crawler/{medio}.{formato}.part y se renombran al terminar
+        os.makedirs("Crawler", exist_ok=True)
+        output = CrawlOutputSink(output_path, output_format, append=resuming)
+        categorias = list(categorias)
+
+        # Categorías por crawlear: todas, o solo la frontera al reanudar
+        pendientes = categorias
+        if resuming:
+            pendientes = checkpoint.pending
+            crawler_loadmore.pagination_stats.update(checkpoint.state["paginacion"])
+        elif checkpoint is not None:
+            checkpoint.start(categorias)
+
+        # Archivo de progreso para tracking en tiempo real
+        os.makedirs("metrics", exist_ok=True)
+        progress_file = "metrics/crawler_progress.json"
+
+        def update_progress(current, total, status="running"):
+            with open(progress_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "sitio": medio,
+                    "run_id": args.run_id,
+                    "status": status,
+                    "total_categorias": total,
+                    "categorias_procesadas": current,
+                    "porcentaje": round((current / total * 100) if total > 0 else 0, 1),
+                    "urls_encontradas": output.count,
+                    # Para el scheduler: inventario y links confirmados en scraper_queue
+                    # (el inventario incluye los omitidos por el registro persistente)
+                    "inventario": output_path,
+                    "urls_encoladas": link_publisher.stats()["mensajes_publicados"]
+                }, f, ensure_ascii=False, indent=2)
+
+        # Inicializar progreso
+        procesadas = total_categorias - len(pendientes)
+        update_progress(procesadas, total_categorias, "starting")
+
+        # Procesar categorías en paralelo, el progreso se cuenta por
+        # categoría terminada (pueden terminar en cualquier orden)
+        async def on_category_done(cat_url, news):
+            nonlocal procesadas
+            procesadas += 1
+            output.write(news)
+            if checkpoint is not None:
+                # Confirmar los links de la categoría con el broker antes
+                # de darla por terminada en el checkpoint
+                await link_publisher.flush_async()
+                checkpoint.category_done(cat_url, output.count, crawler_loadmore.pagination_stats.get(cat_url))
+
+            update_progress(procesadas, total_categorias, "running")
+            print(f"📊 Progreso: {procesadas}/{total_categorias} categorías ({round(procesadas/total_categorias*100, 1)}%)")
+
+        if por_sitemap:
+            await crawl_sitemaps(config, pendientes, session, medio, on_category_done)
+        else:
+            await crawl_news(config, pendientes, session, medio, on_category_done)
+
+    # Enviar los links que queden en el buffer del publicador
+    await link_publisher.flush_async()
+    link_publisher.close()
 
-    total_categorias = len(categorias)
-    all_news = set()
-    categorias = list(categorias)
-    
-    # Archivo de progreso para tracking en tiempo real
-    os.makedirs("metrics", exist_ok=True)
-    progress_file = "metrics/crawler_progress.json"
-    
-    def update_progress(current, total, status="running"):
-        with open(progress_file, "w", encoding="utf-8") as f:
-            json.dump({
-                "sitio": medio,
-                "status": status,
-                "total_categorias": total,
-                "categorias_procesadas": current,
-                "porcentaje": round((current / total * 100) if total > 0 else 0, 1),
-                "urls_encontradas": len(all_news)
-            }, f, ensure_ascii=False, indent=2)
-    
-    # Inicializar progreso
-    update_progress(0, total_categorias, "starting")
-    
-    # Procesar categorías una por una con actualización de progreso
-    for idx, categoria in enumerate(categorias, 1):
-        news = await crawl_news(config, [categoria], medio)
-        all_news.update(news)
-        
-        update_progress(idx, total_categorias, "running")
-        print(f"📊 Progreso: {idx}/{total_categorias} categorías ({round(idx/total_categorias*100, 1)}%)")
-    
     # Marcar como completado
     update_progress(total_categorias, total_categorias, "completed")
+
+    # Persistir registro de URLs (respaldo local si no hay Redis) y
+    # estadísticas por categoría
+    url_registry.close()
+    if category_stats is not None:
+        category_stats.save()
+    if config.get("dedup_snapshot"):
+        seen_filter.save(snapshot_path)
     
     # Metricas del crawler
     duracion = time.time() - start_time
-    total_urls = len(all_news)
+    total_urls = output.count
     promedio_por_categoria = total_urls/total_categorias if total_categorias > 0 else 0
     urls_por_minuto = total_urls / (duracion / 60) if duracion > 0 else 0
     os.makedirs("metrics", exist_ok=True)
@@ -102,7 +327,17 @@ async def main():
         "total_urls_encontradas": total_urls,
         "urls_por_categoria": round(promedio_por_categoria, 3),
         "duracion_segundos": round(duracion, 2),
-        "urls_por_minuto": round(urls_por_minuto, 2)
+        "urls_por_minuto": round(urls_por_minuto, 2),
+        "urls_omitidas_ya_vistas": url_registry.skipped,
+        "publicacion": link_publisher.stats(),
+        "paginacion": crawler_loadmore.pagination_stats,
+        "ventana": crawl_window.stats() if crawl_window is not None else None,
+        "prioridades_categorias": category_stats.priorities(categorias) if category_stats is not None else None,
+        "solicitudes": {
+            "permitidas": sum(s["permitidas"] for s in crawler_loadmore.request_stats.values()),
+            "bloqueadas": sum(s["bloqueadas"] for s in crawler_loadmore.request_stats.values()),
+            "por_pagina": crawler_loadmore.request_stats,
+        }
     }
 
     # Guardar Métricas en archivo json
@@ -110,15 +345,11 @@ async def main():
         json.dump(existing_metrics, f, ensure_ascii=False, indent=4)
 
 
-    # Guardar links en un csv
-    os.makedirs("Crawler", exist_ok=True)
-    csv_file_path = f"Crawler/{medio}.csv"
-    with open(csv_file_path, 'w', newline='') as csvfile:
-        csv_writer = csv.writer(csvfile)
-        for categoria, link in list(all_news):
-            csv_writer.writerow([categoria, link])
-        
-    print(f"Links guardados en {csv_file_path}")
+    # Publicar el archivo de links completo (rename atómico del parcial)
+    output.close()
+    if checkpoint is not None:
+        checkpoint.complete()
+    print(f"Links guardados en {output.path}")
 
 
 # Ejecutar
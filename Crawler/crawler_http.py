@@ -0,0 +1,198 @@
+import aiohttp
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+# Timeout (s) de cada request HTTP
+HTTP_TIMEOUT = 15
+
+# Atributo con que se marcan en la página los <a> ya recolectados
+HARVEST_MARK = "data-crawler-seen"
+
+# Script evaluado en la página: mismas reglas que extract_links (solo
+# los hrefs que empiezan con "/" se resuelven contra la URL base), pero
+# sin serializar el DOM. Con `onlyNew` ignora los <a> ya marcados. Si
+# se entregan `cardSel` y `fields` ({campo: selector}), junto a cada
+# link entrega los campos de su tarjeta en el listado (ver card_value),
+# o null.
+HARVEST_LINKS_JS = """
+([patterns, mark, onlyNew, cardSel, fields]) => {
+    const value = (el) => {
+        if (el.hasAttribute("datetime")) {
+            return el.getAttribute("datetime");
+        }
+        if (el.tagName === "IMG") {
+            const src = el.getAttribute("data-src") || el.getAttribute("src");
+            return src ? new URL(src, document.baseURI).href : null;
+        }
+        return el.textContent.trim() || null;
+    };
+    const selector = onlyNew ? `a[href]:not([${mark}])` : "a[href]";
+    const links = new Map();
+    for (const a of document.querySelectorAll(selector)) {
+        a.setAttribute(mark, "");
+        let link = a.getAttribute("href");
+        if (link.startsWith("/")) {
+            link = a.href;
+        }
+        if (!patterns.some((p) => link.includes(p))) {
+            continue;
+        }
+        let card = links.get(link) || null;
+        const cardEl = !card && cardSel && fields ? a.closest(cardSel) : null;
+        if (cardEl) {
+            card = {};
+            for (const [name, sel] of Object.entries(fields)) {
+                const el = cardEl.querySelector(sel);
+                const v = el ? value(el) : null;
+                if (v) {
+                    card[name] = v;
+                }
+            }
+        }
+        links.set(link, card);
+    }
+    return [...links];
+}
+"""
+
+
+def uses_browser(site_config):
+    '''
+    Indica si el sitio necesita Chromium según su `fetch_mode`:
+        - "browser": siempre usa Playwright.
+        - "http": nunca usa Playwright, solo descarga el HTML estático.
+        - "auto" (por defecto): usa Playwright solo si hay clicks de
+          "cargar más" configurados (`pagination_type` "loadmore" o
+          "xhr" y `max_clicks` > 0).
+    La paginación numerada ("paged") siempre se pide por HTTP.
+    '''
+    fetch_mode = site_config.get("fetch_mode", "auto")
+    if fetch_mode == "browser":
+        return True
+    if fetch_mode == "http":
+        return False
+    return site_config["pagination_type"] in ("loadmore", "xhr") and site_config.get("max_clicks", 0) > 0
+
+
+def card_fields(site_config):
+    '''
+    Campos de la tarjeta de cada noticia que se leen del listado
+    ({campo: selector CSS dentro de `card_selector`}): `card_fields` más
+    la fecha de `card_date_selector`. Vacío si no hay `card_selector`.
+    '''
+    if not site_config.get("card_selector"):
+        return {}
+    fields = dict(site_config.get("card_fields") or {})
+    if site_config.get("card_date_selector"):
+        fields.setdefault("fecha", site_config["card_date_selector"])
+    return fields
+
+
+def card_value(element, base_url):
+    '''
+    Valor de un campo de tarjeta: atributo datetime, URL de la imagen
+    (data-src o src) o texto del elemento
+    '''
+    if element.has_attr("datetime"):
+        return element["datetime"]
+    if element.name == "img":
+        src = element.get("data-src") or element.get("src")
+        return urljoin(base_url, src) if src else None
+    return element.get_text(" ", strip=True) or None
+
+
+def extract_cards(html, base_url, patterns, card_selector, fields):
+    '''
+    Campos de las tarjetas del listado en HTML estático: {link: {campo:
+    valor}} para los links de noticias dentro de cada `card_selector`
+    '''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    cards = {}
+    soup = BeautifulSoup(html, "html.parser")
+    for card_tag in soup.select(card_selector):
+        card = {}
+        for name, selector in fields.items():
+            element = card_tag.select_one(selector)
+            value = card_value(element, base_url) if element is not None else None
+            if value:
+                card[name] = value
+        for a_tag in card_tag.find_all("a", href=True):
+            link = a_tag["href"]
+            if link.startswith("/"):
+                link = urljoin(base_url, link)
+            if any(p in link for p in patterns):
+                cards.setdefault(link, card)
+    return cards
+
+
+def extract_links(html, base_url, patterns):
+    '''
+    Parsea el HTML y entrega el set de hrefs absolutos que contienen
+    alguno de los patrones entregados (string o lista de strings)
+    '''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    links = set()
+    soup = BeautifulSoup(html, "html.parser")
+    for a_tag in soup.find_all("a", href=True):
+        link = a_tag["href"]
+        if link.startswith("/"):
+            link = urljoin(base_url, link)
+        if any(p in link for p in patterns):
+            links.add(link)
+    return links
+
+
+async def harvest_links(page, patterns, only_new=False):
+    '''
+    Equivalente a extract_links ejecutado dentro de la página de
+    Playwright: entrega el set de hrefs absolutos que contienen alguno
+    de los patrones, sin transferir ni re-parsear el HTML completo.
+    Los <a> recolectados quedan marcados con `HARVEST_MARK`; con
+    `only_new=True` solo se consideran los agregados desde la última
+    llamada (p.ej. los que cargó el último click)
+    '''
+    return set(await harvest_cards(page, patterns, only_new))
+
+
+async def harvest_cards(page, patterns, only_new=False, card_selector=None, fields=None):
+    '''
+    Como harvest_links, pero entrega {link: tarjeta} con los campos
+    `fields` ({campo: selector}) leídos de la tarjeta del listado que
+    contiene cada link (ancestro `card_selector`), o None
+    '''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    args = [list(patterns), HARVEST_MARK, only_new, card_selector, fields or None]
+    return dict(await page.evaluate(HARVEST_LINKS_JS, args))
+
+
+async def fetch_html(session, url):
+    '''
+    Descarga el HTML de `url` con el cliente HTTP compartido de la sesión
+    '''
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+    async with session.http().get(url, timeout=timeout) as response:
+        response.raise_for_status()
+        return await response.text(errors="replace")
+
+
+async def scrape_category_http(session, category_url, news_pattern, card_config=None, cards=None):
+    '''
+    Crawl de la página de categoría sin navegador: descarga el HTML
+    estático y extrae directamente los links de noticias. Con
+    `card_config` (selector de tarjeta, campos) guarda en `cards` los
+    campos de la tarjeta de cada link.
+    '''
+    try:
+        html = await fetch_html(session, category_url)
+    except Exception as e:
+        print(f"> Timeout/Error en GET category {category_url}: {e}")
+        return set()
+
+    if card_config and card_config[1] and cards is not None:
+        cards.update(extract_cards(html, category_url, news_pattern, *card_config))
+    return extract_links(html, category_url, news_pattern)
@@ -1,84 +1,82 @@
 import asyncio
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import os, sys, time
 from crawler_sender import *
-
-
-# Timeouts (ms) y waits
+from crawl_session import CrawlSession
+from crawler_http import (
+    card_fields, extract_links, fetch_html, harvest_cards, harvest_links, scrape_category_http, uses_browser
+)
+from crawler_xhr import scrape_category_xhr
+from crawler_paged import scrape_category_paged
+from crawler_pagination import LoadMoreController
+from crawler_waits import WaitLog, click_and_wait, wait_for_links
+from bloom_filter import ScalableBloomFilter
+from url_rules import url_classifier
+
+# Agregar el directorio raíz al path para importar utils/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.url_canon import canonicalize_url
+
+
+# Timeouts (ms); las esperas tras goto y tras cada click son por
+# señal, con los timeouts de crawler_waits.py
 GOTO_TIMEOUT_START = 15000       # 15s para la home
 GOTO_TIMEOUT_CATEGORY = 15000    # 15s para páginas de categoría
-SHORT_WAIT = 500                 # 0.5s para wait_for_timeout
-CLICK_WAIT = 500                 # 0.5s tras click
 
-seen_links = set()
+# Links ya vistos en la ejecución, con memoria acotada (filtro de Bloom escalable);
+# crawler.py lo reemplaza según la configuración del sitio o un snapshot en disco
+seen_links = ScalableBloomFilter()
+
+# Registro persistente de URLs entre ejecuciones (utils.url_registry.UrlRegistry),
+# lo asigna crawler.py; si es None solo se deduplica dentro de la ejecución
+url_registry = None
+
+# Clicks, links útiles por click y latencia de las esperas de cada
+# categoría (modo loadmore), crawler.py los agrega a las métricas
+pagination_stats = {}
+
+# Requests de Chromium permitidas y bloqueadas por categoría (CrawlSession.request_stats)
+request_stats = {}
+
+# Estadísticas históricas por categoría (category_stats.CategoryStats),
+# las asigna crawler.py; si es None no se registran
+category_stats = None
+
+# Total de links enviados a scraper_queue en la ejecución
+enqueued_total = 0
+
+# Ventana de fechas del crawl (crawl_window.CrawlWindow), la asigna
+# crawler.py; si es None se envían links de cualquier fecha
+crawl_window = None
+
+# Ejecución "solo índice" (--index-only): los scrapers no descargan el
+# artículo y usan los campos de la tarjeta del listado
+index_only = False
 
-# Función para bloquear recursos al buscar links de noticias desde una página con botón "Cargar más"
-async def _block_assets(page):
+def mark_committed(messages):
     '''
-    Función para bloquear recursos al buscar links de noticias
-    desde una página con botón "cargar más noticias"
+    Registra como enviados los links de un lote recién confirmado por
+    el broker (callback `on_commit` de `link_publisher`): un lote que
+    falla no queda marcado en el registro persistente. Los links enviados
+    solo índice no se marcan: el artículo completo sigue pendiente y la
+    siguiente ejecución completa debe encolarlo.
     '''
-    async def handler(route):
-        req = route.request
-        if req.resource_type in ("image", "stylesheet", "font", "media"):
-            await route.abort()
-        else:
-            await route.continue_()
-    await page.route("**/*", handler)
+    if url_registry is not None:
+        url_registry.mark_enqueued(
+            message["url"] for message in messages if not message.get("index_only")
+        )
+
+
+link_publisher.on_commit = mark_committed
+
 
 def get_category(link, slug):
     '''
-    Función que extrae las categorías del enlace de las noticias
-    Compatible con biobiochile.cl y latercera.com
+    Función que extrae las categorías del enlace de las noticias según
+    las reglas por medio de `url_rules.URL_RULES` (biobiochile.cl y
+    latercera.com). Si el link no trae categoría se usa `slug`.
     '''
     try:
-        categoria = slug  # valor por defecto
-
-        # Biobiochile: extrae después de /especial/ o /noticias/
-        if "biobiochile.cl" in link:
-            if "/especial/" in link:
-                path = link.split("/especial/", 1)[1]
-            elif "/noticias/" in link:
-                path = link.split("/noticias/", 1)[1]
-            else:
-                path = None
-
-            if path:
-                parts = [p for p in path.split("/") if p]
-                categorias_parts = []
-                for part in parts:
-                    if part.isdigit() and len(part) == 4:
-                        break
-                    categorias_parts.append(part)
-                    if len(categorias_parts) == 3:
-                        break
-
-                if categorias_parts and categorias_parts[0].lower() == "biobiochile":
-                    categorias_parts = categorias_parts[1:]
-
-                if len(categorias_parts) >= 2 and categorias_parts[1].lower() == "noticias":
-                    categorias_parts.pop(1)
-
-                if categorias_parts and categorias_parts[0].lower() == "noticias-patrocinadas":
-                    categoria = "noticias-patrocinadas"
-                elif categorias_parts:
-                    categoria = "/".join(categorias_parts)
-                else:
-                    categoria = slug
-
-        # Latercera: primer segmento del path es la categoría
-        elif "latercera.com" in link:
-            path = urlparse(link).path
-            parts = [p for p in path.split("/") if p]
-            if parts:
-                categoria = parts[0]
-            else:
-                categoria = "sin-categoria"
-
-        else:
-            categoria = slug
-
+        categoria = url_classifier.classify(link, slug).category
     except Exception as e:
         send_error(link, e, f"Error al obtener tags de categorías de {link}")
         categoria = slug  # fallback
@@ -86,15 +84,79 @@ def get_category(link, slug):
     return categoria
 
 
-async def scrape_category_loadmore(page, category_url, load_more_selector, news_pattern, max_clicks=10):
+async def publish_links(news_items, medio="", cards=None):
+    '''
+    Envía a Scrapper los links de `news_items` (tuplas categoria, link,
+    lastmod) que no se hayan visto en esta ejecución (filtro `seen_links`)
+    y que, según el registro persistente, sean nuevos o estén expirados.
+    Los links se canonicalizan antes de deduplicar (utils/url_canon.py),
+    de modo que variantes de un mismo artículo se envían una sola vez.
+    Si hay ventana de fechas (`crawl_window`) se descartan los links con
+    fecha (de la URL o `lastmod`) fuera de ella. Si `cards` trae la
+    tarjeta del listado de un link ({link: campos}), se envía con él; en
+    ejecuciones solo índice, los links con tarjeta se marcan `index_only`.
+    Retorna (lista de tuplas (categoria, link canónico) vistas por
+    primera vez en esta ejecución, cantidad de links enviados).
+    '''
+    candidates = []
+    link_cards = {}
+    for categoria, link, lastmod in news_items:
+        if crawl_window is not None and not crawl_window.accepts(link, lastmod):
+            continue
+        card = cards.get(link) if cards else None
+        link = canonicalize_url(link, medio)
+        if seen_links.add(link):
+            candidates.append((categoria, link, lastmod))
+            if card:
+                link_cards[link] = card
+    first_seen = [(categoria, link) for categoria, link, _ in candidates]
+
+    if url_registry is not None:
+        due = url_registry.select_to_enqueue([link for _, link, _ in candidates])
+        candidates = [item for item in candidates if item[1] in due]
+
+    global enqueued_total
+    for categoria, link, lastmod in candidates:
+        card = link_cards.get(link)
+        # Solo índice únicamente con tarjeta: sin ella el scraper descarga
+        # el artículo y el link se registra como enviado (mark_committed)
+        await send_link(link, categoria, medio, lastmod, card, index_only and bool(card))
+    enqueued_total += len(candidates)
+
+    # Enviar el lote pendiente si lleva demasiado tiempo en el buffer
+    await link_publisher.flush_if_due_async()
+
+    return first_seen, len(candidates)
+
+
+async def scrape_category_loadmore(page, category_url, load_more_selector, news_pattern, max_clicks=10,
+                                   controller=None, wait_signal="anchors", wait_log=None,
+                                   card_config=None, cards=None, medio=""):
     '''
     Crawl de la página de categorías con la modalidad "loadmore", es decir,
     página de categoría que posee un botón de "cargar más noticias".
+    Los links se recolectan dentro de la página (harvest_links): primero
+    los de la carga inicial y luego, tras cada click, solo los <a> nuevos.
+    Si se entrega `controller` (LoadMoreController), este decide después
+    de cada click si seguir según los links que entregó.
+    En vez de pausas fijas se espera a que aparezcan links tras goto y,
+    tras cada click, la señal `wait_signal` (ver click_and_wait); la
+    latencia de cada espera se registra en `wait_log` (WaitLog).
+    Con `card_config` (selector de tarjeta, campos) se leen los campos
+    de la tarjeta de cada link (ver card_fields) y se guardan en `cards`.
+    Los links que se entregan a `controller` se canonicalizan con las
+    reglas de `medio`, igual que en publish_links.
     '''
+    card_config = card_config or (None, None)
+    if cards is None:
+        cards = {}
     news_links = set()
     try:
         await page.goto(category_url, timeout=GOTO_TIMEOUT_CATEGORY, wait_until="domcontentloaded")
-        await page.wait_for_timeout(SHORT_WAIT)
+        await wait_for_links(page, news_pattern, log=wait_log)
+        harvested = await harvest_cards(page, news_pattern, False, *card_config)
+        news_links |= harvested.keys()
+        cards.update((link, card) for link, card in harvested.items() if card)
     except Exception as e:
         print(f"> Timeout/Error en goto category {category_url}: {e}")
         return news_links
@@ -105,115 +167,165 @@ async def scrape_category_loadmore(page, category_url, load_more_selector, news_
             break
         try:
             await page.evaluate("(btn) => btn.scrollIntoView()", boton)
-            await boton.click(force=True)
-            await page.wait_for_timeout(CLICK_WAIT)
+            await click_and_wait(page, boton, wait_signal, log=wait_log)
+            harvested = await harvest_cards(page, news_pattern, True, *card_config)
+            click_links = harvested.keys() - news_links
+            news_links |= click_links
+            cards.update((link, card) for link, card in harvested.items() if card)
         except Exception as e:
             send_error(category_url, e, f"Error al cargar más noticias en {category_url}")
             break
-
-    soup = BeautifulSoup(await page.content(), "html.parser")
-    for a_tag in soup.find_all("a", href=True):
-        link = a_tag["href"]
-        if link.startswith("/"):
-            link = urljoin(category_url, link)
-        if any(p in link for p in news_pattern):
-            news_links.add(link)
+        if controller is not None:
+            click_dates = {canonicalize_url(link, medio): (cards.get(link) or {}).get("fecha") for link in click_links}
+            if not controller.should_continue(click_dates.keys(), click_dates):
+                break
 
     return news_links
 
 
-async def crawl_categories(site_config):
+async def crawl_categories(site_config, session):
     '''
     Función que Crawl de las categorías de noticias de la página,
-    entrega set de links de categorías encontradas
+    entrega set de links de categorías encontradas.
+    Usa la sesión compartida `session` (CrawlSession): una página del
+    pool si el sitio necesita navegador, o su cliente HTTP si no.
     '''
     start_url = site_config["start_url"]
     category_pattern = site_config["category_pattern"]
 
-    category_links = set()
+    try:
+        if uses_browser(site_config):
+            # Obtiene categorias directamente en la página
+            async with session.page() as page:
+                await page.goto(start_url, timeout=GOTO_TIMEOUT_START, wait_until="domcontentloaded")
+                await wait_for_links(page, category_pattern)
+                category_links = await harvest_links(page, category_pattern)
+                request_stats[start_url] = session.request_stats(page)
+                return category_links
+        else:
+            html = await fetch_html(session, start_url)
+    except Exception as e:
+        send_error(start_url, e, f"Error de 'Timeout' crawl links categorías: {start_url}")
+        return set()
+
+    # Obtiene categorias
+    category_links = extract_links(html, start_url, category_pattern)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await _block_assets(page)
-        try:
-            await page.goto(start_url, timeout=GOTO_TIMEOUT_START, wait_until="domcontentloaded")
-            await page.wait_for_timeout(SHORT_WAIT)
-        except Exception as e:
-            send_error(start_url, e, f"Error de 'Timeout' crawl links categorías: {start_url}")
-            await browser.close()
-            return set()
-
-        # Obtiene categorias
-        soup = BeautifulSoup(await page.content(), "html.parser")
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            if href.startswith("/"):
-                href = urljoin(start_url, href)
-            if category_pattern in href:
-                category_links.add(href)
-
-        await browser.close()
-            
     return category_links
 
 
-async def crawl_news(site_config, category_links, medio=""):
+async def crawl_news(site_config, category_links, session, medio="", on_category_done=None):
     '''
-    Crawl de los links de noticias de cada categoría,
-    entrega set de tuplas de links de noticias y sus tags de
-    categorías encontradas.
+    Crawl de los links de noticias de cada categoría.
+    Las categorías se reparten en paralelo sobre el pool de páginas (o
+    el cliente HTTP, según `fetch_mode`) de la sesión compartida
+    `session`. Los resultados no se acumulan en memoria: si se entrega
+    `on_category_done` (corrutina), se espera con (cat_url, lista de tuplas categoria,
+    link vistas por primera vez) apenas termina cada categoría, en el
+    orden en que van terminando. Las categorías se lanzan en el orden
+    de `category_links` (crawler.py las ordena por rendimiento esperado)
+    y el resultado de cada una se registra en `category_stats`.
+    Retorna el total de links nuevos.
     '''
     start_url = site_config["start_url"]
     news_pattern = site_config["news_pattern"]
     pagination_type = site_config["pagination_type"]
-
-    news = set()
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await _block_assets(page)
+    browser = uses_browser(site_config)
+    # Tarjetas del listado: (selector de tarjeta, {campo: selector})
+    card_config = (site_config.get("card_selector"), card_fields(site_config))
+
+    total_news = 0
+
+    def new_controller(max_clicks):
+        # Clicks (o páginas) adaptativos según lo que entrega cada uno
+        if not site_config.get("adaptive_clicks", True):
+            return None
+        return LoadMoreController(
+            max_clicks,
+            seen_links,
+            url_registry,
+            site_config.get("loadmore_max_age_days"),
+            site_config.get("loadmore_patience", 1),
+            crawl_window.since if crawl_window is not None else None,
+        )
+
+    async def crawl_category(cat_url):
+        nonlocal total_news
+        print(f"> {start_url} → {cat_url}")
+        started = time.monotonic()
+        cat_result = set()
+        cards = {}  # campos de la tarjeta de cada link en el listado, si se leyeron
         try:
-            await page.goto(start_url, timeout=GOTO_TIMEOUT_START, wait_until="domcontentloaded")
-            await page.wait_for_timeout(SHORT_WAIT)
-        except Exception as e:
-            send_error(start_url, e, f"Error de 'Timeout' crawl links noticias: {start_url}")
-            await browser.close()
-            return set()
-
-        # Inicia scrap categorias
-        for cat_url in category_links:
-            print(f"> {start_url} → {cat_url}")
-            if pagination_type == "loadmore":
-                # Busqueda de links de noticias por cada categoria
-                cat_news = await scrape_category_loadmore(
-                    page,
-                    cat_url,
-                    site_config["load_more_selector"],
-                    news_pattern,
-                    site_config["max_clicks"]
-                )
+            if pagination_type == "paged":
+                # Paginación numerada: páginas pedidas en paralelo por HTTP
+                controller = new_controller(site_config.get("max_pages", 10) - 1)
+                cat_news = await scrape_category_paged(session, cat_url, site_config, controller, card_config, cards, medio)
+                if controller is not None:
+                    pagination_stats[cat_url] = controller.stats()
+            elif not browser:
+                # Sitio sin JavaScript necesario: solo HTML estático
+                cat_news = await scrape_category_http(session, cat_url, news_pattern, card_config, cards)
+            elif pagination_type == "loadmore":
+                # Busqueda de links de noticias por cada categoria, con
+                # clicks adaptativos según lo que entrega cada uno
+                controller = new_controller(site_config["max_clicks"])
+                wait_log = WaitLog()
+                async with session.page() as page:
+                    cat_news = await scrape_category_loadmore(
+                        page,
+                        cat_url,
+                        site_config["load_more_selector"],
+                        news_pattern,
+                        site_config["max_clicks"],
+                        controller,
+                        site_config.get("loadmore_wait", "anchors"),
+                        wait_log,
+                        card_config,
+                        cards,
+                        medio
+                    )
+                    request_stats[cat_url] = session.request_stats(page)
+                pagination_stats[cat_url] = {
+                    **(controller.stats() if controller is not None else {}),
+                    "esperas": wait_log.stats(),
+                }
+            elif pagination_type == "xhr":
+                # Grabar la request del botón "cargar más" y reproducirla por HTTP
+                async with session.page() as page:
+                    cat_news = await scrape_category_xhr(
+                        session, page, cat_url, site_config, GOTO_TIMEOUT_CATEGORY
+                    )
+                    request_stats[cat_url] = session.request_stats(page)
             else:
-                # Futura Busqueda links en paginación
+                send_error(cat_url, ValueError(pagination_type), f"pagination_type desconocido en {cat_url}")
                 cat_news = set()
-
-            # slug solo para biobiochile, para latercera no lo uses
-            if "biobiochile.cl" in cat_url:
-                slug = cat_url.rstrip("/").split("/")[-1]
-            else:
-                slug = ""  # para latercera, get_category ignora el slug
-
-            for link in cat_news:
-                # Link encontrado se le obtiene sus tags de categorías
-                categoria = get_category(link, slug)
-                # Link y sus categorías son añadidos al conjunto de noticias encontradas
-                news.add((categoria, link))
-                # Envia link y categoria a Scrapper si este no ha sido enviado previamente
-                if link not in seen_links:
-                    send_link(link, categoria, medio)
-                    seen_links.add(link)
-
-        await browser.close()
-
-    return news
\ No newline at end of file
+        except Exception as e:
+            send_error(cat_url, e, f"Error al crawlear categoría {cat_url}")
+            cat_news = set()
+
+        # Categoría por defecto de los links de esta página (page_category de url_rules.py)
+        slug = url_classifier.page_category(cat_url)
+
+        for link in cat_news:
+            # Link encontrado se le obtiene sus tags de categorías (reglas de url_rules.py)
+            categoria = get_category(link, slug)
+            # Link y sus categorías son añadidos al conjunto de noticias encontradas
+            cat_result.add((categoria, link))
+
+        # Envia links y categorias a Scrapper si no han sido enviados previamente
+        new_news, enqueued = await publish_links(
+            [(categoria, link, (cards.get(link) or {}).get("fecha")) for categoria, link in cat_result],
+            medio,
+            cards,
+        )
+        if category_stats is not None:
+            category_stats.record(cat_url, enqueued, time.monotonic() - started)
+
+        total_news += len(new_news)
+        if on_category_done is not None:
+            await on_category_done(cat_url, new_news)
+
+    # Inicia scrap categorias, acotado por el tamaño del pool de páginas/conexiones
+    await asyncio.gather(*(crawl_category(cat_url) for cat_url in category_links))
+
+    return total_news
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import aiohttp
+
+from crawler_http import extract_cards, extract_links, fetch_html
+from crawler_sender import send_error
+
+# Agregar el directorio raíz al path para importar utils/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.url_canon import canonicalize_url
+
+# Status HTTP que indican que se pasó la última página
+_END_STATUS = (404, 410)
+
+
+def page_url(category_url, template, n):
+    '''
+    URL de la página `n` de una categoría según `page_url_template`:
+        - "/page/{n}/": se agrega al path de la categoría,
+        - "?page={n}": se agrega (o reemplaza) el parámetro en la query,
+        - "/page/{n}/?orden=fecha": ambas cosas.
+    '''
+    parsed = urlparse(category_url)
+    path_suffix, _, query = template.format(n=n).partition("?")
+    path = parsed.path.rstrip("/") + path_suffix if path_suffix else parsed.path
+    params = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    params.update(parse_qsl(query, keep_blank_values=True))
+    return urlunparse(parsed._replace(path=path, query=urlencode(params)))
+
+
+async def _fetch_page(session, url, news_pattern, card_config=None, cards=None):
+    '''
+    Links de noticias de una página del listado, o None si la página
+    no existe (se pasó la última). Los campos de las tarjetas se
+    agregan a `cards` si hay `card_config`.
+    '''
+    try:
+        html = await fetch_html(session, url)
+    except aiohttp.ClientResponseError as e:
+        if e.status in _END_STATUS:
+            return None
+        raise
+    if card_config and card_config[1] and cards is not None:
+        for link, card in extract_cards(html, url, news_pattern, *card_config).items():
+            cards.setdefault(link, card)
+    return extract_links(html, url, news_pattern)
+
+
+async def scrape_category_paged(session, category_url, site_config, controller=None, card_config=None, cards=None, medio=""):
+    '''
+    Crawl de una categoría con paginación numerada (`pagination_type`
+    "paged"), sin navegador. Las páginas 2..`max_pages` se construyen
+    con `page_url_template` y se piden por HTTP en tandas paralelas de
+    `page_concurrency`. Los resultados se revisan en orden de página y
+    el crawl termina en la primera página que no existe (404/410) o
+    que no entrega links nuevos; con `controller` (LoadMoreController)
+    se detiene además según sus reglas (links ya vistos, fecha límite,
+    paciencia), contando cada página como un click. Con `card_config`
+    (selector de tarjeta, campos) guarda en `cards` los campos de la
+    tarjeta de cada link. Los links que se entregan a `controller` se
+    canonicalizan con las reglas de `medio`, igual que en publish_links.
+    '''
+    news_pattern = site_config["news_pattern"]
+    template = site_config["page_url_template"]
+    max_pages = site_config.get("max_pages", 10)
+    concurrency = max(1, site_config.get("page_concurrency", 8))
+
+    try:
+        news_links = await _fetch_page(session, category_url, news_pattern, card_config, cards) or set()
+    except Exception as e:
+        print(f"> Timeout/Error en GET category {category_url}: {e}")
+        return set()
+
+    next_page = 2
+    while next_page <= max_pages:
+        batch = range(next_page, min(next_page + concurrency, max_pages + 1))
+        next_page = batch[-1] + 1
+        results = await asyncio.gather(
+            *(
+                _fetch_page(session, page_url(category_url, template, n), news_pattern, card_config, cards)
+                for n in batch
+            ),
+            return_exceptions=True,
+        )
+
+        for n, result in zip(batch, results):
+            if isinstance(result, Exception):
+                send_error(category_url, result, f"Error al pedir página {n} de {category_url}")
+                result = set()
+            if result is None:
+                if controller is not None:
+                    controller.stop_reason = "ultima_pagina"
+                return news_links
+            page_links = result - news_links
+            news_links |= page_links
+            if controller is not None:
+                dates = {canonicalize_url(link, medio): ((cards or {}).get(link) or {}).get("fecha") for link in page_links}
+                if not controller.should_continue(dates.keys(), dates):
+                    return news_links
+            elif not page_links:
+                return news_links
+
+    return news_links
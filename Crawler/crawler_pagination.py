@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+from crawl_window import link_date
+
+
+class LoadMoreController:
+    '''
+    Controla cuántos clicks de "cargar más" se hacen en una categoría
+    según lo que entrega cada click. Después de cada click se llama
+    `should_continue(links)` con los links nuevos en la página, y se
+    detiene (hasta `max_clicks`) cuando `patience` clicks seguidos:
+        - no entregan links de noticias nuevos,
+        - entregan solo links ya vistos en la ejecución (`seen_links`)
+          o vigentes en el registro persistente (`url_registry`), o
+        - entregan solo noticias anteriores a `max_age_days` días o a
+          `since` (inicio de la ventana del crawl), según la fecha del
+          link o la de su tarjeta en el listado, si la tiene.
+    Registra los links útiles de cada click para las métricas.
+    '''
+
+    def __init__(self, max_clicks, seen_links=None, url_registry=None, max_age_days=None, patience=1, since=None):
+        self.max_clicks = max_clicks
+        self.seen_links = seen_links
+        self.url_registry = url_registry
+        # Fecha mínima de las noticias útiles: la más restrictiva de ambas
+        cutoffs = [since] if since else []
+        if max_age_days:
+            cutoffs.append(date.today() - timedelta(days=max_age_days))
+        self.cutoff = max(cutoffs) if cutoffs else None
+        self.patience = max(1, patience)
+        self.clicks = 0
+        self.yields = []  # links útiles por click
+        self.stop_reason = None
+        self._unproductive = 0
+
+    def _too_old(self, links, dates):
+        if self.cutoff is None:
+            return False
+        days = [d for d in (link_date(link, dates.get(link)) for link in links) if d is not None]
+        return bool(days) and max(days) < self.cutoff
+
+    def _unseen(self, links):
+        links = [link for link in links if self.seen_links is None or link not in self.seen_links]
+        if self.url_registry is not None and links:
+            return self.url_registry.filter_due(links)
+        return set(links)
+
+    def should_continue(self, links, dates=None):
+        '''
+        Registra el resultado del último click (links nuevos en la
+        página, con la fecha de su tarjeta en `dates` si se conoce) y
+        decide si vale la pena hacer otro
+        '''
+        self.clicks += 1
+        if not links:
+            reason = "sin_links_nuevos"
+            useful = set()
+        elif self._too_old(links, dates or {}):
+            reason = "fecha_limite"
+            useful = set()
+        else:
+            useful = self._unseen(links)
+            reason = None if useful else "solo_links_vistos"
+        self.yields.append(len(useful))
+
+        if reason is None:
+            self._unproductive = 0
+        else:
+            self._unproductive += 1
+            if self._unproductive >= self.patience:
+                self.stop_reason = reason
+                return False
+
+        if self.clicks >= self.max_clicks:
+            self.stop_reason = "max_clicks"
+            return False
+        return True
+
+    def stats(self):
+        return {
+            "clicks": self.clicks,
+            "links_por_click": self.yields,
+            "motivo_fin": self.stop_reason,
+        }
@@ -1,4 +1,6 @@
+import asyncio
 import json
+import time
 from datetime import datetime
 
 import pika
@@ -7,6 +9,13 @@ from crawler_sender import *
 SCRAPER_QUEUE = "scraper_queue"
 LOG_QUEUE = "crawler_log_queue"
 
+# Umbrales de envío por lotes de links hacia scraper_queue
+PUBLISH_BATCH_SIZE = 100        # links por lote
+PUBLISH_FLUSH_INTERVAL = 1.0    # segundos máximos que un link espera en el buffer
+PUBLISH_MAX_RETRIES = 3         # intentos por lote, reconectando entre cada uno
+PUBLISH_RETRY_DELAY = 0.5       # segundos de espera antes del reintento n (x n)
+PUBLISH_MAX_BUFFER = 1000       # links máximos en el buffer (lotes sin confirmar incluidos)
+
 # Conectar con RabbitMQ
 connection = pika.BlockingConnection(pika.ConnectionParameters("localhost"))
 # Abrir un canal de conexión con RabbitMQ
@@ -15,8 +24,230 @@ crawler_channel = connection.channel()
 crawler_channel.queue_declare(queue=SCRAPER_QUEUE, durable=False, auto_delete=True)
 crawler_channel.queue_declare(queue=LOG_QUEUE, durable=False, auto_delete=True)
 
+# Conexión propia para links: si se cae se reabre sin afectar al canal
+# de errores
+link_connection = None
+
+
+def open_link_channel():
+    """
+    Canal para publicar links, sobre `link_connection` (se reconecta si
+    está cerrada). LinkPublisher lo pone en modo transaccional
+    """
+    global link_connection
+    if link_connection is None or link_connection.is_closed:
+        link_connection = pika.BlockingConnection(pika.ConnectionParameters("localhost"))
+    channel = link_connection.channel()
+    channel.queue_declare(queue=SCRAPER_QUEUE, durable=False, auto_delete=True)
+    return channel
+
+
+class LinkPublishError(Exception):
+    """
+    No se pudo confirmar un lote de links tras PUBLISH_MAX_RETRIES
+    intentos, o el buffer superó PUBLISH_MAX_BUFFER
+    """
+
+
+class LinkPublisher:
+    """
+    Publicador por lotes de links hacia 'scraper_queue'.
+    Acumula mensajes y los publica en lotes cuando el buffer llega a
+    `batch_size` o cuando el más antiguo lleva `flush_interval` segundos
+    esperando, y al cerrar. Cada lote se confirma con el broker en un
+    solo round trip (tx_commit).
+
+    Si el envío o el commit falla, el canal se descarta (no se vuelve a
+    usar un canal caído, ni para el rollback) y se reintenta sobre un
+    canal nuevo de `channel_factory`, hasta `max_retries` veces; si
+    todos fallan se lanza LinkPublishError con el lote aún en el buffer.
+    El buffer nunca supera `max_buffer` links.
+
+    `on_commit(mensajes)` se llama solo después de que tx_commit retorna,
+    con los mensajes confirmados (p.ej. para registrarlos como enviados).
+
+    Desde el event loop del crawler se usan publish_async, flush_async y
+    flush_if_due_async: la espera entre reintentos es un asyncio.sleep y
+    no detiene a las demás categorías. Un lock serializa los envíos; los
+    links que llegan mientras un lote espera su reintento quedan en el
+    buffer para el lote siguiente.
+
+    Nota: en BlockingChannel los publisher confirms (confirm_delivery)
+    esperan el ack de cada mensaje por separado, por eso se usa una
+    transacción AMQP por lote, que confirma todo el lote de una vez.
+    """
+
+    def __init__(self, channel_factory, queue, batch_size=PUBLISH_BATCH_SIZE, flush_interval=PUBLISH_FLUSH_INTERVAL,
+                 max_retries=PUBLISH_MAX_RETRIES, max_buffer=PUBLISH_MAX_BUFFER, on_commit=None):
+        self._channel_factory = channel_factory
+        self._channel = None
+        self._queue = queue
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_retries = max(1, max_retries)
+        self._max_buffer = max(batch_size, max_buffer)
+        self.on_commit = on_commit
+        self._buffer = []
+        self._oldest = None
+        self._published = 0
+        self._publish_time = 0.0
+        self._confirm_latencies = []
+        self._retries = 0
+        self._lock = asyncio.Lock()
+
+    def _append(self, message):
+        """
+        Agrega un mensaje al buffer; retorna True si completó un lote
+        """
+        if len(self._buffer) >= self._max_buffer:
+            raise LinkPublishError(f"Buffer de links lleno ({len(self._buffer)} sin confirmar)")
+        if not self._buffer:
+            self._oldest = time.monotonic()
+        self._buffer.append(message)
+        return len(self._buffer) >= self._batch_size
+
+    def _due(self):
+        return bool(self._buffer) and time.monotonic() - self._oldest >= self._flush_interval
+
+    def publish(self, message):
+        if self._append(message):
+            self.flush()
+
+    async def publish_async(self, message):
+        if self._append(message):
+            await self.flush_async()
+
+    def flush_if_due(self):
+        """
+        Envía el buffer si el mensaje más antiguo superó `flush_interval`
+        """
+        if self._due():
+            self.flush()
+
+    async def flush_if_due_async(self):
+        if self._due():
+            await self.flush_async()
+
+    def _discard_channel(self):
+        channel, self._channel = self._channel, None
+        try:
+            channel.close()
+        except Exception:
+            pass
+
+    def _send_batch(self, batch):
+        """
+        Publica `batch` y lo confirma con un tx_commit. Retorna la
+        latencia del commit
+        """
+        if self._channel is None:
+            self._channel = self._channel_factory()
+            self._channel.tx_select()
+        for message in batch:
+            self._channel.basic_publish(
+                exchange="",
+                routing_key=self._queue,
+                body=json.dumps(message),
+                properties=pika.BasicProperties(delivery_mode=2),
+            )
+        commit_start = time.monotonic()
+        self._channel.tx_commit()
+        return time.monotonic() - commit_start
+
+    def _flush_attempts(self):
+        """
+        Envía el buffer actual como un lote, con reintentos. Entre intentos
+        entrega los segundos a esperar, para que flush duerma y flush_async
+        ceda el event loop
+        """
+        batch = self._buffer[:]
+        if not batch:
+            return
+        start = time.monotonic()
+        for attempt in range(1, self._max_retries + 1):
+            try:
+                latency = self._send_batch(batch)
+                break
+            except Exception as e:
+                error = e
+                if self._channel is not None:
+                    self._discard_channel()
+                print(f"Error al confirmar lote de {len(batch)} links (intento {attempt}/{self._max_retries}): {e}")
+                if attempt < self._max_retries:
+                    self._retries += 1
+                    yield PUBLISH_RETRY_DELAY * attempt
+        else:
+            send_error(self._queue, error, f"Error al confirmar lote de {len(batch)} links")
+            raise LinkPublishError(f"Lote de {len(batch)} links sin confirmar tras {self._max_retries} intentos") from error
+
+        end = time.monotonic()
+        self._confirm_latencies.append(latency)
+        self._publish_time += end - start
+        self._published += len(batch)
+        print(f"Lote de {len(batch)} links confirmado hacia scraper desde crawler...")
+        # Los links agregados durante los reintentos quedan para el lote siguiente
+        del self._buffer[:len(batch)]
+        self._oldest = end if self._buffer else None
+        if self.on_commit is not None:
+            self.on_commit(batch)
+
+    def flush(self):
+        """
+        Envío bloqueante, para usar fuera del event loop
+        """
+        for delay in self._flush_attempts():
+            time.sleep(delay)
+
+    async def flush_async(self):
+        """
+        Envía todo el buffer sin bloquear el event loop durante las esperas
+        entre reintentos
+        """
+        async with self._lock:
+            while self._buffer:
+                for delay in self._flush_attempts():
+                    await asyncio.sleep(delay)
+
+    def close(self):
+        """
+        Envía lo que quede en el buffer; si no se puede confirmar lanza
+        LinkPublishError (los links no se descartan en silencio)
+        """
+        self.flush()
+        if self._channel is not None:
+            self._discard_channel()
+
+    def stats(self):
+        """
+        Métricas de publicación: mensajes confirmados, lotes, throughput
+        (mensajes por segundo de publicación) y distribución de la
+        latencia de confirmación por lote
+        """
+        latencies = sorted(self._confirm_latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "mensajes_publicados": self._published,
+            "lotes_confirmados": len(latencies),
+            "reintentos": self._retries,
+            "mensajes_por_segundo": round(self._published / self._publish_time, 2) if self._publish_time > 0 else 0,
+            "latencia_confirmacion_ms": {
+                "p50": percentile(0.5),
+                "p90": percentile(0.9),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1] * 1000, 2) if latencies else 0,
+            },
+        }
+
+
+link_publisher = LinkPublisher(open_link_channel, SCRAPER_QUEUE)
+
 
-def send_link(link, tags, medio=""):
+async def send_link(link, tags, medio="", lastmod=None, card=None, index_only=False):
     """
     Función que envia mensajes a cola 'scraper_queue' para
     iniciar el proceso de scrapping
@@ -26,14 +257,14 @@ def send_link(link, tags, medio=""):
         "tags": tags,  # Tags Categorías
         "medio": medio,  # Medio de prensa
     }
-    # Enviar el mensaje al componente de scrapping
-    crawler_channel.basic_publish(
-        exchange="",
-        routing_key=SCRAPER_QUEUE,
-        body=json.dumps(message),
-        properties=pika.BasicProperties(delivery_mode=2),
-    )
-    print("Mensaje enviado hacia scraper desde crawler...")
+    if lastmod:
+        message["lastmod"] = lastmod  # Fecha de modificación según sitemap/feed
+    if card:
+        message["card"] = card  # Campos de la tarjeta del listado (titulo, fecha, ...)
+    if index_only:
+        message["index_only"] = True  # No descargar el artículo, basta con la tarjeta
+    # Encolar el mensaje en el lote hacia el componente de scrapping
+    await link_publisher.publish_async(message)
 
 
 def send_error(link, e, stage):
@@ -48,10 +279,15 @@ def send_error(link, e, stage):
         "stage": stage,
         "error_detail": str(e),
     }
-    crawler_channel.basic_publish(
-        exchange="",
-        routing_key=LOG_QUEUE,
-        body=json.dumps(message),
-        properties=pika.BasicProperties(delivery_mode=2),
-    )
+    try:
+        crawler_channel.basic_publish(
+            exchange="",
+            routing_key=LOG_QUEUE,
+            body=json.dumps(message),
+            properties=pika.BasicProperties(delivery_mode=2),
+        )
+    except Exception as log_error:
+        # Sin broker el error solo queda en consola
+        print(f"No se pudo enviar error hacia LOG ({log_error}): {message}")
+        return
     print("Mensaje error enviado hacia LOG desde crawler...")
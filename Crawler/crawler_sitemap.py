@@ -0,0 +1,237 @@
+import os
+import zlib
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+from crawler_http import HTTP_TIMEOUT
+import crawler_loadmore
+from crawl_window import parse_date
+from crawler_loadmore import get_category, publish_links
+from crawler_sender import send_error
+
+# Tamaño de los bloques leídos desde la red o desde disco
+CHUNK_SIZE = 64 * 1024
+# Firma de un stream gzip
+GZIP_MAGIC = b"\x1f\x8b"
+# Cantidad de links acumulados antes de publicarlos (una consulta al registro por tanda)
+PUBLISH_BATCH = 500
+
+
+def _local_name(tag):
+    '''
+    Quita el namespace de un tag XML ("{ns}loc" -> "loc")
+    '''
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(elem, *names):
+    '''
+    Entrega el texto del primer hijo cuyo nombre local esté en `names`,
+    respetando el orden de preferencia. Los hijos directos tienen
+    prioridad sobre los anidados (p.ej. <loc> de <url> sobre <image:loc>)
+    '''
+    found = {}
+    for child in list(elem) + list(elem.iter()):
+        name = _local_name(child.tag)
+        if name in names and name not in found and child.text:
+            found[name] = child.text.strip()
+    for name in names:
+        if name in found:
+            return found[name]
+    return None
+
+
+def _atom_link(elem):
+    for child in elem:
+        if _local_name(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+            return child.get("href")
+    return None
+
+
+def _entry(elem):
+    '''
+    Convierte un elemento terminado en una entrada (tipo, url, fecha):
+        - <sitemap> de un sitemap index -> ("sitemap", loc, lastmod)
+        - <url> de un sitemap (incluye news sitemaps) -> ("url", loc, lastmod)
+        - <item> RSS / <entry> Atom -> ("url", link, fecha)
+    Retorna None para cualquier otro elemento.
+    '''
+    name = _local_name(elem.tag)
+    if name == "sitemap":
+        return "sitemap", _child_text(elem, "loc"), _child_text(elem, "lastmod")
+    if name == "url":
+        return "url", _child_text(elem, "loc"), _child_text(elem, "lastmod", "publication_date")
+    if name == "item":
+        return "url", _child_text(elem, "link", "guid"), _child_text(elem, "pubDate", "date")
+    if name == "entry":
+        return "url", _atom_link(elem), _child_text(elem, "updated", "published")
+    return None
+
+
+async def parse_xml_stream(chunks):
+    '''
+    Parser XML incremental para sitemap index, sitemaps, news sitemaps,
+    RSS y Atom. Recibe un iterador asíncrono de bloques de bytes y va
+    entregando (tipo, url, fecha) a medida que se completa cada entrada,
+    sin mantener el documento completo en memoria.
+    '''
+    parser = ET.XMLPullParser(events=("end",))
+    async for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            entry = _entry(elem)
+            if entry is None:
+                continue
+            if entry[1]:
+                yield entry
+            elem.clear()
+    parser.close()
+    for _, elem in parser.read_events():
+        entry = _entry(elem)
+        if entry is not None and entry[1]:
+            yield entry
+
+
+async def _decompress(chunks):
+    '''
+    Descomprime al vuelo un stream gzip (sitemaps .xml.gz). Si el
+    servidor lo envió con `Content-Encoding: gzip`, aiohttp ya lo
+    descomprimió: sin la firma gzip al inicio se entrega tal cual
+    '''
+    head = b""
+    decompressor = None
+    async for chunk in chunks:
+        if decompressor is None:
+            head += chunk
+            if len(head) < len(GZIP_MAGIC):
+                continue
+            if not head.startswith(GZIP_MAGIC):
+                yield head
+                break
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            chunk, head = head, b""
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    else:
+        if decompressor is None:
+            if head:
+                yield head
+            return
+        data = decompressor.flush()
+        if data:
+            yield data
+        return
+
+    # Stream sin comprimir: el resto pasa directo
+    async for chunk in chunks:
+        yield chunk
+
+
+async def _read_local(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def _read_remote(session, url):
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=HTTP_TIMEOUT)
+    async with session.http().get(url, timeout=timeout) as response:
+        response.raise_for_status()
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            yield chunk
+
+
+def open_source(session, source):
+    '''
+    Abre una fuente XML como stream de bytes. Acepta URLs http(s),
+    rutas locales y URLs file:// (útil para probar contra fixtures)
+    '''
+    parsed = urlparse(source)
+    if parsed.scheme in ("http", "https"):
+        chunks = _read_remote(session, source)
+    else:
+        path = parsed.path if parsed.scheme == "file" else source
+        chunks = _read_local(os.path.expanduser(path))
+
+    if parsed.path.endswith(".gz"):
+        chunks = _decompress(chunks)
+    return chunks
+
+
+async def discover_urls(session, source, news_pattern, max_depth=3, since=None):
+    '''
+    Recorre una fuente (sitemap index, sitemap, news sitemap o feed) y
+    entrega (url, lastmod) de cada noticia que calce con `news_pattern`.
+    Los sitemaps hijos de un index se recorren recursivamente hasta
+    `max_depth` niveles; con `since` (date) se omiten los hijos cuyo
+    lastmod es anterior, ya que no pueden tener noticias más recientes.
+    Los loc relativos se resuelven contra `source` (fixtures locales).
+    '''
+    async for kind, loc, lastmod in parse_xml_stream(open_source(session, source)):
+        if kind == "sitemap":
+            loc = urljoin(source, loc)
+            if max_depth <= 0:
+                continue
+            modified = parse_date(lastmod) if since is not None else None
+            if modified is not None and modified < since:
+                continue
+            try:
+                async for item in discover_urls(session, loc, news_pattern, max_depth - 1, since):
+                    yield item
+            except Exception as e:
+                send_error(loc, e, f"Error al leer sitemap {loc}")
+        elif any(p in loc for p in news_pattern):
+            yield loc, lastmod
+
+
+def get_sources(site_config):
+    '''
+    Fuentes de descubrimiento configuradas para el sitio
+    (`sitemaps` y `feeds` en SITES)
+    '''
+    return list(site_config.get("sitemaps", [])) + list(site_config.get("feeds", []))
+
+
+async def crawl_sitemaps(site_config, sources, session, medio="", on_category_done=None):
+    '''
+    Alternativa a crawl_news para `discovery: "sitemap"`: en vez de
+    recorrer categorías con el navegador, lee en streaming los sitemaps
+    y feeds del sitio y publica cada link nuevo (con su lastmod) a
+    `scraper_queue`. Las tags se obtienen igual que en crawl_news, con
+    get_category. `on_category_done` (corrutina) se espera con (fuente, lista de tuplas
+    vistas por primera vez) al terminar cada fuente. Retorna el total de
+    links nuevos.
+    '''
+    news_pattern = site_config["news_pattern"]
+    window = crawler_loadmore.crawl_window
+    since = window.since if window is not None else None
+
+    total_news = 0
+
+    for source in sources:
+        print(f"> {site_config['start_url']} → {source}")
+        source_result = []
+        pending = []
+        try:
+            async for link, lastmod in discover_urls(session, source, news_pattern, since=since):
+                pending.append((get_category(link, ""), link, lastmod))
+                if len(pending) >= PUBLISH_BATCH:
+                    first_seen, _ = await publish_links(pending, medio)
+                    source_result.extend(first_seen)
+                    pending = []
+        except Exception as e:
+            send_error(source, e, f"Error al leer fuente de descubrimiento {source}")
+        first_seen, _ = await publish_links(pending, medio)
+        source_result.extend(first_seen)
+
+        total_news += len(source_result)
+        if on_category_done is not None:
+            await on_category_done(source, source_result)
+
+    return total_news
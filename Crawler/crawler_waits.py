@@ -0,0 +1,160 @@
+import time
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from crawler_http import HARVEST_MARK
+
+# Timeouts (ms) máximos de cada espera; si la señal llega antes se sigue de inmediato
+LOAD_WAIT_TIMEOUT = 5000      # 5s para que aparezcan links tras goto
+CLICK_WAIT_TIMEOUT = 10000    # 10s para que un click de "cargar más" entregue contenido
+
+# Hay algún <a> cuyo href contiene alguno de los patrones
+HAS_LINKS_JS = """
+(patterns) => [...document.querySelectorAll("a[href]")].some(
+    (a) => patterns.some((p) => a.getAttribute("href").includes(p))
+)
+"""
+
+# Cantidad de <a> cuyo href contiene alguno de los patrones
+COUNT_LINKS_JS = """
+(patterns) => [...document.querySelectorAll("a[href]")].filter(
+    (a) => patterns.some((p) => a.getAttribute("href").includes(p))
+).length
+"""
+
+# Hay más <a> que calzan con los patrones que `previous`
+HAS_MORE_LINKS_JS = """
+([patterns, previous]) => [...document.querySelectorAll("a[href]")].filter(
+    (a) => patterns.some((p) => a.getAttribute("href").includes(p))
+).length > previous
+"""
+
+# Hay algún <a> aún no recolectado por harvest_links
+HAS_NEW_ANCHORS_JS = """
+(mark) => document.querySelector(`a[href]:not([${mark}])`) !== null
+"""
+
+# Deja en window una promesa que se resuelve con la primera mutación
+# del DOM (true) o al cumplirse el timeout (false)
+WATCH_MUTATION_JS = """
+(timeout) => {
+    window.__crawlerMutation = new Promise((resolve) => {
+        const observer = new MutationObserver(() => {
+            observer.disconnect();
+            resolve(true);
+        });
+        observer.observe(document.body, {childList: true, subtree: true});
+        setTimeout(() => {
+            observer.disconnect();
+            resolve(false);
+        }, timeout);
+    });
+}
+"""
+
+
+class WaitLog:
+    '''
+    Registro de la latencia de cada espera de una categoría, por tipo
+    ("carga" tras goto, "click" tras cada click), y de las que
+    terminaron por timeout
+    '''
+
+    def __init__(self):
+        self._waits = {}
+
+    def record(self, kind, started, ok):
+        self._waits.setdefault(kind, []).append((time.monotonic() - started, ok))
+
+    def stats(self):
+        result = {}
+        for kind, waits in self._waits.items():
+            latencies = sorted(seconds for seconds, _ in waits)
+            result[kind] = {
+                "esperas": len(waits),
+                "timeouts": sum(1 for _, ok in waits if not ok),
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+                "max_ms": round(latencies[-1] * 1000, 1),
+                "total_ms": round(sum(latencies) * 1000, 1),
+            }
+        return result
+
+
+async def wait_for_links(page, patterns, timeout=LOAD_WAIT_TIMEOUT, log=None):
+    '''
+    Espera a que la página tenga al menos un link que calce con
+    `patterns`, en vez de una pausa fija tras goto. Retorna False si
+    se cumplió el timeout (se sigue igual con lo que haya en la página)
+    '''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    started = time.monotonic()
+    try:
+        await page.wait_for_function(HAS_LINKS_JS, arg=list(patterns), timeout=timeout)
+        ok = True
+    except PlaywrightTimeoutError:
+        ok = False
+    if log is not None:
+        log.record("carga", started, ok)
+    return ok
+
+
+async def count_links(page, patterns):
+    '''
+    Cantidad de links de la página que calzan con `patterns`
+    '''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return await page.evaluate(COUNT_LINKS_JS, list(patterns))
+
+
+async def wait_for_more_links(page, patterns, previous, timeout=CLICK_WAIT_TIMEOUT, log=None):
+    '''
+    Espera a que la página tenga más links que calcen con `patterns`
+    que `previous` (p.ej. tras recibir la respuesta de "cargar más", a
+    que el DOM muestre las tarjetas nuevas). Retorna False si se cumplió
+    el timeout
+    '''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    started = time.monotonic()
+    try:
+        await page.wait_for_function(HAS_MORE_LINKS_JS, arg=[list(patterns), previous], timeout=timeout)
+        ok = True
+    except PlaywrightTimeoutError:
+        ok = False
+    if log is not None:
+        log.record("click", started, ok)
+    return ok
+
+
+async def click_and_wait(page, button, signal="anchors", timeout=CLICK_WAIT_TIMEOUT, log=None):
+    '''
+    Hace click en el botón de "cargar más" y espera la señal de que
+    llegó contenido nuevo, en vez de una pausa fija:
+        - "anchors": aparecen <a> no recolectados aún por harvest_links,
+        - "response": termina la primera respuesta XHR/fetch tras el click,
+        - "mutation": el DOM cambia (MutationObserver).
+    Retorna False si se cumplió el timeout sin la señal.
+    '''
+    started = time.monotonic()
+    ok = True
+    try:
+        if signal == "response":
+            async with page.expect_response(
+                lambda response: response.request.resource_type in ("xhr", "fetch"),
+                timeout=timeout,
+            ):
+                await button.click(force=True)
+        elif signal == "mutation":
+            await page.evaluate(WATCH_MUTATION_JS, timeout)
+            await button.click(force=True)
+            ok = await page.evaluate("() => window.__crawlerMutation")
+        else:
+            await button.click(force=True)
+            await page.wait_for_function(HAS_NEW_ANCHORS_JS, arg=HARVEST_MARK, timeout=timeout)
+    except PlaywrightTimeoutError:
+        ok = False
+    if log is not None:
+        log.record("click", started, ok)
+    return ok
@@ -0,0 +1,217 @@
+import asyncio
+import json
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+import aiohttp
+
+from crawler_http import HTTP_TIMEOUT, extract_links, harvest_links
+from crawler_waits import count_links, wait_for_more_links
+from crawler_sender import send_error
+
+# Timeout (ms) para que el click en "cargar más" dispare su request XHR
+XHR_RECORD_TIMEOUT = 10000
+
+# Headers de la request grabada que no se deben copiar al reenviarla
+_SKIP_HEADERS = {"host", "content-length", "cookie", "accept-encoding", "connection"}
+
+
+class RecordedRequest:
+    '''
+    Request XHR/fetch grabada desde el botón "cargar más" de una
+    categoría. Guarda el parámetro que lleva el número de página para
+    poder reconstruir la request de cualquier página N.
+    '''
+
+    def __init__(self, method, url, headers, post_data, page_param, page_value, in_body):
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.post_data = post_data
+        self.page_param = page_param
+        self.page_value = page_value
+        self.in_body = in_body
+
+    def for_page(self, n, step=1):
+        '''
+        Entrega (url, body) de la request para la página `n`, tomando
+        la request grabada como página 2 y avanzando `step` por página
+        '''
+        value = str(self.page_value + (n - 2) * step)
+        if self.in_body:
+            params = dict(parse_qsl(self.post_data or "", keep_blank_values=True))
+            params[self.page_param] = value
+            return self.url, urlencode(params)
+
+        parsed = urlparse(self.url)
+        params = dict(parse_qsl(parsed.query, keep_blank_values=True))
+        params[self.page_param] = value
+        return urlunparse(parsed._replace(query=urlencode(params))), self.post_data
+
+
+def _find_page_param(params, page_param=None):
+    '''
+    Busca en los parámetros de la request el que lleva el número de
+    página: el configurado en `xhr_page_param` o el primero numérico
+    '''
+    for key, value in params:
+        if page_param is not None and key != page_param:
+            continue
+        if value.isdigit():
+            return key, int(value)
+    return None, None
+
+
+async def record_loadmore_request(page, load_more_selector, page_param=None, news_pattern=None):
+    '''
+    Hace click una vez en el botón "cargar más" y graba la request
+    XHR/fetch que dispara. Retorna un RecordedRequest, o None si no hay
+    botón o no se pudo identificar el parámetro de página. Con
+    `news_pattern` espera además a que el DOM muestre los links de la
+    página 2, que se recolectan después desde la página.
+    '''
+    boton = await page.query_selector(load_more_selector)
+    if boton is None:
+        return None
+
+    await page.evaluate("(btn) => btn.scrollIntoView()", boton)
+    previous = await count_links(page, news_pattern) if news_pattern else None
+    async with page.expect_request(
+        lambda r: r.resource_type in ("xhr", "fetch"), timeout=XHR_RECORD_TIMEOUT
+    ) as request_info:
+        await boton.click(force=True)
+    request = await request_info.value
+    # Esperar la respuesta y que las tarjetas de la página 2 se rendericen
+    # (la respuesta llega antes de que el DOM las muestre)
+    await request.response()
+    if previous is not None:
+        await wait_for_more_links(page, news_pattern, previous)
+
+    headers = {
+        k: v for k, v in (await request.all_headers()).items()
+        if k.lower() not in _SKIP_HEADERS and not k.startswith(":")
+    }
+
+    key, value = _find_page_param(parse_qsl(urlparse(request.url).query), page_param)
+    in_body = False
+    if key is None and request.post_data:
+        key, value = _find_page_param(parse_qsl(request.post_data), page_param)
+        in_body = True
+    if key is None:
+        return None
+
+    return RecordedRequest(
+        request.method, request.url, headers, request.post_data, key, value, in_body
+    )
+
+
+def _fragments(payload):
+    '''
+    Recorre una respuesta JSON y entrega los strings que contienen
+    HTML o URLs, donde vienen los links de la página cargada
+    '''
+    if isinstance(payload, str):
+        if "<a" in payload or payload.startswith("http") or payload.startswith("/"):
+            yield payload
+    elif isinstance(payload, dict):
+        for value in payload.values():
+            yield from _fragments(value)
+    elif isinstance(payload, list):
+        for value in payload:
+            yield from _fragments(value)
+
+
+def parse_fragment(body, content_type, base_url, news_pattern):
+    '''
+    Extrae links de noticias de una respuesta XHR, ya sea un fragmento
+    HTML o un JSON con fragmentos HTML/URLs dentro
+    '''
+    if "json" not in content_type:
+        return extract_links(body, base_url, news_pattern)
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return extract_links(body, base_url, news_pattern)
+
+    links = set()
+    for fragment in _fragments(payload):
+        if "<a" in fragment:
+            links.update(extract_links(fragment, base_url, news_pattern))
+            continue
+        link = urljoin(base_url, fragment)
+        if any(p in link for p in news_pattern):
+            links.add(link)
+    return links
+
+
+async def _fetch_page(http, recorded, n, step, cookies, base_url, news_pattern):
+    url, body = recorded.for_page(n, step)
+    headers = dict(recorded.headers)
+    if cookies:
+        headers["Cookie"] = cookies
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+    async with http.request(recorded.method, url, data=body, headers=headers, timeout=timeout) as response:
+        response.raise_for_status()
+        text = await response.text(errors="replace")
+        return parse_fragment(text, response.headers.get("Content-Type", ""), base_url, news_pattern)
+
+
+async def scrape_category_xhr(session, page, category_url, site_config, goto_timeout):
+    '''
+    Crawl de la página de categoría reproduciendo directamente el
+    endpoint XHR del botón "cargar más". Se hace un solo click para
+    grabar la request, y las páginas 3..max_clicks+1 se piden en
+    paralelo por HTTP (de a `xhr_concurrency`), parseando solo los
+    fragmentos devueltos. Se detiene antes si una tanda completa de
+    páginas no entrega links nuevos.
+    '''
+    news_pattern = site_config["news_pattern"]
+    max_clicks = site_config["max_clicks"]
+    step = site_config.get("xhr_page_step", 1)
+    concurrency = max(1, site_config.get("xhr_concurrency", 8))
+
+    try:
+        await page.goto(category_url, timeout=goto_timeout, wait_until="domcontentloaded")
+    except Exception as e:
+        print(f"> Timeout/Error en goto category {category_url}: {e}")
+        return set()
+
+    recorded = None
+    if max_clicks > 0:
+        try:
+            recorded = await record_loadmore_request(
+                page, site_config["load_more_selector"], site_config.get("xhr_page_param"), news_pattern
+            )
+        except Exception as e:
+            send_error(category_url, e, f"Error al grabar request 'cargar más' en {category_url}")
+
+    # Páginas 1 y 2 ya están en el DOM
+    news_links = await harvest_links(page, news_pattern)
+    if recorded is None:
+        return news_links
+
+    cookies = "; ".join(f"{c['name']}={c['value']}" for c in await page.context.cookies(category_url))
+    http = session.http()
+
+    next_page = 3
+    last_page = max_clicks + 1
+    while next_page <= last_page:
+        batch = range(next_page, min(next_page + concurrency, last_page + 1))
+        next_page = batch[-1] + 1
+        results = await asyncio.gather(
+            *(_fetch_page(http, recorded, n, step, cookies, category_url, news_pattern) for n in batch),
+            return_exceptions=True,
+        )
+
+        new_links = set()
+        for result in results:
+            if isinstance(result, Exception):
+                send_error(category_url, result, f"Error al pedir página XHR en {category_url}")
+                continue
+            new_links.update(result - news_links)
+
+        if not new_links:
+            break
+        news_links.update(new_links)
+
+    return news_links
@@ -0,0 +1,49 @@
+import csv
+import glob
+import os
+import sys
+
+"""
+Reporte de canonicalización sobre los inventarios Crawler/*.csv: cuántos
+links distintos hay antes y después de aplicar utils/url_canon.py, es
+decir, cuántos scrapes duplicados se evitan.
+
+Uso: python Crawler/report_url_canon.py
+"""
+
+CRAWLER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Agregar el directorio raíz al path para importar utils/
+sys.path.append(os.path.abspath(os.path.join(CRAWLER_DIR, "..")))
+from utils.url_canon import canonicalize_url
+
+
+def main():
+    total_duplicados = 0
+
+    for path in sorted(glob.glob(os.path.join(CRAWLER_DIR, "*.csv"))):
+        medio = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            links = [row[1] for row in csv.reader(f) if len(row) >= 2]
+
+        canonicos = {}
+        for link in links:
+            canonicos.setdefault(canonicalize_url(link, medio), []).append(link)
+
+        distintos = len(set(links))
+        duplicados = distintos - len(canonicos)
+        modificados = sum(1 for link in set(links) if canonicalize_url(link, medio) != link)
+        total_duplicados += duplicados
+
+        print(f"{medio}: {len(links)} filas, {distintos} links distintos, "
+              f"{len(canonicos)} canónicos -> {duplicados} scrapes duplicados evitados "
+              f"({modificados} links reescritos)")
+        for canonico, variantes in canonicos.items():
+            if len(set(variantes)) > 1:
+                print(f"  {canonico} <- {sorted(set(variantes))}")
+
+    print(f"Total scrapes duplicados evitados: {total_duplicados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+from urllib.parse import urlsplit
+
+# Tipos de recurso que nunca se necesitan para encontrar links
+BLOCKED_RESOURCE_TYPES = ("image", "stylesheet", "font", "media")
+
+# Dominios de publicidad, analítica y redes sociales que se bloquean
+# siempre (se bloquean también todos sus subdominios)
+BLOCKED_DOMAINS = [
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "googletagservices.com",
+    "googletagmanager.com", "google-analytics.com", "adservice.google.com", "2mdn.net",
+    "amazon-adsystem.com", "adnxs.com", "criteo.com", "criteo.net", "rubiconproject.com",
+    "pubmatic.com", "openx.net", "casalemedia.com", "smartadserver.com", "teads.tv",
+    "taboola.com", "outbrain.com", "mgid.com", "scorecardresearch.com", "chartbeat.com",
+    "chartbeat.net", "comscore.com", "quantserve.com", "hotjar.com", "newrelic.com",
+    "nr-data.net", "segment.io", "mixpanel.com", "facebook.net", "facebook.com",
+    "twitter.com", "x.com", "twimg.com", "instagram.com", "tiktok.com", "linkedin.com",
+    "onesignal.com", "pushwoosh.com", "disqus.com", "youtube.com", "ytimg.com", "spotify.com",
+]
+
+
+def _host_suffixes(host):
+    '''
+    "a.b.ejemplo.cl" -> "a.b.ejemplo.cl", "b.ejemplo.cl", "ejemplo.cl", "cl"
+    '''
+    labels = host.split(".")
+    return (".".join(labels[i:]) for i in range(len(labels)))
+
+
+class DomainMatcher:
+    '''
+    Conjunto de dominios que también calza con sus subdominios. La
+    consulta recorre los sufijos del host (uno por etiqueta) contra un
+    set, sin expresiones regulares ni recorrer la lista completa.
+    '''
+
+    def __init__(self, domains=()):
+        self._domains = {d.strip().lower().lstrip(".") for d in domains if d.strip()}
+
+    def __contains__(self, host):
+        return any(suffix in self._domains for suffix in _host_suffixes(host))
+
+    def __len__(self):
+        return len(self._domains)
+
+
+def read_domain_list(path):
+    '''
+    Lee una lista de dominios, uno por línea (admite formato hosts
+    "0.0.0.0 dominio" y comentarios con #)
+    '''
+    domains = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.split("#", 1)[0].split()
+            if fields:
+                domains.append(fields[-1])
+    return domains
+
+
+class RequestFilter:
+    '''
+    Decide qué requests deja pasar Chromium al crawlear un sitio:
+        - se bloquean los tipos de recurso de `BLOCKED_RESOURCE_TYPES`,
+        - se permite todo lo del dominio del sitio (y sus subdominios),
+        - se permiten los hosts de `allowed_hosts` (scripts de terceros
+          que el sitio necesita, p.ej. el endpoint de "cargar más"),
+        - se bloquean los dominios de `BLOCKED_DOMAINS` (o de
+          `blocklist_file`),
+        - con `block_third_party` se bloquea además cualquier otro
+          tercero. Está apagado por defecto: un sitio que carga su
+          listado desde un CDN o una API en otro dominio quedaría sin
+          links sin ningún error; al activarlo, esos hosts deben ir en
+          `allowed_hosts`.
+    `decide` retorna el motivo: "permitida", "tipo", "lista" o "tercero".
+    '''
+
+    def __init__(self, site_domain, allowed_hosts=(), blocklist_file=None, block_third_party=False):
+        self.site = DomainMatcher([site_domain])
+        self.allowed = DomainMatcher(allowed_hosts)
+        blocked = list(BLOCKED_DOMAINS)
+        if blocklist_file and os.path.exists(blocklist_file):
+            blocked += read_domain_list(blocklist_file)
+        self.blocked = DomainMatcher(blocked)
+        self.block_third_party = block_third_party
+
+    @classmethod
+    def for_site(cls, site_config):
+        '''
+        Filtro según la configuración del sitio en SITES
+        '''
+        host = urlsplit(site_config["start_url"]).hostname or ""
+        site_domain = host[4:] if host.startswith("www.") else host
+        return cls(
+            site_domain,
+            site_config.get("allowed_script_hosts", []),
+            site_config.get("blocklist_file"),
+            site_config.get("block_third_party", False),
+        )
+
+    def decide(self, url, resource_type):
+        if resource_type in BLOCKED_RESOURCE_TYPES:
+            return "tipo"
+        host = (urlsplit(url).hostname or "").lower()
+        if not host or host in self.site or host in self.allowed:
+            return "permitida"
+        if host in self.blocked:
+            return "lista"
+        return "tercero" if self.block_third_party else "permitida"
@@ -0,0 +1,157 @@
+import re
+from datetime import datetime
+from typing import NamedTuple
+
+REWRITE_CACHE_SIZE = 10_000  # categorías reescritas en caché por medio
+
+# Segmento de path que no es un año (AAAA): las categorías se detienen
+# en la fecha del artículo
+CATEGORY_SEGMENT = r"(?![0-9]{4}(?:/|$))[^/]+"
+
+# Reglas de clasificación de URLs de noticias por medio (mismas claves
+# que SITES en crawler.py). Cada regla se compila al importar el módulo:
+#   - domain: el link pertenece al medio si contiene este texto.
+#   - patterns: lista de regex (se aplican con search, en orden) con
+#     grupos nombrados opcionales category, year, month, day y slug. Cada
+#     grupo toma el valor del primer pattern que lo entrega; un pattern
+#     cuyos grupos ya se obtuvieron no se aplica.
+#   - category_rewrites: lista de (regex, reemplazo) aplicados en orden
+#     sobre la categoría extraída.
+#   - default_category: categoría si los patterns no entregan una; con
+#     None se usa la categoría de la página crawleada (page_category).
+#   - page_category: regex con grupo category que obtiene, desde la URL
+#     de la página de categoría crawleada, la categoría por defecto de
+#     sus links; None si el medio no la usa.
+URL_RULES = {
+    "biobiochile": {
+        "domain": "biobiochile.cl",
+        "patterns": [
+            # Fecha y slug del artículo: /AAAA/MM/DD/slug.shtml
+            r"/(?P<year>[0-9]{4})/(?P<month>[0-9]{2})/(?P<day>[0-9]{2})/+(?P<slug>[^/?#.]+)",
+            # Categoría: hasta 3 segmentos tras /especial/ o, si no hay
+            # /especial/, tras /noticias/
+            rf"/especial/+(?P<category>(?:{CATEGORY_SEGMENT})?(?:/+{CATEGORY_SEGMENT}){{0,2}})",
+            rf"/noticias/+(?P<category>(?:{CATEGORY_SEGMENT})?(?:/+{CATEGORY_SEGMENT}){{0,2}})",
+        ],
+        "category_rewrites": [
+            (r"/{2,}", "/"),                                            # segmentos vacíos
+            (r"(?i)^biobiochile(?:/|$)", ""),                           # sección "biobiochile" no es categoría
+            (r"(?i)^([^/]+)/noticias(?=/|$)", r"\1"),                   # /especial/x/noticias/... -> x
+            (r"(?i)^noticias-patrocinadas(?:/.*)?$", "noticias-patrocinadas"),
+        ],
+        "default_category": None,
+        # Último segmento de la página de categoría: /lista/categorias/nacional -> nacional
+        "page_category": r"(?P<category>[^/]+)/*$",
+    },
+    "latercera": {
+        "domain": "latercera.com",
+        "patterns": [
+            # Slug: segmento tras /noticia/
+            r"/noticia/(?P<slug>[^/?#]+)",
+            # Categoría: primer segmento del path
+            r"^[^:/?#]+://[^/?#]*/+(?P<category>[^/?#]+)",
+        ],
+        "category_rewrites": [],
+        "default_category": "sin-categoria",
+        "page_category": None,
+    },
+}
+
+
+def url_has_dates(medio):
+    '''
+    Indica si los links de `medio` traen su fecha de publicación en la URL
+    (grupo year en los patterns de su regla)
+    '''
+    rule = URL_RULES.get(medio)
+    return rule is not None and any("year" in re.compile(pattern).groupindex for pattern in rule["patterns"])
+
+
+class UrlInfo(NamedTuple):
+    category: str | None
+    date: datetime | None
+    slug: str | None
+
+
+class UrlClassifier:
+    '''
+    Clasificador de links de noticias según reglas declarativas
+    (`URL_RULES`). Compila una sola vez cada regla y extrae con sus
+    patterns (búsquedas de regex simples, sin backtracking entre
+    segmentos) la categoría, fecha de publicación y slug del artículo
+    de cada link. Las reescrituras de categoría se guardan en caché.
+    '''
+
+    def __init__(self, rules):
+        self.rules = [
+            (
+                rule["domain"],
+                [(re.compile(pattern), set(re.compile(pattern).groupindex)) for pattern in rule["patterns"]],
+                [(re.compile(pattern), repl) for pattern, repl in rule.get("category_rewrites", [])],
+                rule.get("default_category"),
+                re.compile(rule["page_category"]) if rule.get("page_category") else None,
+                {},  # caché categoría extraída -> reescrita (hay pocas categorías distintas)
+            )
+            for rule in rules.values()
+        ]
+
+    def classify(self, link, default=None):
+        '''
+        Entrega UrlInfo(category, date, slug) de `link`. Si el link no
+        es de ningún medio configurado, o su regla no entrega categoría,
+        la categoría es `default`.
+        '''
+        for domain, patterns, rewrites, default_category, _, rewritten in self.rules:
+            if domain not in link:
+                continue
+            groups = {}
+            for pattern, names in patterns:
+                if names <= groups.keys():
+                    continue
+                match = pattern.search(link)
+                if match is not None:
+                    for name, value in match.groupdict().items():
+                        if value is not None:
+                            groups.setdefault(name, value)
+
+            extracted = groups.get("category") or ""
+            category = rewritten.get(extracted)
+            if category is None:
+                category = extracted.rstrip("/")
+                for rewrite, repl in rewrites:
+                    category = rewrite.sub(repl, category)
+                if len(rewritten) >= REWRITE_CACHE_SIZE:
+                    rewritten.clear()
+                rewritten[extracted] = category
+
+            date = None
+            if groups.get("year"):
+                try:
+                    date = datetime(int(groups["year"]), int(groups["month"]), int(groups["day"]))
+                except ValueError:
+                    pass
+
+            return UrlInfo(category or default_category or default, date, groups.get("slug"))
+        return UrlInfo(default, None, None)
+
+    def page_category(self, page_url):
+        '''
+        Categoría por defecto de los links hallados en la página de
+        categoría `page_url`, según `page_category` de la regla de su
+        medio. Cadena vacía si el medio no la usa.
+        '''
+        for domain, _, _, _, page_pattern, _ in self.rules:
+            if domain not in page_url:
+                continue
+            match = page_pattern.search(page_url) if page_pattern is not None else None
+            return match.group("category") if match is not None else ""
+        return ""
+
+    def classify_many(self, links, default=None):
+        '''
+        Clasifica en bloque: entrega {link: UrlInfo}
+        '''
+        return {link: self.classify(link, default) for link in links}
+
+
+url_classifier = UrlClassifier(URL_RULES)
@@ -15,7 +15,12 @@ planner_channel.queue_declare(queue=SEND_DATA_QUEUE, durable=False, auto_delete=
 def callback(ch, method, properties, body):
     message = json.loads(body)
     print(message)
-    print(f"Mensaje recibido en send_data: {message}")
+    # Solo índice: campos de la tarjeta del listado, el resto en None. El
+    # scraping completo posterior de la misma url los reemplaza
+    if message.get("index_only"):
+        print(f"Noticia solo índice (parcial) recibida en send_data: {message.get('url')}")
+    else:
+        print(f"Mensaje recibido en send_data: {message}")
     print("=============================================")
     ch.basic_ack(delivery_tag=method.delivery_tag)
 
@@ -0,0 +1,165 @@
+import argparse
+import csv
+import os
+import time
+import tracemalloc
+from sys import exit
+
+import scraper.scraper_biobio as biobio
+import scraper.scraper_latercera as latercera
+from scraper.html_parser import BACKENDS, DEFAULT_BACKEND, parse_html, scope_html
+
+
+DIRECCION_FIXTURES = "scraper/fixtures/"
+# Fixtures versionados (casos borde de los tests), para reproducir la equivalencia
+DIRECCION_FIXTURES_TESTS = "tests/fixtures/scraper/"
+DIRECCIONES_CRAWLER = {
+    "biobio": "Crawler/biobiochile.csv",
+    "latercera": "Crawler/latercera.csv"
+}
+
+MEDIOS_DISPONIBLES = {
+    "biobio": biobio,
+    "latercera": latercera
+}
+
+
+def descargar_fixtures(medio: str, cantidad: int):
+    """
+    Guarda el HTML de las primeras `cantidad` noticias del output del crawler
+    en scraper/fixtures/<medio>/, para que todos los backends se midan sobre
+    los mismos artículos.
+    """
+
+    with open(DIRECCIONES_CRAWLER[medio], "r", newline = "", encoding = "utf-8") as f:
+        lista_url = [linea[1] for linea in csv.reader(f) if linea]
+
+    directorio = os.path.join(DIRECCION_FIXTURES, medio)
+    os.makedirs(directorio, exist_ok = True)
+    session = MEDIOS_DISPONIBLES[medio].HTTP_SESSION
+
+    for index, url in enumerate(lista_url[:cantidad], start = 1):
+        try:
+            response = session.get(url, timeout = 10)
+            response.raise_for_status()
+            with open(os.path.join(directorio, f"{index:04d}.html"), "wb") as f:
+                f.write(response.content)
+            print(f"Fixture {index} descargado: {url}")
+        except Exception as e:
+            print(f"Error al descargar la url n° {index}\n\t-> {e}")
+
+
+def cargar_fixtures(medio: str, direccion: str = DIRECCION_FIXTURES) -> dict:
+    directorio = os.path.join(direccion, medio)
+    if not os.path.isdir(directorio):
+        return {}
+
+    fixtures = {}
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.endswith(".html"):
+            with open(os.path.join(directorio, nombre), "r", encoding = "utf-8", errors = "replace") as f:
+                fixtures[nombre] = f.read()
+    return fixtures
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """
+    Mejor tiempo (ms) de `repeticiones` ejecuciones
+    """
+
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        duracion = (time.perf_counter() - inicio) * 1000
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+def memoria_pico(funcion) -> int:
+    """
+    Memoria máxima (KB) reservada desde Python durante `funcion` (no incluye
+    la memoria interna de lxml, reservada en C)
+    """
+
+    tracemalloc.start()
+    try:
+        funcion()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main(medio: str, backends: list, repeticiones: int = 3, direccion: str = DIRECCION_FIXTURES):
+
+    scraper = MEDIOS_DISPONIBLES[medio]
+    fixtures = cargar_fixtures(medio, direccion)
+    if not fixtures:
+        print(f"Error: No hay fixtures en {os.path.join(direccion, medio)}/\nHint: Ejecutar primero con --descargar <n>, o usar --fixtures {DIRECCION_FIXTURES_TESTS}.")
+        exit(1)
+
+    # Output de referencia: el backend actual, con el documento completo
+    referencia = {
+        nombre: scraper.parse_news_article(html, parser = DEFAULT_BACKEND, scoped = False)
+        for nombre, html in fixtures.items()
+    }
+
+    # Parseo completo y, si el plan del medio lo tiene, acotado a las regiones del artículo
+    regiones = scraper.EXTRACTION_PLAN.regions
+    modos = [False, True] if regiones is not None else [False]
+
+    resultados = {}
+    for backend in backends:
+        for acotado in modos:
+            if acotado:
+                parsear = lambda html: parse_html(scope_html(html, regiones) or html, backend)
+            else:
+                parsear = lambda html: parse_html(html, backend)
+
+            parseo = extraccion = memoria = 0.0
+            diferencias = []
+            for nombre, html in fixtures.items():
+                parseo += medir(lambda: parsear(html), repeticiones)
+                extraccion += medir(lambda: scraper.parse_news_article(html, parser = backend, scoped = acotado), repeticiones)
+                memoria += memoria_pico(lambda: parsear(html))
+
+                output = scraper.parse_news_article(html, parser = backend, scoped = acotado)
+                campos = [campo for campo in referencia[nombre] if output.get(campo) != referencia[nombre][campo]]
+                if campos:
+                    diferencias.append((nombre, campos))
+
+            etiqueta = f"{backend} acotado" if acotado else backend
+            resultados[etiqueta] = (parseo / len(fixtures), extraccion / len(fixtures), memoria / len(fixtures), diferencias)
+
+    base = resultados.get(DEFAULT_BACKEND, (None, None))[1]
+    print(f"\n{len(fixtures)} artículos de {medio}, mejor de {repeticiones} repeticiones\n")
+    print(f"{'backend':<20} {'parseo ms':>10} {'total ms':>10} {'memoria KB':>11} {'speedup':>8} {'equivalentes':>13}")
+    for etiqueta, (parseo, total, memoria, diferencias) in resultados.items():
+        speedup = f"{base / total:.2f}x" if base else "-"
+        equivalentes = f"{len(fixtures) - len(diferencias)}/{len(fixtures)}"
+        print(f"{etiqueta:<20} {parseo:>10.2f} {total:>10.2f} {memoria:>11.0f} {speedup:>8} {equivalentes:>13}")
+
+    for etiqueta, (_, _, _, diferencias) in resultados.items():
+        for nombre, campos in diferencias:
+            print(f"[{etiqueta}] {nombre} difiere de {DEFAULT_BACKEND} en: {', '.join(campos)}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "Ejecución:\n\tpython.exe bench_parser.py --medio <str> --descargar <int> --backends <str> ...")
+    parser.add_argument("--medio", type = str, default = None, help = "Nombre del medio de prensa\nOpciones:\n\t- BioBioChile -> biobio\n\t- La Tercera -> latercera")
+    parser.add_argument("--descargar", type = int, default = None, help = "Descargar primero el HTML de las n primeras noticias del .csv del crawler como fixtures")
+    parser.add_argument("--backends", nargs = "+", default = list(BACKENDS), choices = BACKENDS, help = "Backends de parseo a comparar")
+    parser.add_argument("--fixtures", type = str, default = DIRECCION_FIXTURES, help = f"Directorio de fixtures por medio (descargados: {DIRECCION_FIXTURES}, versionados: {DIRECCION_FIXTURES_TESTS})")
+    parser.add_argument("--repeticiones", type = int, default = 3, help = "Repeticiones por artículo (se toma el mejor tiempo)")
+
+    args = parser.parse_args()
+
+    if args.medio not in MEDIOS_DISPONIBLES:
+        print(f"Error: Ingrese un medio válido\nMedios disponibles:\n\t-> { [key for key in MEDIOS_DISPONIBLES.keys()] }")
+        exit(1)
+
+    if args.descargar:
+        descargar_fixtures(args.medio, args.descargar)
+
+    main(medio = args.medio, backends = args.backends, repeticiones = args.repeticiones, direccion = args.fixtures)
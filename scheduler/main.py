@@ -5,21 +5,24 @@ from scheduler.scheduler import Scheduler
 """
 ************************
 Ejecutar desde la raíz del repositorio como
-python -m scheduler.main <medio> <cantidad_de_scrapers>
+python -m scheduler.main <medio> <cantidad_de_scrapers> [run_id]
+(con run_id el crawler guarda un checkpoint por categoría y, si una
+ejecución anterior con el mismo run_id se interrumpió, la reanuda)
 ************************
 """
 
 
 def main():
-    if len(sys.argv) != 3:
+    if len(sys.argv) not in (3, 4):
         print(
-            "Se debe ejecutar con python -m scheduler.main <medio> <cantidad_de_scrapers>"
+            "Se debe ejecutar con python -m scheduler.main <medio> <cantidad_de_scrapers> [run_id]"
         )
         sys.exit(1)
 
     medio = sys.argv[1]
     n_scrapers = int(sys.argv[2])
-    scheduler = Scheduler(medio, n_scrapers)
+    run_id = sys.argv[3] if len(sys.argv) == 4 else None
+    scheduler = Scheduler(medio, n_scrapers, run_id)
     try:
         scheduler.run()
     except KeyboardInterrupt:
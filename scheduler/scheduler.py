@@ -1,3 +1,4 @@
+import os
 import signal
 import time
 from datetime import datetime as dtime
@@ -12,9 +13,10 @@ from utils.config_scrapers import SCRAPER_MAP
 
 
 class Scheduler:
-    def __init__(self, medio, n_scrapers):
+    def __init__(self, medio, n_scrapers, run_id=None):
         self._medio: str = medio
         self._n_scrapers: int = n_scrapers
+        self._run_id: str | None = run_id  # checkpoint/reanudación del crawler
         self._running: bool = True
         self._working_batch_id: int = int(dtime.now().timestamp())
 
@@ -76,6 +78,8 @@ class Scheduler:
         self._stage = SchedulerStages.START_CRAWLER
         ruta_crawler = ev.get_environ_var("CRAWLER")
         args = [self._medio]
+        if self._run_id:
+            args += ["--run-id", self._run_id]
         self._proc_crawler = self._process_manager.launch_script(
             ruta_crawler, "Crawler", args
         )
@@ -89,14 +93,48 @@ class Scheduler:
         initialize_scraper_progress(self._medio)
 
         ruta_scraper = self._get_scraper_module()
+        inflight = self._get_scraper_inflight()
+        parse_workers = self._get_scraper_parse_workers()
         for i in range(self._n_scrapers):
             scraper_id = i + 1
-            proc = self._process_manager.launch_module(
-                ruta_scraper, f"Scraper {scraper_id}"
-            )
+            if inflight > 0:
+                # Worker asíncrono: varias descargas en vuelo por proceso
+                proc = self._process_manager.launch_module(
+                    ev.get_environ_var("SCRAPER_ASYNC"),
+                    f"Scraper {scraper_id}",
+                    [
+                        ruta_scraper,
+                        "--inflight", str(inflight),
+                        "--parse-workers", str(parse_workers),
+                    ],
+                )
+            else:
+                proc = self._process_manager.launch_module(
+                    ruta_scraper, f"Scraper {scraper_id}"
+                )
             if proc:
                 self._proc_scrapers[scraper_id] = proc
 
+    def _get_scraper_inflight(self):
+        """
+        Descargas en vuelo por proceso scraper (SCRAPER_INFLIGHT).
+        0 o sin definir lanza los scrapers síncronos.
+        """
+        try:
+            return int(ev.get_environ_var("SCRAPER_INFLIGHT"))
+        except (OSError, ValueError):
+            return 0
+
+    def _get_scraper_parse_workers(self):
+        """
+        Procesos de extracción por worker asíncrono (SCRAPER_PARSE_WORKERS).
+        Sin definir, los núcleos se reparten entre los scrapers.
+        """
+        try:
+            return int(ev.get_environ_var("SCRAPER_PARSE_WORKERS"))
+        except (OSError, ValueError):
+            return max(1, (os.cpu_count() or 1) // max(1, self._n_scrapers))
+
     def _get_scraper_module(self):
         """
         Busca en el mapa importado la clave
@@ -123,7 +123,88 @@ def get_queue_details(queue_name="scraper_queue"):
     return None
 
 
-def wait_for_scraper_queue_empty(proc_scrapers, medio, running_flag):
+CRAWLER_PROGRESS_FILE = "metrics/crawler_progress.json"
+CRAWLER_OUTPUT_FORMATS = ("csv", "jsonl")
+
+
+CRAWLER_RUNNING_STATUS = ("starting", "running")
+
+
+def read_crawler_progress(medio, run_id=None):
+    """
+    crawler_progress.json si es de `medio` y de la ejecución `run_id`
+    (None si el crawler corrió sin --run-id); si no, None
+    """
+    if not os.path.exists(CRAWLER_PROGRESS_FILE):
+        return None
+    try:
+        with open(CRAWLER_PROGRESS_FILE, "r", encoding="utf-8") as f:
+            progress = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if progress.get("sitio") != medio or progress.get("run_id") != run_id:
+        return None
+    return progress
+
+
+def crawl_running(progress):
+    """
+    Indica si el progreso (de read_crawler_progress) es de un crawl en curso
+    """
+    return progress is not None and progress.get("status") in CRAWLER_RUNNING_STATUS
+
+
+def crawler_inventory_path(medio, progress=None):
+    """
+    Inventario del crawler para `medio`: la ruta que reporta el crawler en
+    crawler_progress.json (según su `output_format`) o, si no la trae, el
+    primer Crawler/{medio}.{csv,jsonl} existente. El inventario parcial
+    (.part) se prefiere solo mientras `progress` indica que el crawl corre;
+    si no, un .part es de un crawl interrumpido y se usa solo si no hay
+    inventario final. None si no hay inventario
+    """
+    paths = [f"Crawler/{medio}.{fmt}" for fmt in CRAWLER_OUTPUT_FORMATS]
+    if progress and progress.get("inventario"):
+        paths.insert(0, progress["inventario"])
+    running = crawl_running(progress)
+    for path in paths:
+        candidates = (path + ".part", path) if running else (path, path + ".part")
+        for candidate in candidates:
+            if os.path.exists(candidate):
+                return candidate
+    return None
+
+
+def count_inventory_rows(path):
+    """
+    Links de un inventario del crawler (CSV categoria,url o JSONL), sin encabezado
+    """
+    import csv
+
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if ".jsonl" in os.path.basename(path):
+            return sum(1 for line in f if line.strip())
+        return sum(1 for row in csv.reader(f) if len(row) >= 2)
+
+
+def expected_crawler_urls(medio, run_id=None):
+    """
+    URLs que los scrapers deberían procesar. Son las que el crawler
+    confirmó en scraper_queue (`urls_encoladas` de crawler_progress.json),
+    no el inventario completo, que también trae los links omitidos por el
+    registro persistente. Si el progreso es de otro medio u otra ejecución
+    (`run_id`) o no trae el dato, se cuentan las filas del inventario
+    """
+    progress = read_crawler_progress(medio, run_id)
+
+    if progress is not None and progress.get("urls_encoladas") is not None:
+        return progress["urls_encoladas"]
+
+    path = crawler_inventory_path(medio, progress)
+    return count_inventory_rows(path) if path else 0
+
+
+def wait_for_scraper_queue_empty(proc_scrapers, medio, running_flag, run_id=None):
     """
     Espera a que la cola de scraper esté vacía (scrapers terminaron de procesar).
 
@@ -131,6 +212,7 @@ def wait_for_scraper_queue_empty(proc_scrapers, medio, running_flag):
         proc_scrapers: Lista de procesos scraper
         medio: Nombre del medio (biobiochile, latercera)
         running_flag: Referencia al flag self._running del scheduler
+        run_id: Ejecución del crawler (--run-id), None si corrió sin ella
     """
     try:
         import pika
@@ -197,23 +279,16 @@ def wait_for_scraper_queue_empty(proc_scrapers, medio, running_flag):
                         print(
                             "Scheduler: Verificando que scrapers terminaron de procesar..."
                         )
-                        crawler_file = f"Crawler/{medio}.csv"
                         scraper_progress_file = "metrics/scraper_progress.json"
 
                         urls_crawler = 0
                         urls_procesadas = 0
 
                         try:
-                            import csv
-
-                            if os.path.exists(crawler_file):
-                                with open(crawler_file, "r", encoding="utf-8") as f:
-                                    urls_crawler = (
-                                        sum(1 for _ in csv.reader(f)) - 1
-                                    )  # -1 por header
-                                print(
-                                    f"Scheduler: Crawler encontró {urls_crawler} URLs"
-                                )
+                            urls_crawler = expected_crawler_urls(medio, run_id)
+                            print(
+                                f"Scheduler: Crawler encoló {urls_crawler} URLs"
+                            )
 
                             if os.path.exists(scraper_progress_file):
                                 with open(
@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import functools
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime as dtime
+
+import aiohttp
+import pika
+
+# Agregar el directorio raíz al path ANTES de los imports
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.stop_signal_handler import StopSignalHandler
+from utils.url_canon import canonicalize_url
+from scraper.scraping_utils import article_from_card
+
+"""
+************************
+Worker asíncrono de scraping: un solo proceso mantiene hasta `--inflight`
+descargas de artículos en vuelo, en vez de una por proceso.
+Ejecutar desde la raíz del repositorio como
+python -m scraper.async_worker <modulo_scraper> [--inflight N] [--parse-workers N] [--buffer N]
+Ej: python -m scraper.async_worker scraper.scraper_biobio --inflight 16
+************************
+"""
+
+SCRAPER_QUEUE = "scraper_queue"
+LOG_QUEUE = "scraping_log_queue"
+SEND_DATA_QUEUE = "send_data_queue"
+
+DEFAULT_INFLIGHT = 16
+FETCH_TIMEOUT = 10  # segundos, igual que HTTP_SESSION.get en los scrapers
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0"}
+REPORT_INTERVAL = 30  # segundos entre reportes de las etapas del pipeline
+PARSE_ATTEMPTS = 2  # intentos de extracción por artículo si un proceso del pool muere
+
+
+def parse_article(scraper_name, html, known):
+    """
+    Etapa de extracción, ejecutada en un proceso del pool: importa el
+    módulo scraper del medio (una vez por proceso) y extrae la noticia
+    desde los bytes descargados. Retorna (noticia o excepción, contadores
+    del plan de extracción): los procesos del pool no ejecutan atexit, así
+    que sus contadores se devuelven con cada artículo
+    """
+    scraper = importlib.import_module(scraper_name)
+    try:
+        result = scraper.parse_news_article(html.decode("utf-8", errors="replace"), validate=True, known=known)
+    except Exception as e:
+        result = e
+    plan = getattr(scraper, "EXTRACTION_PLAN", None)
+    return result, plan.take_stats() if plan is not None else None
+
+
+class StageStats:
+    """
+    Métricas de una etapa del pipeline: artículos procesados, tiempo
+    ocupado y profundidad de la cola de entrada
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.items = 0
+        self.busy = 0.0
+        self.depth = 0
+        self.max_depth = 0
+
+    def observe(self, depth):
+        self.depth = depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def record(self, seconds):
+        self.items += 1
+        self.busy += seconds
+
+    def stats(self, elapsed):
+        return {
+            "procesados": self.items,
+            "ocupado_s": round(self.busy, 2),
+            "utilizacion": round(self.busy / (elapsed * self.capacity), 3) if elapsed > 0 else 0,
+            "cola": self.depth,
+            "cola_max": self.max_depth,
+        }
+
+
+class AsyncScraperWorker:
+    """
+    Consume `scraper_queue` con una ventana de prefetch de `inflight`
+    mensajes. Cada mensaje se descarga con aiohttp en un event loop propio
+    (hilo aparte) y se extrae con `parse_news_article` del módulo scraper
+    del medio. El resultado vuelve al hilo de pika con
+    `add_callback_threadsafe` (pika no es thread-safe), donde se publica
+    con `finish_article` y recién entonces se hace el ack del mensaje.
+
+    Con `parse_workers` > 0 funciona como pipeline de dos etapas: la
+    etapa de red deja el HTML descargado en una cola acotada (`buffer`
+    artículos, si se llena las descargas esperan) y un pool de
+    `parse_workers` procesos lo extrae, de modo que descargar y parsear
+    no se bloquean entre sí. Cada etapa reporta su cola y tiempo ocupado
+    en `metrics/scraper_pipeline_{pid}.json`.
+
+    Si un proceso del pool muere (BrokenProcessPool), el pool se recrea y
+    el artículo se reintenta; si vuelve a fallar, el mensaje se devuelve a
+    la cola (nack) la primera vez en vez de darlo por procesado.
+    """
+
+    def __init__(self, scraper, inflight=DEFAULT_INFLIGHT, parse_workers=0, buffer=None):
+        self.scraper = scraper
+        self.inflight = max(1, inflight)
+        self.parse_workers = max(0, parse_workers)
+        self.buffer = buffer or 2 * max(1, self.parse_workers)
+        self.pending = 0
+        self.processed = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._http = None
+        self._pool = None
+        self._parse_queue = None
+        self._fetching = 0
+        self._started = time.monotonic()
+        self.fetch_stats = StageStats(self.inflight)
+        self.parse_stats = StageStats(max(1, self.parse_workers))
+        self.pool_restarts = 0
+        self.connection = None
+        self.channel = None
+
+    async def _start(self):
+        connector = aiohttp.TCPConnector(limit=self.inflight)
+        self._http = aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS)
+        if self.parse_workers:
+            self._pool = self._new_pool()
+            self._parse_queue = asyncio.Queue(maxsize=self.buffer)
+            for _ in range(self.parse_workers):
+                asyncio.ensure_future(self._parse_stage())
+        asyncio.ensure_future(self._report_stages())
+
+    def _new_pool(self):
+        # spawn: el proceso ya tiene hilos (event loop), no conviene fork
+        return ProcessPoolExecutor(self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_pool(self, broken):
+        """
+        Recrea el pool tras la muerte de uno de sus procesos. Varios
+        consumidores pueden ver el mismo pool roto: solo el primero lo reemplaza
+        """
+        if self._pool is not broken:
+            return
+        print("[Scraper async] Un proceso de extracción murió, recreando el pool...")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+        self.pool_restarts += 1
+
+    async def _fetch(self, url):
+        timeout = aiohttp.ClientTimeout(total=FETCH_TIMEOUT)
+        self._fetching += 1
+        self.fetch_stats.observe(self._fetching)
+        started = time.monotonic()
+        try:
+            async with self._http.get(url, timeout=timeout) as response:
+                response.raise_for_status()
+                return await response.read()
+        finally:
+            self._fetching -= 1
+            self.fetch_stats.observe(self._fetching)
+            self.fetch_stats.record(time.monotonic() - started)
+
+    async def _parse(self, html, card):
+        """
+        Extrae la noticia: en el event loop si no hay pool, o a través
+        de la cola acotada de la etapa de extracción
+        """
+        if self._pool is None:
+            # Los scrapers fuerzan utf-8 (response.encoding = "utf-8")
+            html = html.decode("utf-8", errors="replace")
+            return self.scraper.parse_news_article(html, validate=True, known=card)
+
+        result = self._loop.create_future()
+        await self._parse_queue.put((html, card, result))
+        self.parse_stats.observe(self._parse_queue.qsize())
+        result = await result
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _parse_stage(self):
+        """
+        Consumidor de la etapa de extracción (uno por proceso del pool)
+        """
+        while True:
+            html, card, result = await self._parse_queue.get()
+            self.parse_stats.observe(self._parse_queue.qsize())
+            started = time.monotonic()
+            for _ in range(PARSE_ATTEMPTS):
+                pool = self._pool
+                try:
+                    value, plan_stats = await self._loop.run_in_executor(
+                        pool, parse_article, self.scraper.__name__, html, card
+                    )
+                except BrokenProcessPool as e:
+                    self._replace_pool(pool)
+                    value = e
+                    continue
+                except Exception as e:
+                    value = e
+                    break
+                plan = getattr(self.scraper, "EXTRACTION_PLAN", None)
+                if plan is not None:
+                    plan.merge_stats(plan_stats)
+                break
+            self.parse_stats.record(time.monotonic() - started)
+            result.set_result(value)
+
+    def stage_stats(self):
+        elapsed = time.monotonic() - self._started
+        stages = {"descarga": self.fetch_stats.stats(elapsed)}
+        if self._pool is not None:
+            stages["extraccion"] = self.parse_stats.stats(elapsed)
+            stages["extraccion"]["reinicios_pool"] = self.pool_restarts
+        return stages
+
+    async def _report_stages(self):
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            self._write_stage_stats()
+
+    def _write_stage_stats(self):
+        stages = self.stage_stats()
+        print(f"[Scraper async] Etapas: {stages}")
+        os.makedirs("metrics", exist_ok=True)
+        path = f"metrics/scraper_pipeline_{os.getpid()}.json"
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {"scraper": self.scraper.__name__, "etapas": stages},
+                f, ensure_ascii=False, indent=2,
+            )
+        os.replace(path + ".tmp", path)
+
+    async def _scrape(self, body):
+        """
+        Descarga y extrae un artículo. Retorna los argumentos de
+        `finish_article` (sin el canal)
+        """
+        starting_time = dtime.now()
+        mensaje = {}
+        url = ""
+        index_only = False
+        try:
+            mensaje = json.loads(body)
+            url = canonicalize_url(mensaje["url"], mensaje.get("medio"))
+            card = mensaje.get("card")
+            index_only = bool(mensaje.get("index_only") and card)
+            if index_only:
+                scraper_results = article_from_card(card, self.scraper.ARTICLE_FIELDS)
+            else:
+                html = await self._fetch(url)
+                scraper_results = await self._parse(html, card)
+        except Exception as e:
+            print(f"Error al scrapear la siguiente url:\n{url}\nDetalle: {e}")
+            scraper_results = e
+        return mensaje, url, starting_time, scraper_results, index_only
+
+    def _on_message(self, ch, method, properties, body):
+        self.pending += 1
+        future = asyncio.run_coroutine_threadsafe(self._scrape(body), self._loop)
+        future.add_done_callback(
+            lambda f: self.connection.add_callback_threadsafe(
+                functools.partial(self._finish, method, f)
+            )
+        )
+
+    def _finish(self, method, future):
+        """
+        En el hilo de pika: publica el resultado y hace el ack. Si el pool
+        de extracción se rompió en todos los intentos, el mensaje vuelve a
+        la cola (solo una vez, para no ciclar con un artículo que mata al
+        proceso) y no se publica nada
+        """
+        result = future.result()
+        if isinstance(result[3], BrokenProcessPool) and not method.redelivered:
+            print(f"[Scraper async] Extracción fallida por pool roto, devolviendo a la cola: {result[1]}")
+            self.channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            self.pending -= 1
+            return
+        try:
+            self.scraper.finish_article(self.channel, *result)
+        finally:
+            self.channel.basic_ack(delivery_tag=method.delivery_tag)
+            self.pending -= 1
+            self.processed += 1
+
+    def run(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+        self.connection = pika.BlockingConnection(pika.ConnectionParameters("localhost"))
+        self.channel = self.connection.channel()
+
+        # Definir las colas a escuchar (durable=False para coincidir con logger)
+        for q in [SCRAPER_QUEUE, LOG_QUEUE, SEND_DATA_QUEUE]:
+            self.channel.queue_declare(queue=q, durable=False, auto_delete=True)
+
+        # Ventana de prefetch igual a las descargas en vuelo
+        self.channel.basic_qos(prefetch_count=self.inflight)
+        signal_handler = StopSignalHandler(self.channel, SCRAPER_QUEUE, "Scraper async")
+        self.channel.basic_consume(queue=SCRAPER_QUEUE, on_message_callback=self._on_message)
+        print(f"[Scraper async] Escuchando {SCRAPER_QUEUE} con {self.inflight} descargas en vuelo...")
+
+        # No cerrar con artículos en vuelo: sus acks siguen pendientes
+        while not signal_handler._should_stop() or self.pending:
+            self.connection.process_data_events(time_limit=1)
+
+        asyncio.run_coroutine_threadsafe(self._http.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._pool is not None:
+            self._pool.shutdown()
+        self.connection.close()
+        self._write_stage_stats()
+        print(f"[Scraper async] {self.processed} artículos procesados.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker asíncrono de scraping")
+    parser.add_argument("scraper", help="Módulo scraper del medio (p.ej. scraper.scraper_biobio)")
+    parser.add_argument("--inflight", type=int, default=DEFAULT_INFLIGHT,
+                        help="Descargas de artículos en vuelo (y prefetch de mensajes)")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1,
+                        help="Procesos de la etapa de extracción (0 = extraer en el event loop)")
+    parser.add_argument("--buffer", type=int, default=None,
+                        help="Artículos descargados en espera de extracción (por defecto 2 por proceso)")
+    args = parser.parse_args()
+
+    scraper = importlib.import_module(args.scraper)
+    AsyncScraperWorker(scraper, args.inflight, args.parse_workers, args.buffer).run()
+
+
+if __name__ == "__main__":
+    main()
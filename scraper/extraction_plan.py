@@ -0,0 +1,638 @@
+"""
+Planes de extracción compilados por medio. Cada scraper declara sus campos una
+sola vez (tipo de extracción y selectores CSS de respaldo, en orden) y el plan
+se compila al importar el módulo:
+
+    - cada selector se parsea una vez (soupsieve o XPath según el backend),
+    - los selectores se agrupan por su contenedor (el primer selector simple,
+      p.ej. "div.post-main" en "div.post-main div.post-content p"), y todos
+      los contenedores del plan se buscan en un solo recorrido del documento,
+    - el resto del selector se busca solo dentro de los contenedores
+      encontrados, y los selectores cuyo contenedor no está en la página se
+      descartan sin recorrer el árbol.
+
+Se registra qué selector entregó cada campo (o si ninguno lo hizo) en
+`metrics/extraction_plan.json`, para detectar selectores de respaldo muertos:
+
+    python -m scraper.extraction_plan [medio]
+"""
+
+import atexit
+import json
+import os
+import re
+import sys
+from urllib.parse import urljoin
+
+# Bloqueo de archivos
+if os.name == "nt":  # Windows
+    import msvcrt
+
+    def file_lock(f):
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def file_unlock(f):
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:  # Linux/Unix/MacOS
+    import fcntl
+
+    def file_lock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def file_unlock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# Agregar el directorio raíz al path ANTES de los imports
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scraper.html_parser import (
+    DEFAULT_BACKEND,
+    SIMPLE_SELECTOR,
+    LxmlTag,
+    compile_selector,
+    parse_html,
+    scope_html,
+)
+
+STATS_FILE = "metrics/extraction_plan.json"
+STATS_EVERY = 50  # artículos entre escrituras de los contadores
+NO_MATCH = "sin_match"
+
+# Tipos que toman el primer elemento con valor; el resto junta todos los elementos
+FIRST_KINDS = ("text", "own_text", "datetime", "video_src")
+ALL_KINDS = ("body", "filtered_body", "images", "videos", "figures", "entries")
+
+
+class Field:
+    """
+    Campo de un plan de extracción: tipo de extracción (mismos criterios que
+    las funciones de scraping_utils) y selectores CSS en orden de prioridad.
+
+        - text: texto del primer elemento con texto (extract),
+        - own_text: texto directo, sin hijos (extract_text_only),
+        - datetime: atributo "datetime" (extract_datetime),
+        - video_src: src de un iframe de video (extract_body_video),
+        - body: textos de todos los elementos, un párrafo por línea (extract_body),
+        - filtered_body: igual, excluyendo los que estén dentro de `excluded`
+          ("tag.clase"; extract_filtered_body),
+        - images: URLs de imágenes (extract_images),
+        - videos: URLs de videos (extract_videos),
+        - figures: imagen (`image`) y descripción (`description`) de cada
+          figura (extract_image_with_description),
+        - entries: fecha (`date`) y cuerpo (`body`) de cada entrada de un
+          minuto a minuto (extract_minutoaminuto_entries).
+    """
+
+    def __init__(self, kind: str, selectors: list, **options):
+        if kind not in FIRST_KINDS + ALL_KINDS:
+            raise ValueError(f"Tipo de campo desconocido: {kind}")
+        self.kind = kind
+        self.selectors = list(selectors)
+        self.options = options
+
+
+def _split_top(selector: str, separators: str) -> list:
+    """
+    Separa `selector` en los caracteres de `separators` que no estén dentro de
+    corchetes, paréntesis ni comillas
+    """
+
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(selector):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "[(":
+            depth += 1
+        elif ch in "])":
+            depth -= 1
+        elif ch in separators and depth == 0:
+            parts.append(selector[start:i])
+            start = i + 1
+    parts.append(selector[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def split_container(selector: str):
+    """
+    (contenedor, resto) de un selector: el contenedor es su primer selector
+    simple y el resto lo que se busca dentro (None si el selector es solo el
+    contenedor). Si no se puede agrupar (combinadores >, +, ~ o grupos con
+    distintos contenedores) retorna (None, selector)
+    """
+
+    containers, rests = set(), []
+    for part in _split_top(selector, ","):
+        if len(_split_top(part, ">+~")) > 1:
+            return None, selector
+        tokens = _split_top(part, " \t\n")
+        containers.add(tokens[0])
+        rests.append(" ".join(tokens[1:]) or None)
+
+    if len(containers) != 1 or (None in rests and len(rests) > 1):
+        return None, selector
+    return containers.pop(), rests if rests != [None] else None
+
+
+class _CompiledField:
+    """
+    Selectores de un campo compilados para una familia de backend
+    """
+
+    def __init__(self, field, backend, container_index):
+        self.entries = []
+        for selector in field.selectors:
+            container, rests = split_container(selector)
+            if container is None:
+                self.entries.append((selector, None, compile_selector(selector, backend)))
+            elif rests is None:
+                self.entries.append((selector, container_index[container], None))
+            else:
+                # :scope evita que soupsieve busque el resto por sobre el contenedor
+                # (en lxml el prefijo XPath "descendant::" ya lo limita)
+                if backend != "lxml":
+                    rests = [f":scope {rest}" for rest in rests]
+                self.entries.append(
+                    (selector, container_index[container], compile_selector(", ".join(rests), backend))
+                )
+
+        self.options = {
+            key: [compile_selector(sel, backend) for sel in value]
+            for key, value in field.options.items()
+            if key in ("image", "description", "date", "body")
+        }
+
+
+class _CompiledPlan:
+    def __init__(self, plan, backend):
+        containers = []
+        for field in plan.fields.values():
+            for selector in field.selectors:
+                container, _ = split_container(selector)
+                if container is not None and container not in containers:
+                    containers.append(container)
+
+        container_index = {container: i for i, container in enumerate(containers)}
+        self.count = len(containers)
+
+        # Contenedores "tag.clase": se reconocen comparando tag y clases en un
+        # solo recorrido; el resto con un selector unión compilado
+        self.simple, complex_ = [], []
+        for i, container in enumerate(containers):
+            match = SIMPLE_SELECTOR.match(container)
+            if match:
+                classes = frozenset(c for c in match.group(2).split(".") if c)
+                self.simple.append((i, match.group(1), classes))
+            else:
+                complex_.append((i, container))
+        tags = {tag for _, tag, _ in self.simple}
+        self.tags = None if None in tags else sorted(tags)
+
+        self.union = compile_selector(", ".join(c for _, c in complex_), backend) if complex_ else None
+        self.matchers = [(i, compile_selector(container, backend)) for i, container in complex_]
+        self.fields = {
+            name: _CompiledField(field, backend, container_index)
+            for name, field in plan.fields.items()
+        }
+
+
+class PlanResult:
+    """
+    Campos extraídos de un documento. Cada campo se calcula la primera vez que
+    se pide; los contenedores del plan se buscan una sola vez por documento.
+    Un resultado `tentative` (parseo acotado aún no aceptado) guarda sus
+    aciertos por selector hasta `accept()`.
+    """
+
+    def __init__(self, plan, compiled, soup, base_url=None, tentative=False):
+        self._plan = plan
+        self._compiled = compiled
+        self._soup = soup
+        self._base_url = base_url
+        self._containers = None
+        self._values = {}
+        self._pending = [] if tentative else None
+
+    def _record(self, name, selector):
+        if self._pending is None:
+            self._plan.record(name, selector)
+        else:
+            self._pending.append((name, selector))
+
+    def accept(self):
+        for name, selector in self._pending or ():
+            self._plan.record(name, selector)
+        self._pending = None
+
+    def _container_elements(self, index):
+        if self._containers is None:
+            self._containers = self._find_containers()
+        return self._containers[index]
+
+    def _find_containers(self):
+        """
+        Busca todos los contenedores del plan en un solo recorrido del
+        documento (más uno para los que no son "tag.clase")
+        """
+
+        compiled = self._compiled
+        containers = [[] for _ in range(compiled.count)]
+
+        if compiled.simple:
+            if isinstance(self._soup, LxmlTag):
+                root = self._soup._el
+                elements = root.iter(*compiled.tags) if compiled.tags else root.iter()
+                candidates = (
+                    (el, el.tag, el.get("class")) for el in elements if isinstance(el.tag, str)
+                )
+            else:
+                elements = self._soup.find_all(compiled.tags or True)
+                candidates = ((el, el.name, el.get("class")) for el in elements)
+
+            for el, tag, classes in candidates:
+                if isinstance(classes, str):
+                    classes = classes.split()
+                classes = set(classes or ())
+                for i, wanted_tag, wanted_classes in compiled.simple:
+                    if (wanted_tag is None or tag == wanted_tag) and wanted_classes <= classes:
+                        containers[i].append(LxmlTag(el) if isinstance(self._soup, LxmlTag) else el)
+
+        if compiled.union is not None:
+            for el in compiled.union.select(self._soup):
+                for i, matcher in compiled.matchers:
+                    if matcher.match(el):
+                        containers[i].append(el)
+        return containers
+
+    def _select(self, container, compiled):
+        if container is None:
+            return compiled.select(self._soup)
+        containers = self._container_elements(container)
+        if compiled is None:
+            return list(containers)
+        if len(containers) == 1:
+            return compiled.select(containers[0])
+
+        # Contenedores anidados: sin repetir elementos
+        found, seen = [], set()
+        for node in containers:
+            for el in compiled.select(node):
+                key = el._el if isinstance(el, LxmlTag) else id(el)
+                if key not in seen:
+                    seen.add(key)
+                    found.append(el)
+        return found
+
+    def _select_one(self, container, compiled):
+        if container is None:
+            return compiled.select_one(self._soup)
+        for node in self._container_elements(container):
+            el = node if compiled is None else compiled.select_one(node)
+            if el is not None:
+                return el
+        return None
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            self._values[name] = self._extract(name)
+        return self._values[name]
+
+    def get(self, name, default=None):
+        value = self[name]
+        return default if value is None else value
+
+    def _extract(self, name):
+        field = self._plan.fields[name]
+        compiled = self._compiled.fields[name]
+        reader = getattr(self, f"_read_{field.kind}")
+
+        if field.kind in FIRST_KINDS:
+            for selector, container, sel in compiled.entries:
+                el = self._select_one(container, sel)
+                value = reader(el, field, compiled) if el is not None else None
+                if value:
+                    self._record(name, selector)
+                    return value
+            self._record(name, None)
+            return None
+
+        items, hit = [], False
+        for selector, container, sel in compiled.entries:
+            found = [item for el in self._select(container, sel) for item in reader(el, field, compiled)]
+            if found:
+                self._record(name, selector)
+                hit = True
+            items.extend(found)
+        if not hit:
+            self._record(name, None)
+        return self._finish(field, items)
+
+    def _finish(self, field, items):
+        if not items:
+            return None
+        if field.kind in ("body", "filtered_body"):
+            return "\n".join(items)
+        if field.kind == "images":
+            # Igual que extract_images: sin duplicados
+            return list(set(items))
+        return items
+
+    # Lectores: valor(es) de un elemento, con los criterios de scraping_utils
+
+    def _read_text(self, el, field, compiled):
+        return el.get_text(strip=True, separator=" ")
+
+    def _read_own_text(self, el, field, compiled):
+        return " ".join(el.find_all(string=True, recursive=False)).strip()
+
+    def _read_datetime(self, el, field, compiled):
+        return el.get("datetime")
+
+    def _read_video_src(self, el, field, compiled):
+        url = el.get("src")
+        if url and url.startswith("//"):
+            url = "https:" + url
+        return url
+
+    def _read_body(self, el, field, compiled):
+        # Como extract_multiple: un elemento sin texto deja una línea vacía
+        return [el.get_text(strip=True, separator=" ")]
+
+    def _read_filtered_body(self, el, field, compiled):
+        for excl in field.options.get("excluded", []):
+            nombre, clase = excl.split(".")
+            if el.find_parent(nombre, class_=clase):
+                return []
+        txt = el.get_text(strip=True, separator=" ")
+        return [txt] if txt else []
+
+    def _read_images(self, el, field, compiled):
+        src = el.get("src") or el.get("data-src") or el.get("data-lazy-src")
+        if not src and el.has_attr("style"):
+            match = re.search(r"background-image\s*:\s*url\((.*?)\)", el["style"])
+            if match:
+                src = match.group(1).strip(" \"'")
+        if src and isinstance(src, str):
+            return [urljoin(self._base_url, src.strip())]
+        return []
+
+    def _read_videos(self, el, field, compiled):
+        url = el.get("src") or el.get("data-src")
+        if not url:
+            return []
+        if url.startswith("//"):
+            url = "https:" + url
+        return [url]
+
+    def _read_figures(self, el, field, compiled):
+        img = _first(el, compiled.options["image"])
+        if img is None:
+            return []
+        src = img.get("src") or img.get("data-src") or img.get("data-lazy-src")
+        if not src:
+            return []
+        desc = _first(el, compiled.options.get("description", []))
+        return [{"url": src, "descripcion": desc.get_text(strip=True) if desc else None}]
+
+    def _read_entries(self, el, field, compiled):
+        fecha = None
+        for sel in compiled.options.get("date", []):
+            date_tag = sel.select_one(el)
+            if date_tag and date_tag.has_attr("datetime"):
+                fecha = date_tag["datetime"]
+                break
+
+        cuerpo_partes = []
+        for sel in compiled.options.get("body", []):
+            for elem in sel.select(el):
+                txt = elem.get_text(strip=True, separator=" ")
+                if txt:
+                    cuerpo_partes.append(txt)
+
+        return [{"fecha": fecha, "cuerpo": "\n".join(cuerpo_partes) if cuerpo_partes else None}]
+
+
+def _first(node, selectors):
+    for sel in selectors:
+        el = sel.select_one(node)
+        if el:
+            return el
+    return None
+
+
+class ExtractionPlan:
+    """
+    Plan de extracción de un medio: sus campos compilados para el backend HTML
+    del medio al crearlo (y para otros backends la primera vez que se usan).
+    `apply(soup)` entrega un PlanResult con los campos del documento.
+
+    Con `regions` (lista, aunque sea vacía) `parse(html)` usa parseo acotado:
+    construye el árbol solo con las regiones del HTML que coinciden con
+    `regions` o con el primer selector simple ("tag.clase") de algún selector
+    del plan, ubicadas con regex sin parsear la página completa. Si al árbol
+    acotado le falta algún campo de `critical` (un nombre, o una tupla de
+    alternativas), se vuelve a parsear el documento completo.
+    """
+
+    def __init__(
+        self,
+        medio: str,
+        fields: dict,
+        backend: str = DEFAULT_BACKEND,
+        regions: list | None = None,
+        critical: list = (),
+    ):
+        self.medio = medio
+        self.fields = fields
+        self.backend = backend
+        self._compiled = {}
+        self._compile(backend)
+        self.regions = None
+        if regions is not None:
+            self.regions = tuple(dict.fromkeys(list(regions) + self._anchors()))
+        self.critical = [(c,) if isinstance(c, str) else tuple(c) for c in critical]
+        self.hits = {name: {} for name in fields}
+        self.articles = 0
+        self.parses = {"acotado": 0, "respaldo": 0, "completo": 0}
+        atexit.register(self.save_stats)
+
+    def _anchors(self):
+        """
+        Primer selector simple de cada selector del plan. Como solo hay
+        combinadores descendientes, todo elemento que encuentra un selector
+        está dentro de una región de su primer selector simple, por lo que el
+        árbol acotado a esas regiones entrega los mismos campos
+        """
+
+        anchors = []
+        for field in self.fields.values():
+            for selector in field.selectors:
+                for part in _split_top(selector, ","):
+                    anchor = _split_top(part, " \t\n>+~")[0]
+                    if not SIMPLE_SELECTOR.match(anchor):
+                        raise ValueError(
+                            f"{self.medio}: el selector '{selector}' no admite parseo acotado "
+                            f"('{anchor}' no es de la forma tag.clase)"
+                        )
+                    anchors.append(anchor)
+        return anchors
+
+    @staticmethod
+    def _family(backend):
+        return "lxml" if backend == "lxml" else "bs4"
+
+    def _compile(self, backend):
+        family = self._family(backend)
+        if family not in self._compiled:
+            self._compiled[family] = _CompiledPlan(self, "lxml" if family == "lxml" else DEFAULT_BACKEND)
+        return self._compiled[family]
+
+    def apply(self, soup, base_url=None, tentative=False) -> PlanResult:
+        compiled = self._compile("lxml" if isinstance(soup, LxmlTag) else DEFAULT_BACKEND)
+        if not tentative:
+            self._count_article()
+        return PlanResult(self, compiled, soup, base_url, tentative)
+
+    def _count_article(self):
+        self.articles += 1
+        if self.articles >= STATS_EVERY:
+            self.save_stats()
+
+    def parse(self, html: str, backend: str | None = None, scoped: bool | None = None, base_url=None) -> PlanResult:
+        """
+        Parsea `html` con el backend del medio (o `backend`) y aplica el plan.
+        `scoped` fuerza (True) o desactiva (False) el parseo acotado; por
+        defecto se usa si el plan tiene `regions`
+        """
+
+        backend = backend or self.backend
+        if scoped is None:
+            scoped = self.regions is not None
+
+        if scoped:
+            scoped_html = scope_html(html, self.regions or ())
+            if scoped_html is not None:
+                result = self.apply(parse_html(scoped_html, backend), base_url, tentative=True)
+                if all(any(result[name] for name in names) for names in self.critical):
+                    self.parses["acotado"] += 1
+                    result.accept()
+                    self._count_article()
+                    return result
+            self.parses["respaldo"] += 1
+        else:
+            self.parses["completo"] += 1
+
+        return self.apply(parse_html(html, backend), base_url)
+
+    def record(self, field: str, selector: str | None):
+        """
+        Cuenta qué selector entregó el campo (None: ninguno)
+        """
+
+        key = selector if selector is not None else NO_MATCH
+        self.hits[field][key] = self.hits[field].get(key, 0) + 1
+
+    def take_stats(self) -> dict:
+        """
+        Entrega los contadores acumulados y los reinicia. Lo usan los procesos
+        del pool del worker asíncrono, que no ejecutan atexit: devuelven sus
+        contadores con cada artículo y el proceso principal los suma con
+        `merge_stats`
+        """
+
+        stats = {"articulos": self.articles, "campos": self.hits, "parseo": self.parses}
+        self.articles = 0
+        self.hits = {name: {} for name in self.fields}
+        self.parses = dict.fromkeys(self.parses, 0)
+        return stats
+
+    def merge_stats(self, stats: dict | None):
+        """
+        Suma contadores de `take_stats` (de otro proceso) a los de este plan
+        """
+
+        if not stats:
+            return
+        for field, counts in stats["campos"].items():
+            field_hits = self.hits.setdefault(field, {})
+            for key, count in counts.items():
+                field_hits[key] = field_hits.get(key, 0) + count
+        for mode, count in stats["parseo"].items():
+            self.parses[mode] = self.parses.get(mode, 0) + count
+        self.articles += stats["articulos"]
+        if self.articles >= STATS_EVERY:
+            self.save_stats()
+
+    def save_stats(self):
+        """
+        Suma los contadores acumulados a metrics/extraction_plan.json (con file
+        locking, varios scrapers comparten el archivo) y los reinicia
+        """
+
+        taken = self.take_stats()
+        articles, hits, parses = taken["articulos"], taken["campos"], taken["parseo"]
+        if not articles:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
+            with open(STATS_FILE, "a+", encoding="utf-8") as f:
+                file_lock(f)
+                try:
+                    f.seek(0)
+                    content = f.read()
+                    try:
+                        all_stats = json.loads(content) if content.strip() else {}
+                    except (json.JSONDecodeError, ValueError):
+                        all_stats = {}
+
+                    stats = all_stats.setdefault(self.medio, {"articulos": 0, "campos": {}})
+                    stats["articulos"] += articles
+                    parse_stats = stats.setdefault("parseo", {})
+                    for mode, count in parses.items():
+                        parse_stats[mode] = parse_stats.get(mode, 0) + count
+                    for field, counts in hits.items():
+                        field_stats = stats["campos"].setdefault(field, {})
+                        for selector in self.fields[field].selectors + [NO_MATCH]:
+                            field_stats[selector] = field_stats.get(selector, 0) + counts.get(selector, 0)
+
+                    f.seek(0)
+                    f.truncate(0)
+                    json.dump(all_stats, f, ensure_ascii=False, indent=2)
+                finally:
+                    file_unlock(f)
+        except Exception as e:
+            print(f"Error guardando métricas del plan de extracción: {e}")
+
+
+def main():
+    """
+    Muestra los aciertos por selector de cada campo y marca los que nunca
+    entregaron el campo
+    """
+
+    medio = sys.argv[1] if len(sys.argv) > 1 else None
+    try:
+        with open(STATS_FILE, "r", encoding="utf-8") as f:
+            all_stats = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"No hay métricas de planes de extracción en {STATS_FILE}: {e}")
+        return
+
+    for name, stats in all_stats.items():
+        if medio and name != medio:
+            continue
+        print(f"\n{name} ({stats['articulos']} artículos)")
+        for field, counts in stats["campos"].items():
+            print(f"  {field}")
+            for selector, hits in counts.items():
+                mark = "  <- sin uso" if hits == 0 and selector != NO_MATCH else ""
+                print(f"    {hits:>7}  {selector}{mark}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+"""
+Backends de parseo HTML para los scrapers. Todos entregan un árbol con la API
+de BeautifulSoup que usan las funciones de `scraping_utils` (select, select_one,
+get_text, get, has_attr, [atributo], find_all y find_parent), de modo que
+cada medio puede elegir su backend sin cambiar la extracción:
+
+    - "html.parser": BeautifulSoup con el parser de Python (el de siempre),
+    - "bs4-lxml": BeautifulSoup con el tree builder de lxml (C), mismos
+      selectores (soupsieve),
+    - "lxml": árbol de lxml.html con selectores CSS compilados a XPath
+      (cssselect), sin pasar por BeautifulSoup.
+
+lxml y cssselect son opcionales: solo se importan al usar sus backends. Con
+html.parser, los <p> sin cerrar se cierran antes de parsear (close_paragraphs)
+para obtener el mismo árbol que lxml.
+"""
+
+import bisect
+import functools
+import re
+
+from bs4 import BeautifulSoup
+
+DEFAULT_BACKEND = "html.parser"
+BACKENDS = ("html.parser", "bs4-lxml", "lxml")
+
+# Atributos con múltiples valores, que BeautifulSoup entrega como lista
+_MULTI_VALUED = ("class", "rel", "rev", "accept-charset", "headers", "accesskey", "dropzone")
+
+# Su texto no forma parte de get_text() de un ancestro (igual que en bs4)
+_NON_TEXT = ("script", "style", "template")
+
+# Selector simple "tag.clase1.clase2" (o solo tag, o solo clases)
+SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$")
+
+# Contenido que no es HTML: no se buscan regiones ni se cuentan etiquetas
+# dentro de comentarios (un comentario sin cerrar llega hasta el final) ni
+# de <script>/<style>
+_RAW_TEXT = re.compile(r"<!--.*?(?:-->|\Z)|<(script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+# Elementos sin etiqueta de cierre
+_VOID = ("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr")
+
+# Etiquetas de apertura que cierran un <p> abierto (HTML5, como hace lxml);
+# html.parser en cambio anida los <p> sin cerrar y duplica su texto
+_CLOSES_P = frozenset((
+    "address", "article", "aside", "blockquote", "details", "dialog", "div", "dl", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hgroup", "hr", "main", "menu", "nav", "ol", "p", "pre", "section", "table", "ul",
+))
+
+# Un <p> dentro de estos elementos no se cierra desde fuera de ellos
+_P_SCOPE = frozenset(("applet", "button", "caption", "html", "marquee", "object", "table", "td", "template", "th"))
+
+
+def parse_html(html: str, backend: str = DEFAULT_BACKEND):
+    """
+    Construye el árbol del documento con el backend indicado
+    """
+
+    if backend == "html.parser":
+        if isinstance(html, str):
+            html = close_paragraphs(html)
+        return BeautifulSoup(html, "html.parser")
+    if backend == "bs4-lxml":
+        return BeautifulSoup(html, "lxml")
+    if backend == "lxml":
+        return LxmlDocument(html)
+    raise ValueError(f"Backend HTML desconocido: {backend} (disponibles: {', '.join(BACKENDS)})")
+
+
+def compile_selector(selector: str, backend: str = DEFAULT_BACKEND):
+    """
+    Selector CSS compilado una vez para el backend. Expone select(nodo),
+    select_one(nodo) y match(nodo) sobre los árboles de ese backend
+    """
+
+    if backend == "lxml":
+        return LxmlSelector(selector)
+    import soupsieve
+
+    return soupsieve.compile(selector)
+
+
+def _region_pattern(selector: str):
+    """
+    (regex de la etiqueta de apertura, clases, literal a buscar) de un
+    selector simple, o None si el selector no es simple
+    """
+
+    match = SIMPLE_SELECTOR.match(selector)
+    if not match or not selector:
+        return None
+    tag = re.escape(match.group(1)) if match.group(1) else r"[a-zA-Z][\w-]*"
+    classes = [c for c in match.group(2).split(".") if c]
+    if not classes:
+        return re.compile(rf"<({tag})(?=[\s/>])[^>]*>", re.IGNORECASE), frozenset(), None
+    pattern = re.compile(
+        rf"<({tag})(?=[\s/>])[^>]*?\sclass\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))[^>]*>",
+        re.IGNORECASE,
+    )
+    # La clase más larga es la que menos se repite en el documento
+    return pattern, frozenset(classes), max(classes, key=len)
+
+
+class _RawText:
+    """
+    Tramos de comentarios y <script>/<style> de un documento, para
+    ignorar etiquetas escritas dentro de ellos
+    """
+
+    def __init__(self, html):
+        spans = [match.span() for match in _RAW_TEXT.finditer(html)]
+        self.starts = [start for start, _ in spans]
+        self.ends = [end for _, end in spans]
+
+    def __contains__(self, pos):
+        i = bisect.bisect_right(self.starts, pos) - 1
+        return i >= 0 and pos < self.ends[i]
+
+
+# Cualquier etiqueta de apertura o cierre
+_ANY_TAG = re.compile(r"<(/?)([a-zA-Z][\w-]*)(?=[\s/>])[^>]*>")
+
+
+def _region_end(html: str, tag: str, pos: int, raw: _RawText) -> int:
+    """
+    Fin del elemento `tag` abierto justo antes de `pos`. Se sigue la pila
+    de elementos abiertos igual que los parsers: un cierre cierra también
+    los elementos sin cerrar que tenga dentro (p.ej. <p> sin </p>), y el
+    cierre de un ancestro termina el elemento justo antes. Sin cierre, el
+    elemento llega hasta el final del documento
+    """
+
+    tag = tag.lower()
+    if tag in _VOID:
+        return pos
+    stack = [tag]
+    for match in _ANY_TAG.finditer(html, pos):
+        if match.start() in raw:
+            continue
+        name = match.group(2).lower()
+        if not match.group(1):
+            if name not in _VOID and not match.group(0).endswith("/>"):
+                stack.append(name)
+            continue
+        if name not in stack:
+            # Cierre de un ancestro de la región
+            return match.start()
+        del stack[len(stack) - 1 - stack[::-1].index(name):]
+        if not stack:
+            return match.end()
+    return len(html)
+
+
+def close_paragraphs(html: str) -> str:
+    """
+    Agrega el </p> implícito de los <p> sin cerrar antes de la etiqueta que
+    los cierra según HTML5 (otro <p>, <div>, <h2>, ...), para que html.parser
+    construya el mismo árbol que lxml en vez de anidarlos
+    """
+
+    raw = _RawText(html)
+    stack = []
+    parts = []
+    last = 0
+    for match in _ANY_TAG.finditer(html):
+        if match.start() in raw:
+            continue
+        name = match.group(2).lower()
+        if match.group(1):
+            if name in stack:
+                del stack[len(stack) - 1 - stack[::-1].index(name):]
+            continue
+        if name in _CLOSES_P:
+            # <p> abierto en el ámbito actual (no fuera de una celda, botón...)
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i] == "p":
+                    parts.append(html[last:match.start()])
+                    parts.append("</p>")
+                    last = match.start()
+                    del stack[i:]
+                    break
+                if stack[i] in _P_SCOPE:
+                    break
+        if name not in _VOID and not match.group(0).endswith("/>"):
+            stack.append(name)
+    if not parts:
+        return html
+    parts.append(html[last:])
+    return "".join(parts)
+
+
+def _region_starts(html: str, pattern, classes, literal):
+    """
+    Etiquetas de apertura de una región. Con clases, en vez de probar la regex
+    en cada "<" se busca el nombre de la clase (str.find) y se valida solo la
+    etiqueta que lo contiene
+    """
+
+    if literal is None:
+        yield from pattern.finditer(html)
+        return
+
+    checked = set()
+    idx = html.find(literal)
+    while idx != -1:
+        start = html.rfind("<", 0, idx)
+        if start != -1 and start not in checked and html.find(">", start, idx) == -1:
+            checked.add(start)
+            match = pattern.match(html, start)
+            if match and match.end() > idx:
+                value = match.group(2) or match.group(3) or match.group(4) or ""
+                if classes <= set(value.split()):
+                    yield match
+        idx = html.find(literal, idx + len(literal))
+
+
+@functools.lru_cache(maxsize=256)
+def region_patterns(selectors: tuple) -> list:
+    """
+    Regex compiladas de las regiones (selectores simples) de un medio
+    """
+
+    patterns = [_region_pattern(selector) for selector in selectors]
+    return [pattern for pattern in patterns if pattern is not None]
+
+
+def scope_html(html: str, selectors: tuple) -> str | None:
+    """
+    HTML reducido a las regiones que coinciden con `selectors` (selectores
+    simples "tag.clase"), ubicadas sobre el texto sin construir el árbol. Las
+    regiones anidadas o superpuestas se unen en la más externa y se
+    conservan en orden de documento; <head> queda en su lugar. Retorna None
+    si no se encontró ninguna región
+    """
+
+    raw = _RawText(html)
+    starts = sorted(
+        (match.start(), match.group(1), match.end())
+        for pattern, classes, literal in region_patterns(tuple(selectors))
+        for match in _region_starts(html, pattern, classes, literal)
+        if match.start() not in raw
+    )
+    if not starts:
+        return None
+
+    # Las regiones dentro de otra ya tomada no se recorren
+    merged = []
+    for start, tag, open_end in starts:
+        if merged and start < merged[-1][1]:
+            continue
+        merged.append((start, _region_end(html, tag, open_end, raw)))
+
+    head, body = [], []
+    for start, end in merged:
+        region = html[start:end]
+        (head if region[:5].lower() == "<head" else body).append(region)
+    return "<html>" + "".join(head) + "<body>" + "\n".join(body) + "</body></html>"
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(selector: str, prefix: str):
+    """
+    Selector CSS compilado a XPath, una vez por selector
+    """
+
+    from cssselect import HTMLTranslator
+    from lxml import etree
+
+    return etree.XPath(HTMLTranslator().css_to_xpath(selector, prefix=prefix))
+
+
+class LxmlTag:
+    """
+    Elemento de lxml.html con la API de bs4.Tag que usa scraping_utils
+    """
+
+    __slots__ = ("_el",)
+    _prefix = "descendant::"
+
+    def __init__(self, el):
+        self._el = el
+
+    def __bool__(self):
+        # Como bs4.Tag: un elemento encontrado siempre es verdadero
+        # (los de lxml son falsos si no tienen hijos)
+        return True
+
+    def __eq__(self, other):
+        return isinstance(other, LxmlTag) and self._el is other._el
+
+    def __hash__(self):
+        return hash(self._el)
+
+    def __repr__(self):
+        return f"<LxmlTag {self.name}>"
+
+    @property
+    def name(self) -> str:
+        return self._el.tag
+
+    def select(self, selector: str) -> list:
+        return [LxmlTag(el) for el in _compile(selector, self._prefix)(self._el)]
+
+    def select_one(self, selector: str):
+        found = _compile(selector, self._prefix)(self._el)
+        return LxmlTag(found[0]) if found else None
+
+    def _strings(self):
+        """
+        Textos del elemento y sus descendientes en orden de documento,
+        sin comentarios ni contenido de script/style
+        """
+
+        stack = [(self._el, True)]
+        while stack:
+            node, is_root = stack.pop()
+            if isinstance(node, str):
+                yield node
+                continue
+            if node.text and (is_root or node.tag not in _NON_TEXT):
+                yield node.text
+            for child in reversed(node):
+                if child.tail:
+                    stack.append((child.tail, False))
+                if isinstance(child.tag, str):
+                    stack.append((child, False))
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        strings = self._strings()
+        if strip:
+            strings = (s.strip() for s in strings)
+            strings = (s for s in strings if s)
+        return separator.join(strings)
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    def get(self, key: str, default=None):
+        value = self._el.get(key)
+        if value is None:
+            return default
+        if key in _MULTI_VALUED:
+            return value.split()
+        return value
+
+    def has_attr(self, key: str) -> bool:
+        return key in self._el.attrib
+
+    def __getitem__(self, key: str):
+        if key not in self._el.attrib:
+            raise KeyError(key)
+        return self.get(key)
+
+    @property
+    def attrs(self) -> dict:
+        return {key: self.get(key) for key in self._el.attrib}
+
+    def find_all(self, name=None, string=None, recursive: bool = True, class_=None, **attrs) -> list:
+        """
+        Como bs4.Tag.find_all: con `string` (True o un texto) los textos del
+        elemento, incluidos comentarios; si no, los elementos descendientes
+        (o solo hijos, con recursive=False) que coinciden con `name` (nombre,
+        lista de nombres o True), `class_` y los atributos de `attrs` (valor
+        o True para exigir que exista)
+        """
+
+        if string is not None:
+            if name is not None or class_ is not None or attrs:
+                raise TypeError("LxmlTag.find_all: string no se combina con filtros de elementos")
+            return [s for s in self._all_strings(self._el, recursive) if string is True or s == string]
+
+        if class_ is not None:
+            attrs["class"] = class_
+        elements = self._el.iterdescendants() if recursive else iter(self._el)
+        return [
+            LxmlTag(el) for el in elements
+            if isinstance(el.tag, str) and _match_name(el.tag, name) and _match_attrs(el, attrs)
+        ]
+
+    @staticmethod
+    def _all_strings(el, recursive):
+        """
+        Textos de `el` en orden de documento, como los NavigableString de bs4
+        """
+
+        from lxml import etree
+
+        if el.text:
+            yield el.text
+        for child in el:
+            if child.tag is etree.Comment:
+                if child.text:
+                    yield child.text
+            elif recursive and isinstance(child.tag, str):
+                yield from LxmlTag._all_strings(child, True)
+            if child.tail:
+                yield child.tail
+
+    def find_parent(self, name: str = None, class_: str = None):
+        for parent in self._el.iterancestors():
+            if not isinstance(parent.tag, str):
+                continue
+            if name is not None and parent.tag != name:
+                continue
+            if class_ is not None and class_ not in (parent.get("class") or "").split():
+                continue
+            return LxmlTag(parent)
+        return None
+
+
+def _match_name(tag: str, name) -> bool:
+    if name is None or name is True:
+        return True
+    if isinstance(name, str):
+        return tag == name
+    return tag in name
+
+
+def _match_attrs(el, attrs: dict) -> bool:
+    for key, wanted in attrs.items():
+        value = el.get(key)
+        if value is None:
+            return False
+        if wanted is True:
+            continue
+        # Atributos con múltiples valores: basta uno (o el valor completo)
+        if value != wanted and not (key in _MULTI_VALUED and wanted in value.split()):
+            return False
+    return True
+
+
+class LxmlSelector:
+    """
+    Selector CSS compilado a XPath para árboles LxmlTag, con la API de los
+    selectores compilados de soupsieve
+    """
+
+    __slots__ = ("pattern",)
+
+    def __init__(self, selector: str):
+        self.pattern = selector
+        # Valida y compila ahora (al importar el plan), no en el primer artículo
+        _compile(selector, LxmlTag._prefix)
+        _compile(selector, LxmlDocument._prefix)
+        _compile(selector, "self::")
+
+    def select(self, node) -> list:
+        return [LxmlTag(el) for el in _compile(self.pattern, node._prefix)(node._el)]
+
+    def select_one(self, node):
+        found = _compile(self.pattern, node._prefix)(node._el)
+        return LxmlTag(found[0]) if found else None
+
+    def match(self, node) -> bool:
+        return bool(_compile(self.pattern, "self::")(node._el))
+
+
+class LxmlDocument(LxmlTag):
+    """
+    Documento completo parseado con lxml.html. Igual que en BeautifulSoup, sus
+    selectores también pueden coincidir con el elemento raíz (<html>)
+    """
+
+    __slots__ = ()
+    _prefix = "descendant-or-self::"
+
+    def __init__(self, html):
+        import lxml.html
+        from lxml import etree
+
+        # Se parsea en bytes: lxml rechaza str con declaración de encoding
+        data = html.encode("utf-8") if isinstance(html, str) else html
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        try:
+            root = lxml.html.document_fromstring(data, parser=parser)
+        except etree.ParserError:
+            # Documento vacío
+            root = lxml.html.document_fromstring(b"<html></html>", parser=parser)
+        super().__init__(root)
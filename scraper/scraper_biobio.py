@@ -31,26 +31,110 @@ from pathlib import Path
 
 import pika
 import requests
-from bs4 import BeautifulSoup
 
 # Importa scraping_results_send() desde logger/
 from logger.queue_sender_scraper_results import scraping_results_send
 from utils.stop_signal_handler import StopSignalHandler
-from scraper.scraping_utils import (
-    extract,
-    extract_body,
-    extract_images,
-    extract_text_only,
-)
+from utils.url_registry import mark_scraped
+from utils.url_canon import canonicalize_url
+from scraper.extraction_plan import ExtractionPlan, Field
+from scraper.scraping_utils import article_from_card
 
 SCRAPER_QUEUE = "scraper_queue"
 LOG_QUEUE = "scraping_log_queue"
 SEND_DATA_QUEUE = "send_data_queue"
 
+# Claves de la noticia publicada en send_data_queue (completa o solo índice)
+ARTICLE_FIELDS = (
+    "titulo", "fecha", "autor", "desc_autor", "abstract", "cuerpo", "multimedia", "tipo_multimedia",
+)
+
 # Session compartida para reutilizar conexiones HTTP (connection pooling)
 HTTP_SESSION = requests.Session()
 HTTP_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
 
+# Backend de parseo HTML del medio (ver scraper/html_parser.py)
+HTML_PARSER = "html.parser"
+
+# Campos del artículo y sus selectores de respaldo, compilados al importar
+# (ver scraper/extraction_plan.py)
+EXTRACTION_PLAN = ExtractionPlan(
+    "biobiochile",
+    {
+        "fecha": Field(
+            "text",
+            [
+                "div.post-date",
+                "div.autor-fecha-container p.fecha",
+                "div.nota p.fecha",
+                "div.nota-top-content div.top-content-text p.fecha",
+            ],
+        ),
+        "fecha_texto": Field(
+            "own_text",
+            [
+                "div.fecha-visitas p.fecha",
+            ],
+        ),
+        "titulo": Field(
+            "text",
+            [
+                "h1.post-title",
+                "h1.titulo",
+                "div.nota-top-content div.top-content-text h1.titular",
+            ],
+        ),
+        "autor": Field(
+            "text",
+            [
+                "div.autores-trust-project div.contenedor-datos p.nombres a",
+                "div.author div.creditos-nota div.autores span.autor b",
+                "div.autor-opinion div.informacion a.nombre",
+                "div.autor div.creditos-nota div.autores span.autor b a",
+                "div.container-nota-body span.autor b a",
+            ],
+        ),
+        "desc_autor": Field(
+            "text",
+            [
+                "div.autores-trust-project div.contenedor-datos p.cargo",
+                "div.autor-opinion div.informacion p.cargo",
+            ],
+        ),
+        "abstract": Field(
+            "text",
+            [
+                "div.post-main div.post-content div.post-excerpt p",
+                "div.contenido-nota div.post-excerpt p",
+            ],
+        ),
+        "cuerpo": Field(
+            "body",
+            [
+                "div.post-main div.post-content div.container-redes-contenido p, div.post-main div.post-content div.container-redes-contenido h2",
+                "div.container-redes-contenido div.contenido-nota h2, div.container-redes-contenido div.contenido-nota p",
+                "div.contenido-nota div[class^='banners-contenido-nota-'] h2, div.contenido-nota div[class^='banners-contenido-nota-'] p",
+                "div.container-nota-body div.nota-content div.contenido p, div.container-nota-body div.nota-content div.contenido h2",
+            ],
+        ),
+        "multimedia": Field(
+            "images",
+            [
+                "div.post-main div.post-image img",
+                "div.post-main div.post-content div.container-redes-contenido img",
+                "div.imagen",
+                "div.contenedor-imagen-titulo div.imagen img",
+                "div.nota-top-content img",
+            ],
+        ),
+    },
+    backend=HTML_PARSER,
+    # Parseo acotado a las regiones del artículo, con parseo completo si falta
+    # alguno de estos campos
+    regions=[],
+    critical=[("fecha", "fecha_texto"), "titulo", "cuerpo"],
+)
+
 
 def update_scraper_metrics(medio: str, status: str, duration_ms: float = 0):
     """Actualiza las métricas del scraper en tiempo real con file locking (por medio)"""
@@ -188,114 +272,74 @@ def update_scraper_metrics(medio: str, status: str, duration_ms: float = 0):
                     break
 
 
-def scrap_news_article(url: str, validate: bool = False) -> dict | list | Exception:
+def parse_news_article(
+    html: str,
+    validate: bool = False,
+    known: dict | None = None,
+    parser: str | None = None,
+    scoped: bool | None = None,
+) -> dict | list:
     """
-    Realiza el scraping completo de una noticia individual. Esta función puede devolver
-    tanto un diccionario de python como una lista con los elementos de la noticia faltantes,
-    dependiendo de los parámetros y el output.
+    Extrae los datos de una noticia desde su HTML ya descargado. Devuelve un diccionario
+    o, si `validate` es True y faltan parámetros críticos, la lista de los faltantes. Los
+    campos de `known` (tarjeta del listado enviada por el crawler) se usan si no se
+    encuentran en el artículo. `parser` reemplaza al backend HTML_PARSER del medio y
+    `scoped` fuerza o desactiva el parseo acotado del plan de extracción.
     """
+    known = known or {}
     invalid_args = []
 
-    try:
-        # Realizar una request al sitio (usa Session para reutilizar conexiones)
-        response = HTTP_SESSION.get(url, timeout=10)
-        response.encoding = "utf-8"
-        response.raise_for_status()
+    fields = EXTRACTION_PLAN.parse(html, parser, scoped)
 
-        # Parsear y extraer respuesta
-        soup = BeautifulSoup(response.text, "html.parser")
+    fecha = fields["fecha"] or fields["fecha_texto"] or known.get("fecha")
+    if validate and not fecha:
+        invalid_args.append("fecha")
 
-        fecha = extract(
-            soup,
-            [
-                "div.post-date",
-                "div.autor-fecha-container p.fecha",
-                "div.nota p.fecha",
-                "div.nota-top-content div.top-content-text p.fecha",
-            ],
-        ) or extract_text_only(
-            soup,
-            [
-                "div.fecha-visitas p.fecha",
-            ],
-        )
-        if validate and not fecha:
-            invalid_args.append("fecha")
+    titulo = fields.get("titulo", known.get("titulo"))
+    if validate and not titulo:
+        invalid_args.append("titulo")
 
-        titulo = extract(
-            soup,
-            [
-                "h1.post-title",
-                "h1.titulo",
-                "div.nota-top-content div.top-content-text h1.titular",
-            ],
-        )
-        if validate and not titulo:
-            invalid_args.append("titulo")
+    autor = fields["autor"]
+    desc_autor = fields["desc_autor"]
+    abstract = fields.get("abstract", known.get("abstract"))
 
-        autor = extract(
-            soup,
-            [
-                "div.autores-trust-project div.contenedor-datos p.nombres a",
-                "div.author div.creditos-nota div.autores span.autor b",
-                "div.autor-opinion div.informacion a.nombre",
-                "div.autor div.creditos-nota div.autores span.autor b a",
-                "div.container-nota-body span.autor b a",
-            ],
-        )
+    cuerpo = fields["cuerpo"]
+    if validate and not cuerpo:
+        invalid_args.append("cuerpo")
 
-        desc_autor = extract(
-            soup,
-            [
-                "div.autores-trust-project div.contenedor-datos p.cargo",
-                "div.autor-opinion div.informacion p.cargo",
-            ],
-        )
+    multimedia = fields["multimedia"]
 
-        abstract = extract(
-            soup,
-            [
-                "div.post-main div.post-content div.post-excerpt p",
-                "div.contenido-nota div.post-excerpt p",
-            ],
-        )
+    if validate and len(invalid_args) >= 1:
+        return invalid_args
 
-        cuerpo = extract_body(
-            soup,
-            [
-                "div.post-main div.post-content div.container-redes-contenido p, div.post-main div.post-content div.container-redes-contenido h2",
-                "div.container-redes-contenido div.contenido-nota h2, div.container-redes-contenido div.contenido-nota p",
-                "div.contenido-nota div[class^='banners-contenido-nota-'] h2, div.contenido-nota div[class^='banners-contenido-nota-'] p",
-                "div.container-nota-body div.nota-content div.contenido p, div.container-nota-body div.nota-content div.contenido h2",
-            ],
-        )
-        if validate and not cuerpo:
-            invalid_args.append("cuerpo")
+    return {
+        "titulo": titulo,
+        "fecha": fecha,
+        "autor": autor,
+        "desc_autor": desc_autor,
+        "abstract": abstract,
+        "cuerpo": cuerpo,
+        "multimedia": multimedia,
+        "tipo_multimedia": "imagen",
+    }
 
-        multimedia = extract_images(
-            soup,
-            [
-                "div.post-main div.post-image img",
-                "div.post-main div.post-content div.container-redes-contenido img",
-                "div.imagen",
-                "div.contenedor-imagen-titulo div.imagen img",
-                "div.nota-top-content img",
-            ],
-        )
 
-        if validate and len(invalid_args) >= 1:
-            return invalid_args
+def scrap_news_article(
+    url: str, validate: bool = False, known: dict | None = None
+) -> dict | list | Exception:
+    """
+    Realiza el scraping completo de una noticia individual. Esta función puede devolver
+    tanto un diccionario de python como una lista con los elementos de la noticia faltantes,
+    dependiendo de los parámetros y el output.
+    """
+    try:
+        # Realizar una request al sitio (usa Session para reutilizar conexiones)
+        response = HTTP_SESSION.get(url, timeout=10)
+        response.encoding = "utf-8"
+        response.raise_for_status()
 
-        return {
-            "titulo": titulo,
-            "fecha": fecha,
-            "autor": autor,
-            "desc_autor": desc_autor,
-            "abstract": abstract,
-            "cuerpo": cuerpo,
-            "multimedia": multimedia,
-            "tipo_multimedia": "imagen",
-        }
+        # Parsear y extraer respuesta
+        return parse_news_article(response.text, validate, known)
 
     except Exception as e:
         print(f"Error al scrapear la siguiente url:\n{url}\nDetalle: {e}")
@@ -313,15 +357,47 @@ def consume_article(
     por el crawler para scrapear.
     """
     starting_time = dtime.now()
+    mensaje = {}
+    url = ""
+    index_only = False
     try:
         # Cargar el mensaje recibido por RabbitMQ y extraer la URL
         mensaje = json.loads(body)
-        url = mensaje["url"]
+        # Canonicalizar antes de scrapear (mismas reglas que el crawler)
+        url = canonicalize_url(mensaje["url"], mensaje.get("medio"))
         print(f"Mensaje recibido en scraper.")
-        # Scrapear la URL
-        scraper_results = scrap_news_article(url, validate=True)
+        card = mensaje.get("card")
+        index_only = bool(mensaje.get("index_only") and card)
+
+        # Scrapear la URL (en una ejecución solo índice basta la tarjeta del listado)
+        if index_only:
+            scraper_results = article_from_card(card, ARTICLE_FIELDS)
+        else:
+            scraper_results = scrap_news_article(url, validate=True, known=card)
+    except Exception as e:
+        scraper_results = e
+
+    finish_article(scraper_channel, mensaje, url, starting_time, scraper_results, index_only)
 
-        # Si devuelve una lista, detengo el proceso con un error
+    # --- acknowledge ---
+    ch.basic_ack(delivery_tag=method.delivery_tag)
+
+
+def finish_article(
+    channel: pika.channel.Channel,
+    mensaje: dict,
+    url: str,
+    starting_time: dtime,
+    scraper_results: dict | list | Exception,
+    index_only: bool = False,
+):
+    """
+    Publica el resultado del scraping de un artículo: métricas, log en `scraping_log_queue`
+    y, si fue exitoso, la noticia en `send_data_queue`. La usan `consume_article` y el
+    worker asíncrono (`scraper/async_worker.py`), siempre antes del ack del mensaje.
+    """
+    try:
+        # Si no devuelve un diccionario, detengo el proceso con un error
         if not isinstance(scraper_results, dict):
             raise Exception(
                 f"Error en el scraping: {(f'Faltaron los siguientes parámetros críticos: {scraper_results}' if isinstance(scraper_results, list) else scraper_results)}"
@@ -346,11 +422,14 @@ def consume_article(
             scraper_results.get("fecha", None),
         )
         print("Mensaje enviado hacia logs desde scraper...")
+
         # --- mensaje para send_data ---
         send_data_msg = scraper_results
         send_data_msg["url"] = url
+        send_data_msg["index_only"] = index_only  # solo tarjeta: campos parciales
+
         # --- publicar mensaje hacia send_data ---
-        scraper_channel.basic_publish(
+        channel.basic_publish(
             exchange="",
             routing_key=SEND_DATA_QUEUE,
             body=json.dumps(send_data_msg),
@@ -358,17 +437,18 @@ def consume_article(
         )
         print("Mensaje enviado hacia send_data desde scraper...")
 
+        # --- registrar scraping exitoso para el crawl incremental ---
+        # (solo índice no cuenta: el artículo completo sigue pendiente)
+        if not index_only:
+            mark_scraped(medio, url)
+
     except Exception as e:
         print(f"Error al scrapear:\n {e}")
         finishing_time = dtime.now()
         duration_ms = (finishing_time - starting_time).total_seconds() * 1000
 
         # --- Actualizar métricas en tiempo real ---
-        medio = (
-            mensaje.get("medio", "biobiochile")
-            if "mensaje" in locals()
-            else "biobiochile"
-        )
+        medio = mensaje.get("medio", "biobiochile")
         update_scraper_metrics(medio, "error", duration_ms)
 
         # Envío desde scraping_results_send
@@ -381,9 +461,6 @@ def consume_article(
             str(e),
         )
 
-    # --- acknowledge ---
-    ch.basic_ack(delivery_tag=method.delivery_tag)
-
 
 def main():
     global scraper_channel
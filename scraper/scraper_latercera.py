@@ -26,32 +26,85 @@ else:   # Linux/Unix/MacOS
 
 import pika
 import requests
-from bs4 import BeautifulSoup
 
 # Importa scraping_results_send() desde logger/
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from logger.queue_sender_scraper_results import scraping_results_send
 from utils.stop_signal_handler import StopSignalHandler
-from scraper.scraping_utils import (
-    extract,
-    extract_body,
-    extract_datetime,
-    extract_videos,
-    extract_body_video,
-    extract_image_with_description,
-    extract_filtered_body,
-    extract_minutoaminuto_entries
-)
+from utils.url_registry import mark_scraped
+from utils.url_canon import canonicalize_url
+from scraper.extraction_plan import ExtractionPlan, Field
+from scraper.scraping_utils import article_from_card
 
 
 SCRAPER_QUEUE = "scraper_queue"
 LOG_QUEUE = "scraping_log_queue"
 SEND_DATA_QUEUE = "send_data_queue"
 
+# Claves de la noticia publicada en send_data_queue (completa o solo índice)
+ARTICLE_FIELDS = (
+    "categoria", "titulo", "fecha", "autor", "abstract", "cuerpo", "cuerpo_en_vivo", "imagenes", "videos",
+)
+
 # Session compartida para reutilizar conexiones HTTP (connection pooling)
 HTTP_SESSION = requests.Session()
 HTTP_SESSION.headers.update({'User-Agent': 'Mozilla/5.0'})
 
+# Backend de parseo HTML del medio (ver scraper/html_parser.py)
+HTML_PARSER = "html.parser"
+
+# Campos del artículo y sus selectores de respaldo, compilados al importar
+# (ver scraper/extraction_plan.py)
+EXTRACTION_PLAN = ExtractionPlan(
+    "latercera",
+    {
+        "categoria": Field("text", ["span.article-head__section__name", "span.article-head__section__name a.base-link"]),
+        "fecha": Field("datetime", ["time.article-body__byline__date"]),
+        "titulo": Field("text", ["h1.article-head__title"]),
+        "autor": Field(
+            "text",
+            [
+                "a.article-body__byline__author",
+                "span.article-body__byline__authors address"
+            ],
+        ),
+        "abstract": Field("text", ["h2.article-head__subtitle"]),
+        # Cuerpo según la categoría: minuto a minuto, video o nota
+        "cuerpo_en_vivo": Field(
+            "filtered_body",
+            [ "p.article-body__paragraph, h2.article-body__heading-h2" ],
+            excluded=[ "div.liveblog-entry" ],
+        ),
+        "cuerpo_video": Field("video_src", [ "div.article-body__raw-html iframe" ]),
+        "cuerpo": Field("body", [ "p.article-body__paragraph, h2.article-body__heading-h2" ]),
+        "entradas": Field(
+            "entries",
+            [ "div.liveblog-entry" ],
+            date=[ "time.liveblog-entry__date" ],
+            body=[ "div.liveblog-entry__content h2, div.liveblog-entry__content p" ],
+        ),
+        "imagenes": Field(
+            "figures",
+            [ "figure.article-body__figure" ],
+            image=[ "img.global-image" ],
+            description=[ "span.article-body__figure__caption" ],
+        ),
+        "videos": Field(
+            "videos",
+            [
+                "div.article-body__oembed iframe",
+                "div.article-body__oembed-youtube iframe",
+                "div.article-body__raw-html iframe"
+            ],
+        ),
+    },
+    backend=HTML_PARSER,
+    # Parseo acotado a las regiones del artículo, con parseo completo si falta
+    # alguno de estos campos
+    regions=[],
+    critical=["categoria", "titulo", ("cuerpo", "cuerpo_video", "cuerpo_en_vivo")],
+)
+
 
 def update_scraper_metrics(medio: str, status: str, duration_ms: float = 0):
     """Actualiza las métricas del scraper en tiempo real con file locking (por medio)"""
@@ -173,15 +226,111 @@ def update_scraper_metrics(medio: str, status: str, duration_ms: float = 0):
                     break
 
 
-def scrap_news_article(url: str, validate: bool = False) -> dict | list | Exception:
+def parse_news_article(
+    html: str,
+    validate: bool = False,
+    known: dict | None = None,
+    parser: str | None = None,
+    scoped: bool | None = None,
+) -> dict | list:
+    """
+    Extrae los datos de una noticia desde su HTML ya descargado. Devuelve un diccionario
+    o, si `validate` es True y faltan parámetros críticos, la lista de los faltantes. Los
+    campos de `known` (tarjeta del listado enviada por el crawler) se usan si no se
+    encuentran en el artículo. `parser` reemplaza al backend HTML_PARSER del medio y
+    `scoped` fuerza o desactiva el parseo acotado del plan de extracción.
+    """
+    known = known or {}
+    invalid_args = []
+
+    fields = EXTRACTION_PLAN.parse(html, parser, scoped)
+
+    categoria = fields["categoria"]
+
+    fecha = fields["fecha"] or known.get("fecha")
+
+    # Convertir fecha ISO a formato legible en español (como BioBio)
+    if fecha:
+        try:
+            # Parsear fecha ISO 8601 (ej: "2025-12-08T09:01:00Z")
+            # Limpiar la 'Z' al final si existe
+            fecha_limpia = fecha.replace('Z', '+00:00') if fecha.endswith('Z') else fecha
+
+            # Parsear con datetime estándar
+            if 'T' in fecha_limpia:
+                dt = dtime.fromisoformat(fecha_limpia)
+            else:
+                # Si no es ISO, intentar otros formatos comunes
+                dt = dtime.strptime(fecha, "%Y-%m-%d")
+
+            # Mapear días y meses al español
+            dias = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+            meses = ["enero", "febrero", "marzo", "abril", "mayo", "junio",
+                     "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+
+            dia_semana = dias[dt.weekday()]
+            dia = dt.day
+            mes = meses[dt.month - 1]
+            año = dt.year
+
+            fecha = f"{dia_semana} {dia:02d} {mes} de {año}"
+        except Exception as e:
+            # Si falla, dejar la fecha original
+            print(f"Advertencia: No se pudo convertir fecha {fecha}: {e}")
+            pass
+
+    if validate and not fecha and categoria.lower().strip() != "en vivo":
+        invalid_args.append("fecha")
+
+    titulo = fields.get("titulo", known.get("titulo"))
+    if validate and not titulo:
+        invalid_args.append("titulo")
+
+    autor = fields["autor"]
+    abstract = fields.get("abstract", known.get("abstract"))
+
+    cuerpo = None
+    if categoria.lower().strip() == "en vivo":
+        cuerpo = fields["cuerpo_en_vivo"]
+    elif categoria.strip().lower() == "videos":
+        cuerpo = fields["cuerpo_video"]
+    else:
+        cuerpo = fields["cuerpo"]
+
+    entries = None
+    if categoria.lower().strip() == "en vivo":
+        entries = fields["entradas"]
+
+    imagenes = fields["imagenes"]
+    videos = fields["videos"]
+
+    if validate and not cuerpo and not imagenes:
+        invalid_args.append("cuerpo")
+
+    if validate and len(invalid_args) >= 1:
+        return invalid_args
+
+    return {
+        "categoria": categoria,
+        "titulo": titulo,
+        "fecha": fecha,
+        "autor": autor,
+        "abstract": abstract,
+        "cuerpo": cuerpo,
+        "cuerpo_en_vivo": entries,
+        "imagenes": imagenes,
+        "videos": videos
+    }
+
+
+def scrap_news_article(
+    url: str, validate: bool = False, known: dict | None = None
+) -> dict | list | Exception:
     """
     Realiza el scraping completo de una noticia individual. Esta función puede devolver
     tanto un diccionario de python como una lista con los elementos de la noticia faltantes,
     dependiendo de los parámetros y el output.
     """
-
-    invalid_args = []
-
     try:
         # Realizar una request al sitio (usa Session para reutilizar conexiones)
         response = HTTP_SESSION.get(url, timeout=10)
@@ -189,138 +338,7 @@ def scrap_news_article(url: str, validate: bool = False) -> dict | list | Except
         response.raise_for_status()
 
         # Parsear y extraer respuesta
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        categoria = extract(soup, ["span.article-head__section__name", "span.article-head__section__name a.base-link"])
-
-        fecha = extract_datetime(
-            soup,
-            [
-                "time.article-body__byline__date",
-            ],
-        )
-
-        # Convertir fecha ISO a formato legible en español (como BioBio)
-        if fecha:
-            try:
-                # Parsear fecha ISO 8601 (ej: "2025-12-08T09:01:00Z")
-                # Limpiar la 'Z' al final si existe
-                fecha_limpia = fecha.replace('Z', '+00:00') if fecha.endswith('Z') else fecha
-
-                # Parsear con datetime estándar
-                if 'T' in fecha_limpia:
-                    dt = dtime.fromisoformat(fecha_limpia)
-                else:
-                    # Si no es ISO, intentar otros formatos comunes
-                    dt = dtime.strptime(fecha, "%Y-%m-%d")
-
-                # Mapear días y meses al español
-                dias = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
-                meses = ["enero", "febrero", "marzo", "abril", "mayo", "junio",
-                         "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
-
-                dia_semana = dias[dt.weekday()]
-                dia = dt.day
-                mes = meses[dt.month - 1]
-                año = dt.year
-
-                fecha = f"{dia_semana} {dia:02d} {mes} de {año}"
-            except Exception as e:
-                # Si falla, dejar la fecha original
-                print(f"Advertencia: No se pudo convertir fecha {fecha}: {e}")
-                pass
-
-        if validate and not fecha and categoria.lower().strip() != "en vivo":
-            invalid_args.append("fecha")
-
-        titulo = extract(
-            soup,
-            [
-                "h1.article-head__title",
-            ],
-        )
-        if validate and not titulo:
-            invalid_args.append("titulo")
-
-        autor = extract(
-            soup,
-            [
-                "a.article-body__byline__author",
-                "span.article-body__byline__authors address"
-            ],
-        )
-
-        abstract = extract(
-            soup,
-            [
-                "h2.article-head__subtitle",
-            ],
-        )
-
-        cuerpo = None
-        if categoria.lower().strip() == "en vivo":
-            cuerpo = extract_filtered_body(
-                soup,
-                [ "p.article-body__paragraph, h2.article-body__heading-h2" ],
-                [ "div.liveblog-entry" ]
-            )
-        elif categoria.strip().lower() == "videos":
-            cuerpo = extract_body_video(
-                soup,
-                [
-                    "div.article-body__raw-html iframe"
-                ],
-            )
-        else:
-            cuerpo = extract_body(
-                soup,
-                [
-                    "p.article-body__paragraph, h2.article-body__heading-h2",
-                ],
-            )
-
-        entries = None
-        if categoria.lower().strip() == "en vivo":
-            entries = extract_minutoaminuto_entries(
-                soup,
-                [ "div.liveblog-entry" ],
-                [ "time.liveblog-entry__date" ],
-                [ "div.liveblog-entry__content h2, div.liveblog-entry__content p" ]
-            )
-
-        imagenes = extract_image_with_description(
-            soup,
-            [ "figure.article-body__figure" ],
-            [ "img.global-image" ],
-            [ "span.article-body__figure__caption" ],
-        )
-
-        videos = extract_videos(
-            soup,
-            [
-                "div.article-body__oembed iframe",
-                "div.article-body__oembed-youtube iframe",
-                "div.article-body__raw-html iframe"
-            ],
-        )
-
-        if validate and not cuerpo and not imagenes:
-            invalid_args.append("cuerpo")
-
-        if validate and len(invalid_args) >= 1:
-            return invalid_args
-
-        return {
-            "categoria": categoria,
-            "titulo": titulo,
-            "fecha": fecha,
-            "autor": autor,
-            "abstract": abstract,
-            "cuerpo": cuerpo,
-            "cuerpo_en_vivo": entries,
-            "imagenes": imagenes,
-            "videos": videos
-        }
+        return parse_news_article(response.text, validate, known)
 
     except Exception as e:
         print(f"Error al scrapear la siguiente url:\n{url}\nDetalle: {e}")
@@ -337,24 +355,57 @@ def consume_article(
     Función llamada por RabbitMQ cada vez que le llegue un artículo extraido
     por el crawler para scrapear.
     """
-
     starting_time = dtime.now()
+    mensaje = {}
+    url = ""
+    index_only = False
     try:
         # Cargar el mensaje recibido por RabbitMQ y extraer la URL
         mensaje = json.loads(body)
-        url = mensaje["url"]
+        # Canonicalizar antes de scrapear (mismas reglas que el crawler)
+        url = canonicalize_url(mensaje["url"], mensaje.get("medio"))
         print(f"Mensaje recibido en scraper.")
+        card = mensaje.get("card")
+        index_only = bool(mensaje.get("index_only") and card)
 
-        # Scrapear la URL
-        scraper_results = scrap_news_article(url, validate = True)
+        # Scrapear la URL (en una ejecución solo índice basta la tarjeta del listado)
+        if index_only:
+            scraper_results = article_from_card(card, ARTICLE_FIELDS)
+        else:
+            scraper_results = scrap_news_article(url, validate = True, known = card)
+    except Exception as e:
+        scraper_results = e
+
+    finish_article(scraper_channel, mensaje, url, starting_time, scraper_results, index_only)
+
+    # --- acknowledge ---
+    ch.basic_ack(delivery_tag=method.delivery_tag)
 
+
+def finish_article(
+    channel: pika.channel.Channel,
+    mensaje: dict,
+    url: str,
+    starting_time: dtime,
+    scraper_results: dict | list | Exception,
+    index_only: bool = False,
+):
+    """
+    Publica el resultado del scraping de un artículo: métricas, log en `scraping_log_queue`
+    y, si fue exitoso, la noticia en `send_data_queue`. La usan `consume_article` y el
+    worker asíncrono (`scraper/async_worker.py`), siempre antes del ack del mensaje.
+    """
+    try:
+        # Si no devuelve un diccionario, detengo el proceso con un error
         if not isinstance(scraper_results, dict):
-            raise Exception(f"Error en el scraping: { (f'Faltaron los siguientes parámetros críticos: {scraper_results}' if isinstance(scraper_results, list) else scraper_results) }")
+            raise Exception(
+                f"Error en el scraping: {(f'Faltaron los siguientes parámetros críticos: {scraper_results}' if isinstance(scraper_results, list) else scraper_results)}"
+            )
 
         finishing_time = dtime.now()
         duration_ms = (finishing_time - starting_time).total_seconds() * 1000
 
-        # Actualizar métricas en tiempo real (pasar medio del mensaje)
+        # --- Actualizar métricas en tiempo real ---
         medio = mensaje.get("medio", "latercera")
         update_scraper_metrics(medio, "success", duration_ms)
 
@@ -374,9 +425,10 @@ def consume_article(
         # --- mensaje para send_data ---
         send_data_msg = scraper_results
         send_data_msg["url"] = url
+        send_data_msg["index_only"] = index_only  # solo tarjeta: campos parciales
 
         # --- publicar mensaje hacia send_data ---
-        scraper_channel.basic_publish(
+        channel.basic_publish(
             exchange="",
             routing_key=SEND_DATA_QUEUE,
             body=json.dumps(send_data_msg),
@@ -384,13 +436,18 @@ def consume_article(
         )
         print("Mensaje enviado hacia send_data desde scraper...")
 
+        # --- registrar scraping exitoso para el crawl incremental ---
+        # (solo índice no cuenta: el artículo completo sigue pendiente)
+        if not index_only:
+            mark_scraped(medio, url)
+
     except Exception as e:
         print(f"Error al scrapear:\n {e}")
         finishing_time = dtime.now()
         duration_ms = (finishing_time - starting_time).total_seconds() * 1000
 
-        # Actualizar métricas en tiempo real
-        medio = mensaje.get("medio", "latercera") if "mensaje" in locals() else "latercera"
+        # --- Actualizar métricas en tiempo real ---
+        medio = mensaje.get("medio", "latercera")
         update_scraper_metrics(medio, "error", duration_ms)
 
         # Envío desde scraping_results_send
@@ -403,9 +460,6 @@ def consume_article(
             str(e),
         )
 
-    # --- acknowledge ---
-    ch.basic_ack(delivery_tag=method.delivery_tag)
-
 
 def main():
     global scraper_channel
@@ -3,6 +3,17 @@ from urllib.parse import urljoin
 import re
 
 
+def article_from_card(card: dict, fields: tuple[str, ...]) -> dict:
+    """
+    Noticia "solo índice" construida con los campos de la tarjeta del listado
+    que envía el crawler (`card`), sin descargar el artículo. Tiene las mismas
+    claves que la noticia completa del medio (`fields`, ARTICLE_FIELDS del
+    scraper); las que la tarjeta no trae quedan en None.
+    """
+
+    return {field: card.get(field) for field in fields}
+
+
 def extract(
     soup: BeautifulSoup, 
     selectors: list[str], 
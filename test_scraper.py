@@ -1,10 +1,12 @@
 import csv
 import json
+import os
 import argparse
 from sys import exit
 
 import scraper.scraper_biobio as biobio
 import scraper.scraper_latercera as latercera
+from scheduler.scheduler_queue_utils import crawl_running, read_crawler_progress
 
 
 DIRECCION_OUTPUT = "scraper/data/"
@@ -18,15 +20,24 @@ MEDIOS_DISPONIBLES = {
     "latercera": latercera.scrap_news_article
 }
 
-def main(medio: str = None, desde: int = 1, hasta: int = None, output: bool = False):
+def main(medio: str = None, desde: int = 1, hasta: int = None, output: bool = False, run_id: str = None):
 
     if not medio: 
         print("Error: No se ha ingresado ningún medio.")
         exit(1)
 
-    # Extraer la información del crawler
+    # Extraer la información del crawler. El inventario parcial (.part) se usa si
+    # crawler_progress.json indica que el crawl de la misma ejecución sigue en curso;
+    # un .part de un crawl interrumpido solo se usa si no hay inventario final
     try:
-        with open(DIRECCIONES_CRAWLER[medio], "r", newline = "", encoding = "utf-8") as f:
+        direccion = DIRECCIONES_CRAWLER[medio]
+        sitio = os.path.splitext(os.path.basename(direccion))[0]
+        en_curso = crawl_running(read_crawler_progress(sitio, run_id))
+        if os.path.exists(direccion + ".part") and (en_curso or not os.path.exists(direccion)):
+            print(f"Usando inventario parcial {direccion}.part ({'crawl en curso' if en_curso else 'crawl interrumpido'})")
+            direccion += ".part"
+
+        with open(direccion, "r", newline = "", encoding = "utf-8") as f:
             reader = csv.reader(f)
             lista_url = [linea for linea in reader if linea]
     
@@ -79,6 +90,7 @@ if __name__ == "__main__":
     parser.add_argument("--medio", type = str, default = None, help = "Nombre del medio de prensa a scrapear\nOpciones:\n\t- BioBioChile -> biobio\n\t- La Tercera -> latercera")
     parser.add_argument("--desde", type = int, default = None, help = "Desde qué línea del archivo .csv se comienza a scrappear")
     parser.add_argument("--hasta", type = int, default = None, help = "Hasta qué línea del archivo .csv se scrappea")
+    parser.add_argument("--run-id", type = str, default = None, help = "Ejecución del crawler (--run-id) cuyo inventario parcial se puede leer mientras el crawl sigue en curso")
     parser.add_argument("--output", action = "store_true", help = "Incluir esta flag si se desea que el output del scraping sea escrito en un archivo output.json dentro de la carpeta scraper/data")
 
     args = parser.parse_args()
@@ -87,10 +99,11 @@ if __name__ == "__main__":
     desde = args.desde if args.desde else 1
     hasta = args.hasta if args.hasta else None
     output = args.output
+    run_id = args.run_id
 
     if medio not in MEDIOS_DISPONIBLES:
         print(f"Error: Ingrese un medio válido\nMedios disponibles:\n\t-> { [key for key in MEDIOS_DISPONIBLES.keys()] }")
         exit(1)
 
     #print(f"medio: {medio}\ndesde: {desde}\nhasta: {hasta}\noutput: {output}")
-    main(medio = medio, desde = desde, hasta = hasta, output = output)
+    main(medio = medio, desde = desde, hasta = hasta, output = output, run_id = run_id)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los módulos del crawler se importan por nombre (se ejecutan desde Crawler/)
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Crawler"))
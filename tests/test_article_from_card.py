@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+import scraper.scraper_biobio as biobio
+import scraper.scraper_latercera as latercera
+from scraper import extraction_plan
+from scraper.scraping_utils import article_from_card
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "scraper")
+CASOS = [(biobio, "biobio/nota_comentarios.html"), (latercera, "latercera/nota_comentarios.html")]
+
+
+@pytest.fixture(autouse=True)
+def metricas_temporales(monkeypatch, tmp_path):
+    monkeypatch.setattr(extraction_plan, "STATS_FILE", str(tmp_path / "extraction_plan.json"))
+
+
+@pytest.mark.parametrize("scraper, fixture", CASOS, ids=["biobio", "latercera"])
+def test_solo_indice_tiene_las_claves_de_la_noticia_completa(scraper, fixture):
+    with open(os.path.join(FIXTURES, fixture), "r", encoding="utf-8") as f:
+        completa = scraper.parse_news_article(f.read())
+    scraper.EXTRACTION_PLAN.take_stats()
+
+    solo_indice = article_from_card({"titulo": "Título", "fecha": "2025-06-01", "imagen": "x.jpg"},
+                                    scraper.ARTICLE_FIELDS)
+
+    assert list(solo_indice) == list(completa) == list(scraper.ARTICLE_FIELDS)
+    assert solo_indice["titulo"] == "Título"
+    assert solo_indice["cuerpo"] is None
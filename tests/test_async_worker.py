@@ -0,0 +1,114 @@
+import os
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import pytest
+
+import scraper.scraper_latercera as latercera
+from scraper import async_worker, extraction_plan
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "scraper", "latercera", "nota_comentarios.html")
+
+
+class FakePool(Executor):
+    """
+    Pool en el mismo proceso; si `broken`, cada tarea falla como cuando
+    muere un proceso del ProcessPoolExecutor
+    """
+
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("un proceso del pool murió"))
+        else:
+            future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+class FakeChannel:
+    def __init__(self):
+        self.acks = []
+        self.nacks = []
+
+    def basic_ack(self, delivery_tag):
+        self.acks.append(delivery_tag)
+
+    def basic_nack(self, delivery_tag, requeue):
+        self.nacks.append((delivery_tag, requeue))
+
+
+@pytest.fixture(autouse=True)
+def metricas_temporales(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_plan, "STATS_FILE", str(tmp_path / "extraction_plan.json"))
+    latercera.EXTRACTION_PLAN.take_stats()
+    yield
+    latercera.EXTRACTION_PLAN.take_stats()
+
+
+def _worker(pools):
+    worker = async_worker.AsyncScraperWorker(latercera, parse_workers=1)
+    worker._new_pool = lambda: pools.pop(0)
+    worker._pool = worker._new_pool()
+    return worker
+
+
+def _parse(worker, html):
+    async def run():
+        worker._parse_queue = async_worker.asyncio.Queue(maxsize=worker.buffer)
+        stage = async_worker.asyncio.ensure_future(worker._parse_stage())
+        try:
+            return await worker._parse(html, None)
+        finally:
+            stage.cancel()
+
+    return worker._loop.run_until_complete(run())
+
+
+def test_pool_roto_se_recrea_y_el_articulo_se_reintenta():
+    with open(FIXTURE, "rb") as f:
+        html = f.read()
+    broken = FakePool(broken=True)
+    worker = _worker([broken, FakePool()])
+
+    noticia = _parse(worker, html)
+
+    assert noticia["titulo"]
+    assert broken.shut_down
+    assert worker.stage_stats()["extraccion"]["reinicios_pool"] == 1
+    # Los contadores del proceso de extracción llegan al plan del proceso principal
+    assert latercera.EXTRACTION_PLAN.articles == 1
+    assert any(latercera.EXTRACTION_PLAN.hits["titulo"].values())
+
+
+def test_pool_roto_en_todos_los_intentos_devuelve_el_mensaje_a_la_cola():
+    worker = _worker([FakePool(broken=True) for _ in range(async_worker.PARSE_ATTEMPTS + 1)])
+    worker.channel = FakeChannel()
+    worker.pending = 2
+    published = []
+    worker.scraper = SimpleNamespace(
+        __name__=latercera.__name__,
+        finish_article=lambda channel, *result: published.append(result),
+    )
+
+    with pytest.raises(BrokenProcessPool):
+        _parse(worker, b"<html></html>")
+
+    result = ({}, "https://www.latercera.com/nota/", None, BrokenProcessPool("pool roto"), False)
+    future = Future()
+    future.set_result(result)
+    worker._finish(SimpleNamespace(delivery_tag=1, redelivered=False), future)
+    assert worker.channel.nacks == [(1, True)]
+    assert published == []
+
+    # Reentregado: se publica como error y se hace el ack, sin ciclar
+    worker._finish(SimpleNamespace(delivery_tag=2, redelivered=True), future)
+    assert worker.channel.acks == [2]
+    assert published == [result]
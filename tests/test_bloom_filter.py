@@ -0,0 +1,39 @@
+from unittest import mock
+
+import bloom_filter
+from bloom_filter import BloomFilter, ScalableBloomFilter
+
+
+def test_crece_mientras_quepa_en_el_presupuesto():
+    sbf = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    for i in range(1000):
+        sbf.add(f"https://medio.cl/noticia-{i}")
+    assert len(sbf.filters) > 1
+    assert all(f"https://medio.cl/noticia-{i}" in sbf for i in range(1000))
+
+
+def test_saturado_no_reserva_filtros_nuevos():
+    sbf = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01, max_bytes=4000)
+
+    with mock.patch.object(bloom_filter, "BloomFilter", wraps=BloomFilter) as construidos:
+        for i in range(20_000):
+            sbf.add(f"https://medio.cl/noticia-{i}")
+
+    assert sbf._saturated
+    assert sbf.nbytes <= 4000
+    # Solo los filtros que cupieron se construyeron; el resto se agrega al último
+    assert construidos.call_count == len(sbf.filters) - 1
+    assert len(sbf) == sum(f.count for f in sbf.filters)
+    assert sbf.filters[-1].count > sbf.filters[-1].capacity
+
+
+def test_snapshot_conserva_elementos(tmp_path):
+    sbf = ScalableBloomFilter(initial_capacity=100, error_rate=0.01, max_bytes=2000)
+    for i in range(500):
+        sbf.add(f"https://medio.cl/noticia-{i}")
+    path = str(tmp_path / "seen.bloom")
+    sbf.save(path)
+
+    loaded = ScalableBloomFilter.load(path)
+    assert len(loaded) == len(sbf)
+    assert all(f"https://medio.cl/noticia-{i}" in loaded for i in range(500))
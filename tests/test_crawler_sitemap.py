@@ -0,0 +1,88 @@
+import asyncio
+import os
+from datetime import date
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+
+with mock.patch("pika.BlockingConnection"):
+    import crawler_sitemap
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "sitemaps")
+NEWS_PATTERN = ["/noticias/"]
+
+
+class FakeSession:
+    """
+    Lo que usa crawler_sitemap de CrawlSession: el cliente HTTP
+    """
+
+    def __init__(self, http=None):
+        self._http = http
+
+    def http(self):
+        return self._http
+
+
+async def _discover(session, source, since=None):
+    return [item async for item in crawler_sitemap.discover_urls(session, source, NEWS_PATTERN, since=since)]
+
+
+def _slugs(items):
+    return [url.rsplit("/", 1)[-1] for url, _ in items]
+
+
+def test_index_local_con_sitemap_gz():
+    items = asyncio.run(_discover(FakeSession(), os.path.join(FIXTURES, "sitemap_index.xml")))
+
+    assert _slugs(items) == ["noticia-uno.shtml", "noticia-dos.shtml", "noticia-tres.shtml"]
+    # El <loc> de la imagen no reemplaza al de la noticia; en news sitemaps la fecha es publication_date
+    assert items[0][1] == "2025-05-10T09:15:00-04:00"
+    assert items[2][1] == "2025-06-03T12:00:00-04:00"
+
+
+def test_index_omite_hijos_anteriores_a_la_ventana():
+    items = asyncio.run(_discover(FakeSession(), os.path.join(FIXTURES, "sitemap_index.xml"), since=date(2025, 6, 1)))
+    assert _slugs(items) == ["noticia-tres.shtml"]
+
+
+def test_feed_rss():
+    items = asyncio.run(_discover(FakeSession(), "file://" + os.path.join(FIXTURES, "feed.xml")))
+    assert items == [(
+        "https://www.biobiochile.cl/noticias/internacional/2025/06/04/noticia-cuatro.shtml",
+        "Wed, 04 Jun 2025 10:00:00 -0400",
+    )]
+
+
+async def _serve_fixture(request):
+    name = request.match_info["name"]
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        body = f.read()
+    headers = {}
+    # Algunos servidores envían el .xml.gz con Content-Encoding y aiohttp lo descomprime
+    if name.endswith(".gz") and request.query.get("encoding") == "gzip":
+        headers["Content-Encoding"] = "gzip"
+    return web.Response(body=body, content_type="application/xml", headers=headers)
+
+
+async def _discover_http(query):
+    app = web.Application()
+    app.router.add_get("/{name}", _serve_fixture)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as http:
+            source = f"http://127.0.0.1:{port}/noticias-2025-06.xml.gz{query}"
+            return await _discover(FakeSession(http), source)
+    finally:
+        await runner.cleanup()
+
+
+def test_gz_remoto_con_y_sin_content_encoding():
+    sin_encoding = asyncio.run(_discover_http(""))
+    con_encoding = asyncio.run(_discover_http("?encoding=gzip"))
+    assert _slugs(sin_encoding) == _slugs(con_encoding) == ["noticia-tres.shtml"]
@@ -0,0 +1,149 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+# crawler_sender se conecta a RabbitMQ al importarse
+with mock.patch("pika.BlockingConnection"):
+    import crawler_sender
+from crawler_sender import LinkPublisher, LinkPublishError
+
+
+class FakeChannel:
+    def __init__(self, fail_commit=False):
+        self.fail_commit = fail_commit
+        self.published = []
+        self.closed = False
+        self.rollbacks = 0
+
+    def tx_select(self):
+        pass
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        self.published.append(body)
+
+    def tx_commit(self):
+        if self.fail_commit:
+            raise ConnectionError("canal caído")
+
+    def tx_rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def sin_esperas(monkeypatch):
+    monkeypatch.setattr(crawler_sender, "PUBLISH_RETRY_DELAY", 0)
+    monkeypatch.setattr(crawler_sender, "send_error", lambda *args: None)
+
+
+def test_reintenta_en_un_canal_nuevo_y_registra_tras_el_commit():
+    channels = [FakeChannel(fail_commit=True), FakeChannel()]
+    committed = []
+    publisher = LinkPublisher(lambda: channels.pop(0), "scraper_queue", batch_size=2,
+                              on_commit=committed.extend)
+
+    publisher.publish({"url": "https://medio.cl/a"})
+    assert committed == []
+    publisher.publish({"url": "https://medio.cl/b"})
+
+    assert [m["url"] for m in committed] == ["https://medio.cl/a", "https://medio.cl/b"]
+    assert publisher.stats()["reintentos"] == 1
+    assert publisher.stats()["mensajes_publicados"] == 2
+
+
+def test_lote_fallido_lanza_error_y_no_se_registra():
+    created = []
+
+    def factory():
+        created.append(FakeChannel(fail_commit=True))
+        return created[-1]
+
+    committed = []
+    publisher = LinkPublisher(factory, "scraper_queue", batch_size=10, max_retries=3,
+                              on_commit=committed.extend)
+    publisher.publish({"url": "https://medio.cl/a"})
+
+    with pytest.raises(LinkPublishError):
+        publisher.close()
+    assert committed == []
+    # Cada intento usa un canal nuevo; el caído no se reutiliza ni para el rollback
+    assert len(created) == 3
+    assert all(c.closed and c.rollbacks == 0 for c in created)
+
+
+def test_buffer_acotado():
+    publisher = LinkPublisher(lambda: FakeChannel(fail_commit=True), "scraper_queue", batch_size=2,
+                              max_retries=1, max_buffer=4)
+    publisher.publish({"url": "https://medio.cl/0"})
+    for i in range(1, 4):
+        with pytest.raises(LinkPublishError):
+            publisher.publish({"url": f"https://medio.cl/{i}"})
+    with pytest.raises(LinkPublishError, match="Buffer"):
+        publisher.publish({"url": "https://medio.cl/4"})
+
+
+def test_links_solo_indice_no_se_registran(monkeypatch):
+    with mock.patch("pika.BlockingConnection"):
+        import crawler_loadmore
+
+    registry = mock.Mock()
+    monkeypatch.setattr(crawler_loadmore, "url_registry", registry)
+    crawler_loadmore.mark_committed([
+        {"url": "https://medio.cl/a", "index_only": True},
+        {"url": "https://medio.cl/b"},
+    ])
+    assert list(registry.mark_enqueued.call_args.args[0]) == ["https://medio.cl/b"]
+
+
+def test_solo_indice_solo_para_links_con_tarjeta(monkeypatch):
+    with mock.patch("pika.BlockingConnection"):
+        import crawler_loadmore
+
+    sent = []
+
+    async def send_link(link, *args):
+        sent.append((link, args[-1]))
+
+    monkeypatch.setattr(crawler_loadmore, "send_link", send_link)
+    monkeypatch.setattr(crawler_loadmore, "seen_links", crawler_loadmore.ScalableBloomFilter())
+    monkeypatch.setattr(crawler_loadmore, "url_registry", None)
+    monkeypatch.setattr(crawler_loadmore, "index_only", True)
+
+    asyncio.run(crawler_loadmore.publish_links(
+        [("nacional", "https://medio.cl/a", None), ("nacional", "https://medio.cl/b", None)],
+        cards={"https://medio.cl/a": {"titulo": "A"}},
+    ))
+    # Sin tarjeta el scraper descarga el artículo: no va como solo índice
+    assert sent == [("https://medio.cl/a", True), ("https://medio.cl/b", False)]
+
+
+def test_reintento_asincrono_no_bloquea_el_event_loop(monkeypatch):
+    monkeypatch.setattr(crawler_sender, "PUBLISH_RETRY_DELAY", 0.05)
+    channels = [FakeChannel(fail_commit=True), FakeChannel()]
+    committed = []
+    publisher = LinkPublisher(lambda: channels.pop(0), "scraper_queue", batch_size=2,
+                              on_commit=committed.extend)
+
+    async def run():
+        ticks = 0
+
+        async def other_category():
+            nonlocal ticks
+            while not committed:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        async def publish():
+            await publisher.publish_async({"url": "https://medio.cl/a"})
+            await publisher.publish_async({"url": "https://medio.cl/b"})
+
+        await asyncio.gather(other_category(), publish())
+        return ticks
+
+    # Las demás corrutinas siguen corriendo durante la espera del reintento
+    assert asyncio.run(run()) > 1
+    assert [m["url"] for m in committed] == ["https://medio.cl/a", "https://medio.cl/b"]
+    assert publisher.stats()["reintentos"] == 1
@@ -0,0 +1,22 @@
+from request_filter import RequestFilter
+
+
+def test_por_defecto_solo_bloquea_la_lista():
+    request_filter = RequestFilter.for_site({"start_url": "https://www.latercera.com/"})
+
+    assert request_filter.decide("https://www.latercera.com/politica/", "document") == "permitida"
+    # Listado cargado desde una API o CDN en otro dominio
+    assert request_filter.decide("https://api.arcpublishing.com/content/v4/", "fetch") == "permitida"
+    assert request_filter.decide("https://securepubads.g.doubleclick.net/tag/js/gpt.js", "script") == "lista"
+    assert request_filter.decide("https://www.latercera.com/logo.png", "image") == "tipo"
+
+
+def test_bloquear_terceros_respeta_los_hosts_permitidos():
+    request_filter = RequestFilter.for_site({
+        "start_url": "https://www.latercera.com/",
+        "block_third_party": True,
+        "allowed_script_hosts": ["arcpublishing.com"],
+    })
+
+    assert request_filter.decide("https://api.arcpublishing.com/content/v4/", "fetch") == "permitida"
+    assert request_filter.decide("https://cdn.otro-sitio.com/app.js", "script") == "tercero"
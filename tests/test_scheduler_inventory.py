@@ -0,0 +1,64 @@
+import json
+
+from scheduler import scheduler_queue_utils as utils
+
+
+def _progress(tmp_path, **data):
+    (tmp_path / "metrics").mkdir(exist_ok=True)
+    with open(tmp_path / utils.CRAWLER_PROGRESS_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_usa_el_formato_del_crawler(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Crawler").mkdir()
+    with open(tmp_path / "Crawler/latercera.jsonl", "w", encoding="utf-8") as f:
+        f.write('{"tags": "politica", "url": "https://www.latercera.com/a/"}\n')
+        f.write('{"tags": "politica", "url": "https://www.latercera.com/b/"}\n')
+
+    assert utils.crawler_inventory_path("latercera") == "Crawler/latercera.jsonl"
+    _progress(tmp_path, sitio="latercera", inventario="Crawler/latercera.jsonl")
+    assert utils.expected_crawler_urls("latercera") == 2
+
+
+def test_compara_contra_los_links_encolados(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Crawler").mkdir()
+    with open(tmp_path / "Crawler/biobiochile.csv", "w", encoding="utf-8") as f:
+        f.write("nacional,https://www.biobiochile.cl/a\nnacional,https://www.biobiochile.cl/b\n")
+
+    # 1 de los 2 links del inventario lo omitió el registro persistente
+    _progress(tmp_path, sitio="biobiochile", inventario="Crawler/biobiochile.csv", urls_encoladas=1)
+    assert utils.expected_crawler_urls("biobiochile") == 1
+
+    # Progreso de otro medio: se cuenta el inventario
+    _progress(tmp_path, sitio="latercera", urls_encoladas=7)
+    assert utils.expected_crawler_urls("biobiochile") == 2
+
+
+def test_part_solo_mientras_corre_la_misma_ejecucion(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Crawler").mkdir()
+    for path in ("Crawler/biobiochile.csv", "Crawler/biobiochile.csv.part"):
+        with open(tmp_path / path, "w", encoding="utf-8") as f:
+            f.write("nacional,https://www.biobiochile.cl/a\n")
+
+    def inventario(run_id=None):
+        return utils.crawler_inventory_path("biobiochile", utils.read_crawler_progress("biobiochile", run_id))
+
+    # .part de un crawl interrumpido, sin progreso o con el crawl terminado: se usa el final
+    assert inventario() == "Crawler/biobiochile.csv"
+    _progress(tmp_path, sitio="biobiochile", run_id="r1", status="completed")
+    assert inventario("r1") == "Crawler/biobiochile.csv"
+
+    # Crawl en curso de la misma ejecución: se usa el parcial
+    _progress(tmp_path, sitio="biobiochile", run_id="r1", status="running")
+    assert inventario("r1") == "Crawler/biobiochile.csv.part"
+
+    # En curso pero de otra ejecución: el progreso no aplica
+    assert inventario("r2") == "Crawler/biobiochile.csv"
+    assert inventario() == "Crawler/biobiochile.csv"
+
+    # Sin inventario final, el .part es lo único disponible
+    (tmp_path / "Crawler/biobiochile.csv").unlink()
+    assert inventario("r2") == "Crawler/biobiochile.csv.part"
@@ -0,0 +1,127 @@
+import glob
+import os
+
+import pytest
+
+import scraper.scraper_biobio as biobio
+import scraper.scraper_latercera as latercera
+from scraper import extraction_plan
+from scraper.html_parser import BACKENDS, close_paragraphs, parse_html, scope_html
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "scraper")
+MEDIOS = {"biobio": biobio, "latercera": latercera}
+CASOS = [
+    (medio, path)
+    for medio in MEDIOS
+    for path in sorted(glob.glob(os.path.join(FIXTURES, medio, "*.html")))
+]
+
+
+@pytest.fixture(autouse=True, scope="module")
+def metricas_temporales(tmp_path_factory):
+    # Los contadores de selectores no se escriben en metrics/ del repo
+    original = extraction_plan.STATS_FILE
+    extraction_plan.STATS_FILE = str(tmp_path_factory.mktemp("metrics") / "extraction_plan.json")
+    yield
+    for scraper in MEDIOS.values():
+        scraper.EXTRACTION_PLAN.save_stats()
+    extraction_plan.STATS_FILE = original
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("medio, path", CASOS, ids=[f"{m}/{os.path.basename(p)}" for m, p in CASOS])
+def test_parseo_acotado_equivale_al_completo(medio, path, backend):
+    html = _read(path)
+    scraper = MEDIOS[medio]
+
+    completo = scraper.parse_news_article(html, parser=backend, scoped=False)
+    acotado = scraper.parse_news_article(html, parser=backend, scoped=True)
+
+    assert acotado == completo
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_comentarios_no_cortan_ni_agregan_regiones(backend):
+    html = _read(os.path.join(FIXTURES, "latercera", "nota_comentarios.html"))
+    noticia = latercera.parse_news_article(html, parser=backend, scoped=True)
+
+    # El </figure> dentro del comentario no termina la figura
+    assert noticia["imagenes"] == [{"url": "https://www.latercera.com/resizer/foto-senado.jpg", "descripcion": "Cap"}]
+    # El párrafo comentado no se publica y los <p> sin cerrar no se extienden al footer
+    assert "comentado" not in noticia["cuerpo"]
+    assert "Otra nota" not in noticia["cuerpo"]
+
+
+def test_scope_html_ignora_etiquetas_en_comentarios():
+    html = (
+        '<body><figure class="fig"><!-- </figure> --><span>Cap</span></figure>'
+        '<!-- <figure class="fig">oculta</figure> -->'
+        '<div>fuera</div></body>'
+    )
+    scoped = scope_html(html, ("figure.fig",))
+    assert "<span>Cap</span></figure>" in scoped
+    assert "oculta" not in scoped.replace("<!-- </figure> -->", "")
+    assert "fuera" not in scoped
+
+
+def test_scope_html_comentario_sin_cerrar():
+    html = '<body><p class="a">uno</p><!-- borrador <p class="a">dos</p>'
+    scoped = scope_html(html, ("p.a",))
+    assert "uno" in scoped and "dos" not in scoped
+
+
+def test_scope_html_p_sin_cerrar_termina_con_su_padre():
+    html = '<body><div><p class="a">uno<p class="a">dos</div><footer>pie</footer></body>'
+    scoped = scope_html(html, ("p.a",))
+    assert "dos" in scoped and "pie" not in scoped
+
+
+def test_scope_html_regiones_anidadas_se_unen_en_la_externa():
+    html = (
+        '<body><div class="entrada"><div><p class="a">cita</p></div></div>'
+        '<p class="a">fin</p><aside>otro</aside></body>'
+    )
+    scoped = scope_html(html, ("div.entrada", "p.a"))
+    assert scoped.count("cita") == 1
+    assert scoped.index("cita") < scoped.index("fin")
+    assert "otro" not in scoped
+
+
+@pytest.mark.parametrize("scoped", [False, True], ids=["completo", "acotado"])
+@pytest.mark.parametrize("medio, path", CASOS, ids=[f"{m}/{os.path.basename(p)}" for m, p in CASOS])
+def test_backends_equivalen(medio, path, scoped):
+    html = _read(path)
+    scraper = MEDIOS[medio]
+
+    resultados = [scraper.parse_news_article(html, parser=backend, scoped=scoped) for backend in BACKENDS]
+
+    assert all(resultado == resultados[0] for resultado in resultados)
+
+
+def test_parrafos_sin_cerrar_se_cierran_como_en_lxml():
+    html = "<div><p>a<p>b<h2>c</h2><p>d</div><table><tr><td><p>e</td></tr></table><!-- <p> --><p>f<button><div>g</div></button></p>"
+    assert close_paragraphs(html) == (
+        "<div><p>a</p><p>b</p><h2>c</h2><p>d</div><table><tr><td><p>e</td></tr></table><!-- <p> --><p>f<button><div>g</div></button></p>"
+    )
+
+
+@pytest.mark.parametrize("medio, path", CASOS, ids=[f"{m}/{os.path.basename(p)}" for m, p in CASOS])
+def test_find_all_equivale_entre_backends(medio, path):
+    html = _read(path)
+    arboles = [parse_html(html, backend) for backend in ("html.parser", "lxml")]
+
+    def resumen(arbol):
+        body = arbol.select_one("body")
+        return (
+            [(tag.name, tag.get_text(strip=True)) for tag in body.find_all(["p", "h1", "h2", "figure"])],
+            [tag.get("class") for tag in body.find_all(class_=True)],
+            [tag.name for tag in body.find_all(True, recursive=False)],
+            [texto.strip() for texto in body.find_all(string=True) if texto.strip()],
+        )
+
+    assert resumen(arboles[0]) == resumen(arboles[1])
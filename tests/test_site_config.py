@@ -0,0 +1,38 @@
+from unittest import mock
+
+from crawl_window import CrawlWindow
+
+# crawler importa crawler_sender, que se conecta a RabbitMQ al importarse
+with mock.patch("pika.BlockingConnection"):
+    from crawler import SITES, site_config_errors
+
+
+def test_configuracion_actual_sin_opciones_es_valida():
+    for medio, config in SITES.items():
+        assert site_config_errors(medio, config) == []
+
+
+def test_ventana_requiere_fechas_de_los_links():
+    ventana = CrawlWindow.from_config({}, "2025-06-01")
+    # biobiochile trae la fecha en la URL; latercera no, ni tiene tarjetas con fecha
+    assert site_config_errors("biobiochile", SITES["biobiochile"], crawl_window=ventana) == []
+    assert site_config_errors("latercera", SITES["latercera"], crawl_window=ventana)
+
+    con_tarjetas = dict(SITES["latercera"], card_selector="article", card_date_selector="time")
+    assert site_config_errors("latercera", con_tarjetas, crawl_window=ventana) == []
+
+
+def test_solo_indice_requiere_card_selector():
+    assert site_config_errors("biobiochile", SITES["biobiochile"], index_only=True)
+    con_tarjetas = dict(SITES["biobiochile"], card_selector="article")
+    assert site_config_errors("biobiochile", con_tarjetas, index_only=True) == []
+
+
+def test_descubrimiento_por_sitemap_requiere_fuentes():
+    por_sitemap = dict(SITES["biobiochile"], discovery="sitemap")
+    assert site_config_errors("biobiochile", por_sitemap)
+
+    por_sitemap["sitemaps"] = ["https://www.biobiochile.cl/sitemap.xml"]
+    assert site_config_errors("biobiochile", por_sitemap) == []
+
+    assert site_config_errors("biobiochile", dict(SITES["biobiochile"], discovery="rss"))
@@ -0,0 +1,47 @@
+import re
+from datetime import datetime
+
+import pytest
+
+from benchmark_url_rules import get_category_original
+from url_rules import URL_RULES, url_classifier
+
+LINKS = [
+    "https://www.biobiochile.cl/noticias/nacional/chile/2025/12/11/pronto-nos-vemos.shtml",
+    "https://www.biobiochile.cl/noticias/nacional/region-de-la-araucania/otra/mas/2025/12/09/temuco.shtml",
+    "https://www.biobiochile.cl/especial/una-mirada-al-pais/noticias/2025/06/01/reportaje.shtml",
+    "https://www.biobiochile.cl/noticias/especial/x/y/2025/06/01/reportaje.shtml",
+    "https://www.biobiochile.cl/biobiochile/noticias-patrocinadas/marca/2025/01/02/aviso.shtml",
+    "https://www.biobiochile.cl/noticias//deportes///futbol/2025/01/02/gol.shtml",
+    "https://www.biobiochile.cl/noticias/2025/01/02/sin-categoria.shtml",
+    "https://www.biobiochile.cl/especial/",
+    "https://www.biobiochile.cl/lista/categorias/nacional",
+    "https://www.latercera.com/nacional/noticia/una-nota/ABCDEF/",
+    "https://www.latercera.com/",
+    "https://www.medio.cl/noticias/nacional/",
+]
+
+
+@pytest.mark.parametrize("link", LINKS)
+def test_reglas_equivalen_a_la_implementacion_original(link):
+    assert url_classifier.classify(link, "slug").category == get_category_original(link, "slug")
+
+
+def test_fecha_y_slug():
+    info = url_classifier.classify(LINKS[0])
+    assert info.date == datetime(2025, 12, 11)
+    assert info.slug == "pronto-nos-vemos"
+    assert url_classifier.classify(LINKS[9]).slug == "una-nota"
+
+
+def test_categoria_de_la_pagina_crawleada():
+    assert url_classifier.page_category("https://www.biobiochile.cl/lista/categorias/nacional/") == "nacional"
+    assert url_classifier.page_category("https://www.latercera.com/canal/politica/") == ""
+    assert url_classifier.page_category("https://www.medio.cl/seccion/") == ""
+
+
+def test_patterns_sin_cuantificadores_posesivos():
+    # Python 3.10 no soporta cuantificadores posesivos ni grupos atómicos
+    for rule in URL_RULES.values():
+        for pattern in rule["patterns"]:
+            assert not re.search(r"[+*?}]\+|\(\?>", pattern)
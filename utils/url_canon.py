@@ -0,0 +1,101 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+"""
+Canonicalización de URLs de noticias. Distintas variantes de un mismo
+artículo (parámetros de tracking, fragmentos, http vs https, slash
+final, versión AMP) se reducen a una sola URL canónica, que es la que
+se deduplica, se envía a scraper_queue y se scrapea.
+
+Las reglas por medio están en `CANON_RULES` (mismas claves que SITES):
+    - domain: la URL pertenece al medio si su host termina en este dominio.
+    - keep_query: parámetros de query que identifican el artículo y se
+      conservan (ordenados); todos los demás se eliminan.
+    - trailing_slash: "add" (termina en /, salvo si el último segmento es
+      un archivo como .shtml), "strip" (nunca termina en /) o "keep".
+    - amp_patterns: regex sobre el path de las variantes AMP; la parte
+      que calza se elimina.
+URLs de otros dominios solo reciben la normalización genérica (esquema
+y host en minúscula, sin fragmento, sin parámetros de tracking).
+"""
+
+# Parámetros de tracking que se eliminan en cualquier dominio
+TRACKING_PARAMS = re.compile(r"^(utm_.*|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|ref|ref_src|amp|outputtype|_ga)$", re.IGNORECASE)
+
+CANON_RULES = {
+    "biobiochile": {
+        "domain": "biobiochile.cl",
+        "keep_query": [],
+        "trailing_slash": "add",            # artículos terminan en .shtml, categorías en /
+        "amp_patterns": [r"(?<=\.shtml)/amp/?$"],
+    },
+    "latercera": {
+        "domain": "latercera.com",
+        "keep_query": [],
+        "trailing_slash": "add",
+        "amp_patterns": [r"/amp/?$", r"^/amp(?=/)"],
+    },
+}
+
+_COMPILED = {
+    medio: {**rule, "amp_patterns": [re.compile(p) for p in rule.get("amp_patterns", [])]}
+    for medio, rule in CANON_RULES.items()
+}
+
+
+def _matches(host, rule):
+    return host == rule["domain"] or host.endswith("." + rule["domain"])
+
+
+def _rule_for(host, medio=None):
+    """
+    Regla del medio entregado si corresponde al host, si no la del
+    dominio del host (o None)
+    """
+    if medio in _COMPILED and _matches(host, _COMPILED[medio]):
+        return _COMPILED[medio]
+    return next((rule for rule in _COMPILED.values() if _matches(host, rule)), None)
+
+
+def canonicalize_url(url: str, medio: str | None = None) -> str:
+    """
+    Entrega la URL canónica de `url`. Si no se entrega `medio`, la regla
+    se elige por el dominio de la URL. URLs no http(s) o vacías se
+    retornan sin cambios, igual que las que no se pueden parsear.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    rule = _rule_for(host, medio)
+
+    netloc = host
+    if port and port not in (80, 443):
+        netloc = f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ]
+
+    if rule is not None:
+        scheme = "https"
+        for amp in rule["amp_patterns"]:
+            path = amp.sub("", path) or "/"
+        keep = set(rule["keep_query"])
+        query = [(key, value) for key, value in query if key in keep]
+        if rule["trailing_slash"] == "add" and not path.endswith("/") and "." not in path.rsplit("/", 1)[-1]:
+            path += "/"
+        elif rule["trailing_slash"] == "strip" and path != "/":
+            path = path.rstrip("/")
+
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ""))
@@ -0,0 +1,144 @@
+import json
+import os
+import time
+
+from . import redis_utils
+
+"""
+Registro persistente de URLs por medio, compartido entre ejecuciones
+del crawler. Guarda para cada URL:
+    - first_seen: primera vez que el crawler la encontró,
+    - last_enqueued: última vez que se envió a scraper_queue,
+    - last_scraped: última vez que un scraper la procesó con éxito.
+
+Usa Redis (un hash por campo y medio) y, si Redis no está disponible,
+un archivo JSON local en `state/` como respaldo.
+"""
+
+STATE_DIR = "state"
+
+
+def _redis_key(medio, field):
+    return f"url_registry:{medio}:{field}"
+
+
+def mark_scraped(medio: str, url: str):
+    """
+    Registra que `url` fue scrapeada con éxito. La usan los scrapers;
+    solo escribe en Redis (varios procesos no pueden compartir el
+    respaldo local), si Redis no responde se ignora.
+    """
+    try:
+        redis_utils.get_redis_client().hset(
+            _redis_key(medio, "last_scraped"), url, int(time.time())
+        )
+    except Exception as e:
+        print(f"[UrlRegistry] No se pudo registrar scraping de {url}: {e}")
+
+
+class UrlRegistry:
+    def __init__(self, medio: str, ttl_hours: float | None = None):
+        self._medio = medio
+        # Sin ttl las URLs ya enviadas no vuelven a encolarse nunca
+        self._ttl = ttl_hours * 3600 if ttl_hours else None
+        self._local_path = os.path.join(STATE_DIR, f"url_registry_{medio}.json")
+        self._local = None
+        self.skipped = 0  # URLs omitidas en esta ejecución por estar vigentes
+
+        try:
+            self._redis = redis_utils.get_redis_client()
+            self._redis.ping()
+        except Exception as e:
+            print(f"[UrlRegistry] Redis no disponible, usando respaldo local: {e}")
+            self._redis = None
+            self._local = self._load_local()
+
+    def _load_local(self):
+        if not os.path.exists(self._local_path):
+            return {}
+        try:
+            with open(self._local_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[UrlRegistry] Respaldo local ilegible, se parte de cero: {e}")
+            return {}
+
+    def _get(self, urls):
+        """
+        Entrega lista de (first_seen, last_enqueued, last_scraped) para
+        cada URL, con None en los campos que no existan
+        """
+        if self._redis is None:
+            return [tuple(self._local.get(url, (None, None, None))) for url in urls]
+
+        pipe = self._redis.pipeline()
+        for field in ("first_seen", "last_enqueued", "last_scraped"):
+            pipe.hmget(_redis_key(self._medio, field), urls)
+        first_seen, last_enqueued, last_scraped = pipe.execute()
+        return [
+            tuple(int(v) if v is not None else None for v in values)
+            for values in zip(first_seen, last_enqueued, last_scraped)
+        ]
+
+    def _is_due(self, record, now):
+        first_seen, last_enqueued, last_scraped = record
+        if first_seen is None:
+            return True  # URL nueva
+        if self._ttl is None:
+            return False
+        # Expirada: scrapeada hace más de ttl, o enviada hace más de ttl
+        # sin que ningún scraper la haya completado
+        reference = last_scraped if last_scraped is not None else last_enqueued
+        return reference is None or now - reference > self._ttl
+
+    def filter_due(self, urls: list[str]) -> set[str]:
+        """
+        Entrega las URLs de `urls` nuevas o expiradas, sin registrar nada
+        """
+        if not urls:
+            return set()
+        now = int(time.time())
+        return {url for url, record in zip(urls, self._get(urls)) if self._is_due(record, now)}
+
+    def select_to_enqueue(self, urls: list[str]) -> set[str]:
+        """
+        Filtra `urls` dejando solo las nuevas o expiradas, que son las
+        que se deben enviar a scraper_queue. Cuenta las omitidas.
+        """
+        due = self.filter_due(urls)
+        self.skipped += len(urls) - len(due)
+        return due
+
+    def mark_enqueued(self, urls):
+        """
+        Registra el envío de `urls` a scraper_queue (y su primera
+        aparición si son nuevas)
+        """
+        urls = list(urls)
+        if not urls:
+            return
+        now = int(time.time())
+
+        if self._redis is None:
+            for url in urls:
+                first_seen, _, last_scraped = self._local.get(url, (None, None, None))
+                self._local[url] = (first_seen or now, now, last_scraped)
+            return
+
+        pipe = self._redis.pipeline()
+        for url in urls:
+            pipe.hsetnx(_redis_key(self._medio, "first_seen"), url, now)
+        pipe.hset(_redis_key(self._medio, "last_enqueued"), mapping={url: now for url in urls})
+        pipe.execute()
+
+    def close(self):
+        """
+        Persiste el respaldo local (escritura atómica). Con Redis no hace nada.
+        """
+        if self._local is None:
+            return
+        os.makedirs(STATE_DIR, exist_ok=True)
+        tmp_path = self._local_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._local, f)
+        os.replace(tmp_path, self._local_path)